@@ -0,0 +1,180 @@
+"""
+Modul bersama untuk halaman-halaman pengolahan absensi (Eppos & Tomoro).
+"""
+
+from absen.batch import (
+    BatchResult,
+    process_eppos_report,
+    process_report_sections,
+    process_reports_parallel,
+    process_tomoro_report,
+    run_jobs,
+    write_consolidated_workbook,
+)
+from absen.cache import (
+    clear_result_cache,
+    get_cached_result,
+    result_cache_info,
+    result_cache_key,
+    store_cached_result,
+)
+from absen.cli import convert_directory
+from absen.dataset import dataset_zip_bytes, punch_log_table, rekap_table, write_attendance_dataset
+from absen.durations import (
+    REKAP_DURATION_FORMATS,
+    SUMMARY_DURATION_COLUMNS,
+    employee_duration_summary,
+    format_duration_columns,
+    format_rekap_durations,
+)
+from absen.eppos import (
+    build_eppos_rekap,
+    extract_attendance_store,
+    extract_block_logs,
+    extract_daily_logs,
+    merge_block_logs,
+)
+from absen.export import write_eppos_rekap_workbook, write_tomoro_rekap_workbook
+from absen.incremental import (
+    IncrementalStats,
+    process_eppos_report_incremental,
+    process_tomoro_report_incremental,
+)
+from absen.layout import (
+    EmployeeBlock,
+    ReportLayout,
+    file_content_hash,
+    find_period_rows,
+    get_report_layout,
+    index_report_layout,
+    map_dates_to_columns,
+    period_dates,
+)
+from absen.pairing import PairingRules, ShiftPairs, make_pairing_rules, pair_punches
+from absen.profiling import (
+    build_trace,
+    compare_traces,
+    load_trace,
+    memory_tracing,
+    save_trace,
+    stage,
+    trace_frame,
+)
+from absen.sections import (
+    ReportSection,
+    merge_section_rekaps,
+    read_report_sections,
+    read_report_sheets,
+    split_report_sections,
+)
+from absen.shift_rules import (
+    DayClassification,
+    ShiftRules,
+    classify_punches,
+    classify_punches_parallel,
+    compile_shift_rules,
+    list_rule_sets,
+    load_shift_rules,
+    shift_rules_fingerprint,
+    times_to_us,
+)
+from absen.store import AttendanceStore, build_attendance_store, store_from_daily_logs
+from absen.streaming import (
+    iter_eppos_employee_logs,
+    iter_report_streams,
+    iter_sheet_rows,
+    iter_tomoro_employee_punches,
+    iter_workbook_sheets,
+    open_report_stream,
+    process_report_stream,
+)
+from absen.synthetic import synthetic_report_bytes, synthetic_report_rows, synthetic_report_sheet
+from absen.timeparse import parse_hms, parse_time_column, parse_time_token
+from absen.tomoro import build_tomoro_rekap, build_tomoro_rekap_overnight, extract_block_punches
+
+__all__ = [
+    "AttendanceStore",
+    "BatchResult",
+    "DayClassification",
+    "EmployeeBlock",
+    "IncrementalStats",
+    "PairingRules",
+    "REKAP_DURATION_FORMATS",
+    "ReportLayout",
+    "ReportSection",
+    "SUMMARY_DURATION_COLUMNS",
+    "ShiftPairs",
+    "ShiftRules",
+    "build_attendance_store",
+    "build_eppos_rekap",
+    "build_tomoro_rekap",
+    "build_tomoro_rekap_overnight",
+    "build_trace",
+    "classify_punches",
+    "classify_punches_parallel",
+    "clear_result_cache",
+    "compare_traces",
+    "compile_shift_rules",
+    "convert_directory",
+    "dataset_zip_bytes",
+    "employee_duration_summary",
+    "extract_attendance_store",
+    "extract_block_logs",
+    "extract_block_punches",
+    "extract_daily_logs",
+    "file_content_hash",
+    "find_period_rows",
+    "format_duration_columns",
+    "format_rekap_durations",
+    "get_cached_result",
+    "get_report_layout",
+    "index_report_layout",
+    "iter_eppos_employee_logs",
+    "iter_report_streams",
+    "iter_sheet_rows",
+    "iter_tomoro_employee_punches",
+    "iter_workbook_sheets",
+    "list_rule_sets",
+    "load_shift_rules",
+    "load_trace",
+    "make_pairing_rules",
+    "map_dates_to_columns",
+    "memory_tracing",
+    "merge_block_logs",
+    "merge_section_rekaps",
+    "open_report_stream",
+    "pair_punches",
+    "parse_hms",
+    "parse_time_column",
+    "parse_time_token",
+    "period_dates",
+    "process_eppos_report",
+    "process_eppos_report_incremental",
+    "process_report_sections",
+    "process_report_stream",
+    "process_reports_parallel",
+    "process_tomoro_report",
+    "process_tomoro_report_incremental",
+    "punch_log_table",
+    "read_report_sections",
+    "read_report_sheets",
+    "rekap_table",
+    "result_cache_info",
+    "result_cache_key",
+    "run_jobs",
+    "save_trace",
+    "shift_rules_fingerprint",
+    "split_report_sections",
+    "stage",
+    "store_cached_result",
+    "store_from_daily_logs",
+    "synthetic_report_bytes",
+    "synthetic_report_rows",
+    "synthetic_report_sheet",
+    "times_to_us",
+    "trace_frame",
+    "write_attendance_dataset",
+    "write_consolidated_workbook",
+    "write_eppos_rekap_workbook",
+    "write_tomoro_rekap_workbook",
+]
@@ -0,0 +1,5 @@
+import sys
+
+from absen.cli import main
+
+sys.exit(main())
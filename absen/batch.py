@@ -0,0 +1,346 @@
+import io
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import time
+from time import perf_counter
+
+from absen.durations import format_rekap_durations
+from absen.eppos import build_eppos_rekap, extract_attendance_store
+from absen.export import _new_write_only_workbook, _styled_cell
+from absen.layout import index_report_layout, map_dates_to_columns, period_dates
+from absen.pairing import PairingRules
+from absen.pool import process_pool_context
+from absen.profiling import stage
+from absen.sections import merge_section_rekaps, read_report_sections
+from absen.shift_rules import DEFAULT_RULES_PATH, load_shift_rules
+from absen.store import store_has_punches
+from absen.tomoro import build_tomoro_rekap, build_tomoro_rekap_overnight, extract_block_punches
+
+# Hasil pengolahan satu file laporan dalam mode batch
+BatchResult = namedtuple('BatchResult', [
+    'index',      # urutan file saat diunggah
+    'file_name',
+    'branch',     # nama cabang (dari nama file), dipakai sebagai nama sheet
+    'rekap',      # DataFrame hasil rekap, None jika gagal
+    'bulan',
+    'tahun',
+    'warnings',   # list teks peringatan
+    'error',      # teks error, None jika berhasil
+    'seconds',    # lama pengolahan file ini (detik)
+    'timings',    # dict tahap -> detik (baca_excel, tata_letak, ekstraksi, rekap)
+])
+
+_INVALID_SHEET_CHARS_RE = re.compile(r'[\[\]:*?/\\]')
+_EXCEL_SHEET_NAME_MAX = 31
+
+
+def branch_name_from_file(file_name):
+    """Nama cabang diambil dari nama file tanpa ekstensi, mis. 'Absen_Kuta.xlsx' -> 'Absen_Kuta'."""
+    return os.path.splitext(os.path.basename(file_name))[0].strip() or 'Cabang'
+
+
+def _report_layout(df_raw, timings=None, memory=None):
+    if df_raw.empty:
+        raise ValueError("Sheet yang dibaca kosong.")
+    with stage(timings, 'tata_letak', memory):
+        layout = index_report_layout(df_raw)
+    if layout.start_date is None or layout.end_date is None:
+        raise ValueError("Periode tidak ditemukan dalam file.")
+    if not layout.blocks:
+        raise ValueError("Blok karyawan tidak ditemukan (tidak ada baris yang mengandung 'No :').")
+    return layout
+
+
+def _unnamed_block_warnings(blocks):
+    return [
+        f"Nama karyawan tidak ditemukan di blok dimulai dari baris {block.start_row + 1}. Melewati blok ini."
+        for block in blocks if not block.name
+    ]
+
+
+def eppos_section_rekap(df_raw, shift_rules, timings=None, memory=None):
+    """
+    Rekap satu bagian laporan Eppos (satu sheet, satu periode).
+    timings/memory (dict, opsional) diisi lama dan puncak memori per tahap (lihat absen.profiling.stage).
+
+    Returns:
+        tuple: (DataFrame rekap, tanggal awal periode, list peringatan).
+        Melempar ValueError jika format laporan tidak dikenali.
+    """
+    layout = _report_layout(df_raw, timings, memory)
+    if not layout.col_day_mapping:
+        raise ValueError("Tidak dapat menemukan nomor hari (1-31) di baris yang diharapkan.")
+
+    dates = period_dates(layout.start_date, layout.end_date)
+    warnings = _unnamed_block_warnings(layout.blocks)
+    warnings.extend(
+        f"Kolom untuk hari {day_num} tidak ditemukan di baris nomor hari."
+        for day_num in sorted({d.day for d in dates if d.day not in layout.col_day_mapping})
+    )
+
+    employee_blocks = [block for block in layout.blocks if block.name]
+    with stage(timings, 'ekstraksi', memory):
+        attendance_store = extract_attendance_store(df_raw, layout.col_day_mapping, employee_blocks, dates)
+    if not store_has_punches(attendance_store):
+        raise ValueError("Tidak ada log absensi yang berhasil diekstrak dari file untuk karyawan manapun.")
+
+    rekap = build_eppos_rekap(attendance_store, shift_rules, timings, memory)
+    return rekap, layout.start_date, warnings
+
+
+def tomoro_section_rekap(df_raw, shift_rules=None, timings=None, memory=None):
+    """
+    Rekap satu bagian laporan Tomoro (satu sheet, satu periode).
+    Jika shift_rules berupa PairingRules, log dipasangkan lintas tengah malam (shift malam);
+    selain itu memakai log pertama/terakhir per tanggal.
+    """
+    layout = _report_layout(df_raw, timings, memory)
+    dates = period_dates(layout.start_date, layout.end_date)
+    col_date_mapping = map_dates_to_columns(layout.day_columns, dates)
+    if not col_date_mapping or len(col_date_mapping) != len(dates):
+        raise ValueError(
+            f"Nomor hari di header tidak sepenuhnya cocok dengan periode. Diharapkan {len(dates)} hari, "
+            f"tetapi {len(col_date_mapping)} kolom hari yang cocok ditemukan."
+        )
+
+    with stage(timings, 'ekstraksi', memory):
+        raw_values = df_raw.to_numpy(dtype=object)
+        raw_logs = []
+        for block in layout.blocks:
+            if block.name:
+                raw_logs.extend(extract_block_punches(raw_values, 0, block, col_date_mapping))
+
+    warnings = _unnamed_block_warnings(layout.blocks)
+    if not raw_logs:
+        warnings.append("Tidak ada log absensi yang berhasil diekstrak dari file.")
+    with stage(timings, 'rekap', memory):
+        if isinstance(shift_rules, PairingRules):
+            rekap = build_tomoro_rekap_overnight(raw_logs, layout.blocks, dates, shift_rules)
+        else:
+            rekap = build_tomoro_rekap(raw_logs, layout.blocks, dates)
+    return rekap, layout.start_date, warnings
+
+
+SECTION_PROCESSORS = {
+    'eppos': eppos_section_rekap,
+    'tomoro': tomoro_section_rekap,
+}
+
+
+def process_report_sections(kind, sections, shift_rules=None, timings=None, max_workers=None, memory=None):
+    """
+    Mengolah semua bagian laporan (lihat absen.sections.read_report_sections) dan menggabungkan rekapnya.
+
+    Satu bagian diolah langsung dan rekapnya tanpa kolom 'Bagian', sama seperti laporan biasa.
+    Beberapa bagian diolah di thread pool (max_workers, default jumlah CPU); bagian yang formatnya
+    tidak dikenali dilewati dengan peringatan. Lama tahap di timings adalah jumlah semua bagian.
+    Jika memory (dict) diberikan, bagian diolah berurutan karena puncak tracemalloc berlaku untuk
+    seluruh proses; memory berisi puncak terbesar per tahap dari semua bagian.
+
+    Returns:
+        tuple: (DataFrame rekap, bulan, tahun, list peringatan) dari periode paling awal.
+        Melempar ValueError jika tidak ada bagian yang berhasil diolah.
+    """
+    processor = SECTION_PROCESSORS[kind]
+    if kind == 'eppos' and shift_rules is None:
+        shift_rules = load_shift_rules(DEFAULT_RULES_PATH)
+    if len(sections) == 1:
+        rekap, start_date, warnings = processor(sections[0].df_raw, shift_rules, timings, memory)
+        return rekap, start_date.month, start_date.year, warnings
+
+    def process_section(section):
+        section_timings = {}
+        try:
+            return processor(section.df_raw, shift_rules, section_timings, memory), None, section_timings
+        except ValueError as e:
+            return None, e, section_timings
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(sections)))
+    if max_workers == 1 or memory is not None:
+        outcomes = [process_section(section) for section in sections]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(process_section, sections))
+    return _merge_section_outcomes(sections, outcomes, timings)
+
+
+def _merge_section_outcomes(sections, outcomes, timings=None):
+    """
+    Menggabungkan hasil per bagian. outcomes sejajar dengan sections, masing-masing
+    ((rekap, tanggal_awal, peringatan) atau None, ValueError atau None, dict timings bagian).
+    Bagian yang gagal menjadi peringatan; ValueError pertama dilempar jika semua bagian gagal.
+    """
+    section_rekaps, start_dates, warnings, errors = [], [], [], []
+    for section, (result, error, section_timings) in zip(sections, outcomes):
+        if timings is not None:
+            for name, seconds in section_timings.items():
+                timings[name] = timings.get(name, 0.0) + seconds
+        if error is not None:
+            errors.append(error)
+            warnings.append(f"Bagian '{section.label}' dilewati: {error}")
+            continue
+        rekap, start_date, section_warnings = result
+        section_rekaps.append((section, rekap))
+        start_dates.append(start_date)
+        warnings.extend(f"{section.label}: {warning_text}" for warning_text in section_warnings)
+    if not section_rekaps:
+        raise errors[0]
+
+    first_start = min(start_dates)
+    return merge_section_rekaps(section_rekaps), first_start.month, first_start.year, warnings
+
+
+def process_eppos_report(file_bytes, shift_rules=None, timings=None):
+    """
+    Versi tanpa Streamlit dari pengolahan halaman Convert Log Absensi Mesin Eppos.
+    Semua sheet dan semua periode di workbook diolah (lihat process_report_sections).
+    Jika timings (dict) diberikan, lama setiap tahap dicatat di dalamnya.
+
+    Returns:
+        tuple: (DataFrame rekap, bulan, tahun, list peringatan).
+        Melempar ValueError jika format laporan tidak dikenali.
+    """
+    with stage(timings, 'baca_excel'):
+        sections = read_report_sections(file_bytes)
+    return process_report_sections('eppos', sections, shift_rules, timings)
+
+
+def process_tomoro_report(file_bytes, shift_rules=None, timings=None):
+    """
+    Versi tanpa Streamlit dari pengolahan halaman Proses Absen Tomoro, untuk semua sheet dan periode.
+    shift_rules berupa PairingRules (opsional) untuk shift malam, lihat tomoro_section_rekap.
+    """
+    with stage(timings, 'baca_excel'):
+        sections = read_report_sections(file_bytes)
+    return process_report_sections('tomoro', sections, shift_rules, timings)
+
+
+REPORT_PROCESSORS = {
+    'eppos': process_eppos_report,
+    'tomoro': process_tomoro_report,
+}
+
+
+def _process_report_job(kind, index, file_name, file_bytes, shift_rules):
+    # Dijalankan di proses worker; error satu file tidak menghentikan file lainnya
+    started = perf_counter()
+    branch = branch_name_from_file(file_name)
+    timings = {}
+    try:
+        rekap, bulan, tahun, warnings = REPORT_PROCESSORS[kind](file_bytes, shift_rules, timings)
+        error = None
+    except Exception as e:
+        rekap, bulan, tahun, warnings, error = None, None, None, [], str(e) or type(e).__name__
+    return BatchResult(
+        index, file_name, branch, rekap, bulan, tahun, warnings, error, perf_counter() - started, timings,
+    )
+
+
+def process_reports_parallel(files, kind, shift_rules=None, max_workers=None):
+    """
+    Mengolah banyak file laporan sekaligus, satu laporan per proses worker.
+
+    Args:
+        files (list): Pasangan (nama_file, isi_file_bytes).
+        kind (str): 'eppos' atau 'tomoro'.
+        shift_rules: ShiftRules untuk format Eppos, PairingRules (opsional) untuk format Tomoro.
+        max_workers (int): Jumlah proses; default jumlah CPU.
+
+    Yields:
+        BatchResult: Sesuai urutan selesai, sehingga progres bisa ditampilkan per file.
+    """
+    if kind not in REPORT_PROCESSORS:
+        raise ValueError(f"Jenis laporan '{kind}' tidak dikenal.")
+    job_args = [
+        (kind, index, file_name, file_bytes, shift_rules)
+        for index, (file_name, file_bytes) in enumerate(files)
+    ]
+    yield from run_jobs(_process_report_job, job_args, max_workers)
+
+
+def run_jobs(job, job_args, max_workers=None):
+    """
+    Menjalankan job(*args) untuk setiap args di job_args dengan ProcessPoolExecutor.
+    job harus fungsi level modul (bisa di-pickle). Hasil di-yield sesuai urutan selesai.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(job_args)))
+
+    # Satu worker: langsung di proses ini, tanpa biaya membuat pool dan mengirim data antar proses
+    if max_workers == 1:
+        for args in job_args:
+            yield job(*args)
+        return
+
+    # Bukan fork: halaman Streamlit memanggil ini dari proses multi-thread (lihat absen/pool.py)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context()) as executor:
+        futures = [executor.submit(job, *args) for args in job_args]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _unique_sheet_name(name, used_names):
+    base = _INVALID_SHEET_CHARS_RE.sub('_', name)[:_EXCEL_SHEET_NAME_MAX] or 'Cabang'
+    sheet_name, counter = base, 2
+    while sheet_name.lower() in used_names:
+        suffix = f" ({counter})"
+        sheet_name = base[:_EXCEL_SHEET_NAME_MAX - len(suffix)] + suffix
+        counter += 1
+    used_names.add(sheet_name.lower())
+    return sheet_name
+
+
+def write_consolidated_workbook(results):
+    """
+    Menggabungkan hasil batch menjadi satu workbook: sheet 'Ringkasan' berisi status
+    dan waktu proses tiap file, lalu satu sheet rekap per cabang.
+
+    Returns:
+        bytes: Isi file .xlsx.
+    """
+    results = sorted(results, key=lambda r: r.index)
+    wb, ws_summary = _new_write_only_workbook('Ringkasan', ['Rekap Judul', 'Rekap Wrap'])
+
+    # Sheet ditulis berurutan (write_only), jadi ringkasan disusun dulu sebelum sheet cabang
+    summary_rows = []
+    branch_sheets = []
+    used_names = {'ringkasan'}
+    for result in results:
+        if result.rekap is None:
+            summary_rows.append([result.branch, result.file_name, '', 0, 0, round(result.seconds, 2), f"Gagal: {result.error}"])
+            continue
+
+        sheet_name = _unique_sheet_name(result.branch, used_names)
+        rekap = result.rekap
+        summary_rows.append([
+            result.branch, result.file_name, sheet_name, rekap['Nama'].nunique(), len(rekap),
+            round(result.seconds, 2), 'OK' if not result.warnings else f"OK ({len(result.warnings)} peringatan)",
+        ])
+        branch_sheets.append((sheet_name, format_rekap_durations(rekap)))
+
+    ws_summary.append([
+        _styled_cell(ws_summary, 'Rekap Judul', header)
+        for header in ['Cabang', 'File', 'Sheet', 'Jumlah Karyawan', 'Jumlah Baris', 'Waktu Proses (detik)', 'Status']
+    ])
+    for row in summary_rows:
+        ws_summary.append(row)
+
+    for sheet_name, rekap in branch_sheets:
+        ws = wb.create_sheet(sheet_name)
+        ws.append([_styled_cell(ws, 'Rekap Judul', header) for header in rekap.columns])
+        wrap_columns = {i for i, name in enumerate(rekap.columns) if name in ('Log Jam Mentah', 'Data Log Mentah')}
+        for row in rekap.itertuples(index=False):
+            values = [v.strftime('%H:%M:%S') if isinstance(v, time) else v for v in row]
+            ws.append([
+                _styled_cell(ws, 'Rekap Wrap', value) if c_idx in wrap_columns else value
+                for c_idx, value in enumerate(values)
+            ])
+
+    output_buffer = io.BytesIO()
+    wb.save(output_buffer)
+    return output_buffer.getvalue()
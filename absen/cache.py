@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from absen.layout import _LAYOUT_CACHE
+
+# Cache hasil olahan (DataFrame rekap, bulan, tahun) per isi file, dipakai ulang saat Streamlit
+# menjalankan ulang halaman (widget berubah, tombol download diklik, dst.)
+_RESULT_CACHE = OrderedDict()
+_RESULT_CACHE_SIZES = {}
+_RESULT_CACHE_LOCK = threading.Lock()
+
+RESULT_CACHE_MAX_ENTRIES = 16
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def result_cache_key(kind, content_hash, *params):
+    """Kunci cache: jenis laporan ('eppos'/'tomoro'), hash isi file, dan parameter yang memengaruhi hasil."""
+    return (kind, content_hash) + tuple(params)
+
+
+def _result_size(result):
+    # Perkiraan ukuran memori: hanya DataFrame yang dihitung, nilai lain diabaikan
+    return sum(int(v.memory_usage(deep=True).sum()) for v in result if isinstance(v, pd.DataFrame))
+
+
+def get_cached_result(key):
+    """Hasil yang tersimpan untuk key, atau None jika belum ada."""
+    with _RESULT_CACHE_LOCK:
+        result = _RESULT_CACHE.get(key)
+        if result is not None:
+            _RESULT_CACHE.move_to_end(key)
+        return result
+
+
+def store_cached_result(key, result):
+    """
+    Menyimpan hasil (tuple) ke cache. Entri paling lama dibuang jika jumlah entri
+    atau total ukuran DataFrame melewati batas; hasil yang lebih besar dari batas tidak disimpan.
+    """
+    size = _result_size(result)
+    if size > RESULT_CACHE_MAX_BYTES:
+        return
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE[key] = result
+        _RESULT_CACHE_SIZES[key] = size
+        _RESULT_CACHE.move_to_end(key)
+        while (
+            len(_RESULT_CACHE) > RESULT_CACHE_MAX_ENTRIES
+            or sum(_RESULT_CACHE_SIZES.values()) > RESULT_CACHE_MAX_BYTES
+        ):
+            oldest_key, _ = _RESULT_CACHE.popitem(last=False)
+            del _RESULT_CACHE_SIZES[oldest_key]
+
+
+def result_cache_info():
+    """(jumlah entri, total ukuran dalam byte)."""
+    with _RESULT_CACHE_LOCK:
+        return len(_RESULT_CACHE), sum(_RESULT_CACHE_SIZES.values())
+
+
+def clear_result_cache():
+    """Mengosongkan cache hasil olahan dan cache tata letak laporan."""
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE.clear()
+        _RESULT_CACHE_SIZES.clear()
+    _LAYOUT_CACHE.clear()
@@ -0,0 +1,253 @@
+"""
+Konversi laporan absensi tanpa Streamlit, mis. untuk dijalankan terjadwal (cron) saat tutup bulan.
+
+    python -m absen LAPORAN_DIR --format eppos --output-dir hasil --jobs 4 --profile
+
+Setiap file .xlsx/.xls di LAPORAN_DIR menjadi satu file rekap di folder output.
+"""
+
+import argparse
+import os
+import sys
+from collections import namedtuple
+from time import perf_counter
+
+from absen.batch import (
+    REPORT_PROCESSORS,
+    BatchResult,
+    branch_name_from_file,
+    run_jobs,
+    write_consolidated_workbook,
+)
+from absen.dataset import DATASET_FORMATS, write_attendance_dataset
+from absen.export import write_eppos_rekap_workbook, write_tomoro_rekap_workbook
+from absen.incremental import DEFAULT_DB_PATH, INCREMENTAL_PROCESSORS
+from absen.pairing import PairingRules, make_pairing_rules
+from absen.profiling import build_trace, ordered_stages, save_trace, stage
+from absen.shift_rules import DEFAULT_RULES_PATH, load_shift_rules
+
+REPORT_EXTENSIONS = ('.xlsx', '.xls')
+
+REKAP_WRITERS = {
+    'eppos': write_eppos_rekap_workbook,
+    'tomoro': write_tomoro_rekap_workbook,
+}
+
+# Tahap yang selalu dicetak --profile (urutan mengikuti absen.profiling.STAGE_LABELS)
+PROFILE_STAGES = ['baca_excel', 'tata_letak', 'ekstraksi', 'aturan_shift', 'rekap', 'ekspor']
+
+# Hasil konversi satu file oleh CLI
+ConvertResult = namedtuple('ConvertResult', [
+    'batch_result',  # BatchResult (rekap ikut dibawa hanya jika --gabung dipakai)
+    'output_path',   # path file rekap, None jika gagal
+    'incremental',   # IncrementalStats jika mode inkremental dipakai, selain itu None
+])
+
+
+def find_report_files(input_dir):
+    """File laporan (.xlsx/.xls) di input_dir, terurut nama; file sementara Excel (~$...) dilewati."""
+    return sorted(
+        os.path.join(input_dir, name)
+        for name in os.listdir(input_dir)
+        if name.lower().endswith(REPORT_EXTENSIONS) and not name.startswith('~$')
+        and os.path.isfile(os.path.join(input_dir, name))
+    )
+
+
+def rekap_file_name(kind, branch, bulan, tahun):
+    """Nama file output, mengikuti nama file unduhan di halaman Streamlit dengan awalan cabang."""
+    if kind == 'tomoro':
+        return f"{branch}_Rekap_Absensi_Per_Nama.xlsx"
+    return f"{branch}_Rekap_Absensi_Periode_{bulan:02d}_{tahun}.xlsx"
+
+
+def _convert_report_job(kind, index, path, output_dir, shift_rules, keep_rekap, incremental_db=None, dataset=None):
+    # Dijalankan di proses worker: olah + ekspor + tulis file, agar ekspor (tahap terlama) ikut paralel
+    started = perf_counter()
+    file_name = os.path.basename(path)
+    branch = branch_name_from_file(file_name)
+    timings = {}
+    rekap, bulan, tahun, warnings, error, output_path, stats = None, None, None, [], None, None, None
+    try:
+        with open(path, 'rb') as f:
+            file_bytes = f.read()
+        if incremental_db is not None:
+            rekap, bulan, tahun, warnings, stats = INCREMENTAL_PROCESSORS[kind](
+                file_bytes, branch, incremental_db, shift_rules, timings
+            )
+        else:
+            rekap, bulan, tahun, warnings = REPORT_PROCESSORS[kind](file_bytes, shift_rules, timings)
+        with stage(timings, 'ekspor'):
+            workbook_bytes = REKAP_WRITERS[kind](rekap)
+            output_path = os.path.join(output_dir, rekap_file_name(kind, branch, bulan, tahun))
+            with open(output_path, 'wb') as f:
+                f.write(workbook_bytes)
+        if dataset is not None:
+            with stage(timings, 'dataset'):
+                write_attendance_dataset(dataset[0], kind, rekap, branch, dataset[1])
+    except Exception as e:
+        rekap, error, output_path, stats = None, str(e) or type(e).__name__, None, None
+
+    result = BatchResult(
+        index, file_name, branch, rekap if keep_rekap else None, bulan, tahun, warnings, error,
+        perf_counter() - started, timings,
+    )
+    return ConvertResult(result, output_path, stats)
+
+
+def convert_directory(input_dir, output_dir, kind, shift_rules=None, jobs=None, consolidated_name=None,
+                      incremental_db=None, dataset_dir=None, dataset_format='parquet'):
+    """
+    Mengubah semua laporan di input_dir menjadi file rekap di output_dir.
+
+    Args:
+        kind (str): 'eppos' atau 'tomoro'.
+        shift_rules: ShiftRules Eppos (default aturan bawaan) atau PairingRules Tomoro (opsional).
+        jobs (int): Jumlah proses worker; default jumlah CPU.
+        consolidated_name (str): Jika diisi, semua rekap juga digabung ke satu workbook dengan nama ini.
+        incremental_db (str): Jika diisi, mode inkremental dengan hasil tersimpan di file SQLite ini
+            (lihat absen/incremental.py); laporan dibedakan per nama cabang.
+        dataset_dir (str): Jika diisi, rekap dan log jam juga ditulis sebagai dataset bertipe
+            (dataset_format 'parquet' atau 'arrow') yang dipartisi per cabang dan bulan (lihat absen/dataset.py).
+
+    Yields:
+        ConvertResult: Sesuai urutan selesai.
+    """
+    if kind not in REPORT_PROCESSORS:
+        raise ValueError(f"Jenis laporan '{kind}' tidak dikenal.")
+    if kind == 'eppos' and shift_rules is None:
+        shift_rules = load_shift_rules(DEFAULT_RULES_PATH)
+    if incremental_db is not None and isinstance(shift_rules, PairingRules):
+        raise ValueError("Mode inkremental tidak mendukung pemasangan shift malam.")
+    if dataset_format not in DATASET_FORMATS:
+        raise ValueError(f"Format dataset '{dataset_format}' tidak dikenal.")
+    dataset = None if dataset_dir is None else (dataset_dir, dataset_format)
+    paths = find_report_files(input_dir)
+    if not paths:
+        raise ValueError(f"Tidak ada file .xlsx/.xls di folder '{input_dir}'.")
+    os.makedirs(output_dir, exist_ok=True)
+
+    keep_rekap = consolidated_name is not None
+    job_args = [
+        (kind, index, path, output_dir, shift_rules, keep_rekap, incremental_db, dataset)
+        for index, path in enumerate(paths)
+    ]
+    batch_results = []
+    for converted in run_jobs(_convert_report_job, job_args, jobs):
+        batch_results.append(converted.batch_result)
+        # DataFrame rekap hanya disimpan sampai workbook gabungan ditulis
+        yield converted._replace(batch_result=converted.batch_result._replace(rekap=None))
+
+    if keep_rekap:
+        with open(os.path.join(output_dir, consolidated_name), 'wb') as f:
+            f.write(write_consolidated_workbook(batch_results))
+
+
+def format_profile(results):
+    """Tabel teks lama tiap tahap (detik) per file, ditambah baris total."""
+    stages = ordered_stages(PROFILE_STAGES + [s for r in results for s in r.timings])
+    name_width = max([len('TOTAL')] + [len(r.file_name) for r in results])
+    lines = [f"{'File':<{name_width}}  " + "  ".join(f"{s:>10}" for s in stages) + f"  {'total':>10}"]
+    totals = dict.fromkeys(stages, 0.0)
+    for r in sorted(results, key=lambda r: r.index):
+        for s in stages:
+            totals[s] += r.timings.get(s, 0.0)
+        lines.append(
+            f"{r.file_name:<{name_width}}  " + "  ".join(f"{r.timings.get(s, 0.0):>10.3f}" for s in stages)
+            + f"  {r.seconds:>10.3f}"
+        )
+    lines.append(
+        f"{'TOTAL':<{name_width}}  " + "  ".join(f"{totals[s]:>10.3f}" for s in stages)
+        + f"  {sum(r.seconds for r in results):>10.3f}"
+    )
+    return "\n".join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='tari-absen',
+        description="Mengubah folder berisi laporan absensi mesin (Eppos/Tomoro) menjadi file rekap Excel.",
+    )
+    parser.add_argument('input_dir', help="Folder berisi file laporan .xlsx/.xls (satu file per cabang).")
+    parser.add_argument('-f', '--format', dest='kind', choices=sorted(REPORT_PROCESSORS), default='eppos',
+                        help="Format laporan (default: eppos).")
+    parser.add_argument('-o', '--output-dir', default=None,
+                        help="Folder hasil rekap (default: <input_dir>/rekap).")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Jumlah proses paralel (default: jumlah CPU).")
+    parser.add_argument('--rules', default=None,
+                        help="File JSON aturan shift untuk format Eppos (default: aturan bawaan).")
+    parser.add_argument('--shift-malam', metavar='JAM', type=float, default=None,
+                        help="Format Tomoro: pasangkan log masuk/pulang lintas tengah malam dengan "
+                             "lama shift maksimum JAM jam.")
+    parser.add_argument('--gabung', metavar='NAMA_FILE', default=None,
+                        help="Tulis juga satu workbook gabungan semua cabang dengan nama ini.")
+    parser.add_argument('--inkremental', metavar='DB', nargs='?', const=DEFAULT_DB_PATH, default=None,
+                        help="Simpan hasil per karyawan per tanggal di file SQLite DB dan olah ulang hanya sel "
+                             f"yang berubah sejak ekspor sebelumnya (default DB: {DEFAULT_DB_PATH}).")
+    parser.add_argument('--dataset', metavar='DIR', default=None,
+                        help="Tulis juga rekap dan log jam per punch sebagai dataset bertipe di DIR, "
+                             "dipartisi per cabang dan bulan, untuk dibaca skrip payroll.")
+    parser.add_argument('--dataset-format', choices=sorted(DATASET_FORMATS), default='parquet',
+                        help="Format file dataset: parquet atau arrow (Arrow IPC/Feather). Default: parquet.")
+    parser.add_argument('--profile', action='store_true',
+                        help="Cetak lama setiap tahap (baca, tata letak, ekstraksi, aturan shift, rekap, ekspor) per file.")
+    parser.add_argument('--trace', metavar='FILE_JSON', default=None,
+                        help="Tulis trace JSON lama setiap tahap (dijumlah semua file) untuk dibandingkan antar "
+                             "versi dengan: python benchmarks/compare_traces.py lama.json baru.json")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        print("--jobs minimal 1.", file=sys.stderr)
+        return 2
+    output_dir = args.output_dir or os.path.join(args.input_dir, 'rekap')
+
+    started = perf_counter()
+    results = []
+    try:
+        shift_rules = None
+        if args.kind == 'eppos' and args.rules:
+            shift_rules = load_shift_rules(args.rules)
+        elif args.kind == 'tomoro' and args.shift_malam is not None:
+            shift_rules = make_pairing_rules(args.shift_malam)
+        for converted in convert_directory(
+            args.input_dir, output_dir, args.kind, shift_rules, args.jobs, args.gabung, args.inkremental,
+            args.dataset, args.dataset_format,
+        ):
+            r = converted.batch_result
+            results.append(r)
+            if r.error:
+                print(f"GAGAL  {r.file_name}: {r.error}", file=sys.stderr)
+                continue
+            print(f"OK     {r.file_name} -> {converted.output_path} ({r.seconds:.2f} dtk)")
+            if converted.incremental is not None:
+                stats = converted.incremental
+                print(f"       inkremental: {stats.recomputed}/{stats.cells} karyawan per tanggal diolah ulang")
+            for warning in r.warnings:
+                print(f"       peringatan: {warning}")
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    n_failed = sum(1 for r in results if r.error)
+    elapsed = perf_counter() - started
+    print(f"{len(results) - n_failed}/{len(results)} file berhasil dalam {elapsed:.2f} detik.")
+    if args.profile and results:
+        print()
+        print(format_profile(results))
+    if args.trace and results:
+        total_timings = {}
+        for r in results:
+            for name, seconds in r.timings.items():
+                total_timings[name] = total_timings.get(name, 0.0) + seconds
+        save_trace(build_trace(f"cli {args.kind}", total_timings, info={
+            'jumlah_file': len(results), 'gagal': n_failed, 'jobs': args.jobs, 'detik_wall': round(elapsed, 3),
+        }), args.trace)
+    return 1 if n_failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+import io
+import os
+import tempfile
+import zipfile
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow.fs import LocalFileSystem
+
+from absen.sections import SECTION_COLUMN
+
+# Ekspor rekap dan log jam per punch sebagai dataset Parquet / Arrow IPC bertipe, untuk dibaca
+# skrip payroll tanpa membuka workbook. Dataset dipartisi per cabang dan bulan (gaya hive):
+#   <root>/rekap/cabang=<cabang>/bulan=<YYYY-MM>/bagian-0.parquet
+#   <root>/log/cabang=<cabang>/bulan=<YYYY-MM>/bagian-0.parquet
+# Ekspor ulang cabang/bulan yang sama menimpa partisinya saja.
+
+DATASET_FORMATS = {
+    'parquet': 'parquet',
+    'arrow': 'ipc',
+}
+
+PARTITIONING = ds.partitioning(pa.schema([('cabang', pa.string()), ('bulan', pa.string())]), flavor='hive')
+
+_NAME_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+# Kolom 'bagian' berisi label sheet/periode dari workbook multi-bagian (lihat absen/sections.py), null jika
+# workbook hanya satu bagian; nama karyawan hanya unik per (cabang, bagian)
+REKAP_SCHEMAS = {
+    'eppos': pa.schema([
+        ('cabang', pa.string()),
+        ('bulan', pa.string()),
+        ('bagian', _NAME_TYPE),
+        ('nama', _NAME_TYPE),
+        ('tanggal', pa.date32()),
+        ('jam_datang', pa.time32('s')),
+        ('jam_pulang', pa.time32('s')),
+        ('jam_istirahat_mulai', pa.time32('s')),
+        ('jam_istirahat_selesai', pa.time32('s')),
+        ('menit_kerja', pa.int16()),
+        ('menit_istirahat', pa.int16()),
+        ('log_mentah', pa.string()),
+    ]),
+    'tomoro': pa.schema([
+        ('cabang', pa.string()),
+        ('bulan', pa.string()),
+        ('bagian', _NAME_TYPE),
+        ('nama', _NAME_TYPE),
+        ('tanggal', pa.date32()),
+        ('jam_datang', pa.time32('s')),
+        ('jam_pulang', pa.time32('s')),
+        ('menit_kerja', pa.int16()),
+        ('log_mentah', pa.string()),
+    ]),
+}
+
+PUNCH_LOG_SCHEMA = pa.schema([
+    ('cabang', pa.string()),
+    ('bulan', pa.string()),
+    ('bagian', _NAME_TYPE),
+    ('nama', _NAME_TYPE),
+    ('tanggal', pa.date32()),
+    ('jam', pa.time32('s')),
+])
+
+# Kolom rekap -> kolom dataset
+_REKAP_TIME_COLUMNS = {
+    'eppos': {
+        'Jam Datang': 'jam_datang',
+        'Jam Pulang': 'jam_pulang',
+        'Jam Istirahat Mulai': 'jam_istirahat_mulai',
+        'Jam Istirahat Selesai': 'jam_istirahat_selesai',
+    },
+    'tomoro': {'Jam Datang': 'jam_datang', 'Jam Pulang': 'jam_pulang'},
+}
+_RAW_LOG_COLUMN = {'eppos': 'Log Jam Mentah', 'tomoro': 'Data Log Mentah'}
+
+# Token log mentah: 'HH:MM' atau 'HH:MM:SS', untuk shift malam Tomoro boleh diikuti ' (+N)' (N hari setelah tanggal baris)
+_RAW_TOKEN_RE = r'^\s*(\d{1,2}):(\d{2})(?::(\d{2}))?(?:\s*\(\+(\d+)\))?\s*$'
+
+
+def _time_seconds(values):
+    """Detik sejak tengah malam per nilai datetime.time; selain itu (None, '') menjadi null."""
+    seconds = [v.hour * 3600 + v.minute * 60 + v.second if hasattr(v, 'hour') else None for v in values]
+    return pa.array(seconds, type=pa.int32()).cast(pa.time32('s'))
+
+
+def _duration_minutes(durations):
+    """Menit dari kolom durasi rekap (detik, Int64); sel kosong menjadi null."""
+    minutes = pd.Series(durations).astype('Int64') // 60
+    return pa.array(minutes.to_numpy(dtype='float64', na_value=np.nan), type=pa.float64(), from_pandas=True).cast(pa.int16())
+
+
+def _months(dates):
+    return pa.array([d.strftime('%Y-%m') for d in dates], type=pa.string())
+
+
+def _section_labels(df_rekap):
+    """Label bagian per baris rekap (kolom 'Bagian'), atau None untuk semua baris jika kolomnya tidak ada."""
+    if SECTION_COLUMN not in df_rekap.columns:
+        return np.full(len(df_rekap), None, dtype=object)
+    return df_rekap[SECTION_COLUMN].astype(object).to_numpy()
+
+
+def rekap_table(kind, df_rekap, branch):
+    """
+    Tabel Arrow bertipe dari DataFrame rekap Eppos/Tomoro (satu baris per karyawan per tanggal):
+    tanggal date32, jam time32[s], durasi menit int16, bagian dan nama dictionary-encoded.
+    """
+    dates = list(df_rekap['Tanggal'])
+    columns = {
+        'cabang': pa.array([branch] * len(dates), type=pa.string()),
+        'bulan': _months(dates),
+        'bagian': pa.array(_section_labels(df_rekap).tolist(), type=pa.string()).dictionary_encode(),
+        'nama': pa.array(df_rekap['Nama'].astype(object).tolist(), type=pa.string()).dictionary_encode(),
+        'tanggal': pa.array(dates, type=pa.date32()),
+    }
+    for rekap_col, dataset_col in _REKAP_TIME_COLUMNS[kind].items():
+        columns[dataset_col] = _time_seconds(df_rekap[rekap_col])
+    columns['menit_kerja'] = _duration_minutes(df_rekap['Durasi Jam Kerja'])
+    if kind == 'eppos':
+        columns['menit_istirahat'] = _duration_minutes(df_rekap['Durasi Istirahat'])
+    columns['log_mentah'] = pa.array(df_rekap[_RAW_LOG_COLUMN[kind]].astype(object).tolist(), type=pa.string())
+    return pa.Table.from_pydict(columns, schema=REKAP_SCHEMAS[kind])
+
+
+def punch_log_table(kind, df_rekap, branch):
+    """
+    Log jam ternormalisasi (satu baris per punch) dari kolom log mentah rekap.
+    Punch shift malam Tomoro yang ditandai '(+N)' dicatat di tanggal sebenarnya.
+    """
+    raw = df_rekap[_RAW_LOG_COLUMN[kind]].astype(object).where(df_rekap[_RAW_LOG_COLUMN[kind]].notna(), '')
+    tokens = pd.DataFrame({
+        'bagian': _section_labels(df_rekap),
+        'nama': df_rekap['Nama'].astype(object).to_numpy(),
+        'tanggal': df_rekap['Tanggal'].to_numpy(dtype=object),
+        'token': raw.astype(str).str.split('\n').to_numpy(),
+    }).explode('token', ignore_index=True)
+    parts = tokens['token'].astype('string').str.extract(_RAW_TOKEN_RE)
+    valid = parts[0].notna().to_numpy()
+    parts = parts[valid].fillna('0').astype('int64')
+    tokens = tokens[valid]
+
+    punches = pd.DataFrame({
+        'bagian': tokens['bagian'].to_numpy(),
+        'nama': tokens['nama'].to_numpy(),
+        'tanggal': [d + timedelta(days=n) if n else d for d, n in zip(tokens['tanggal'], parts[3])],
+        'jam': (parts[0] * 3600 + parts[1] * 60 + parts[2]).to_numpy(dtype=np.int32),
+    }).sort_values(['bagian', 'nama', 'tanggal', 'jam'], kind='stable')
+    dates = punches['tanggal'].tolist()
+    return pa.Table.from_pydict({
+        'cabang': pa.array([branch] * len(dates), type=pa.string()),
+        'bulan': _months(dates),
+        'bagian': pa.array(punches['bagian'].tolist(), type=pa.string()).dictionary_encode(),
+        'nama': pa.array(punches['nama'].tolist(), type=pa.string()).dictionary_encode(),
+        'tanggal': pa.array(dates, type=pa.date32()),
+        # Dari list, bukan array numpy: buffer numpy yang dipinjam (zero-copy) lalu dilepas setelah
+        # write_dataset bisa membuat proses abort saat interpreter selesai
+        'jam': pa.array(punches['jam'].tolist(), type=pa.int32()).cast(pa.time32('s')),
+    }, schema=PUNCH_LOG_SCHEMA)
+
+
+def write_attendance_dataset(root, kind, df_rekap, branch, fmt='parquet'):
+    """
+    Menulis rekap dan log jam ke <root>/rekap dan <root>/log, dipartisi per cabang dan bulan.
+
+    Args:
+        fmt (str): 'parquet' atau 'arrow' (Arrow IPC / Feather v2).
+
+    Returns:
+        list: Path file yang ditulis.
+    """
+    if fmt not in DATASET_FORMATS:
+        raise ValueError(f"Format dataset '{fmt}' tidak dikenal. Pilih salah satu: {', '.join(DATASET_FORMATS)}.")
+    extension = 'parquet' if fmt == 'parquet' else 'arrow'
+    written = []
+    for subdir, table in (
+        ('rekap', rekap_table(kind, df_rekap, branch)),
+        ('log', punch_log_table(kind, df_rekap, branch)),
+    ):
+        ds.write_dataset(
+            table, os.path.abspath(os.path.join(root, subdir)), format=DATASET_FORMATS[fmt], partitioning=PARTITIONING,
+            filesystem=LocalFileSystem(),
+            basename_template=f'bagian-{{i}}.{extension}', existing_data_behavior='delete_matching',
+            file_visitor=lambda written_file: written.append(written_file.path),
+        )
+    return sorted(written)
+
+
+def dataset_zip_bytes(kind, df_rekap, branch, fmt='parquet'):
+    """Dataset write_attendance_dataset sebagai satu file zip (untuk tombol download Streamlit)."""
+    with tempfile.TemporaryDirectory() as root:
+        paths = write_attendance_dataset(root, kind, df_rekap, branch, fmt)
+        buffer = io.BytesIO()
+        # Parquet sudah terkompresi per kolom, jadi hanya file Arrow IPC yang dikompresi zip
+        compression = zipfile.ZIP_STORED if fmt == 'parquet' else zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(buffer, 'w', compression) as zf:
+            for path in paths:
+                zf.write(path, os.path.relpath(path, root))
+    return buffer.getvalue()
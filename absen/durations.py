@@ -0,0 +1,110 @@
+from datetime import time
+
+import numpy as np
+import pandas as pd
+
+# Kolom durasi rekap disimpan sebagai detik bulat (Int64, <NA> jika kosong), dihitung sebagai selisih
+# array. Teks 'X jam Y menit' (Eppos) atau 'HH:MM' (Tomoro) baru dibuat saat ekspor dan tampilan,
+# sehingga total bulanan, lembur, dan keterlambatan cukup dijumlah tanpa mengurai teks kembali.
+
+
+def duration_seconds(values):
+    """Array detik (nilai negatif = kosong) -> kolom Int64 dengan <NA> untuk yang kosong."""
+    values = np.asarray(values, dtype=np.int64)
+    return pd.arrays.IntegerArray(np.maximum(values, 0), values < 0)
+
+
+def format_jam_menit(seconds):
+    """Detik -> 'X jam Y menit' (format Durasi Jam Kerja Eppos), '0 menit' untuk kurang dari semenit."""
+    hours, minutes = seconds // 3600, seconds % 3600 // 60
+    parts = []
+    if hours > 0:
+        parts.append(f"{hours} jam")
+    if minutes > 0:
+        parts.append(f"{minutes} menit")
+    return ' '.join(parts) if parts else '0 menit'
+
+
+def format_menit(seconds):
+    """Detik -> 'Y menit' (format Durasi Istirahat Eppos)."""
+    return f"{seconds // 60} menit"
+
+
+def format_hhmm(seconds):
+    """Detik -> 'HH:MM' (format Tomoro; jam bisa lebih dari 24 untuk total)."""
+    return f"{seconds // 3600:02}:{seconds % 3600 // 60:02}"
+
+
+REKAP_DURATION_FORMATS = {
+    'eppos': {'Durasi Jam Kerja': format_jam_menit, 'Durasi Istirahat': format_menit},
+    'tomoro': {'Durasi Jam Kerja': format_hhmm},
+}
+
+
+def rekap_kind(df_rekap):
+    """'eppos' atau 'tomoro' dari kolom rekap (hanya rekap Eppos yang punya 'Log Jam Mentah')."""
+    return 'eppos' if 'Log Jam Mentah' in df_rekap.columns else 'tomoro'
+
+
+def format_durations(seconds, formatter):
+    """Teks per nilai detik; formatter dipanggil sekali per nilai unik, '' untuk <NA>."""
+    seconds = pd.array(seconds, dtype='Int64')
+    result = np.full(len(seconds), '', dtype=object)
+    found = ~seconds.isna()
+    unique_seconds, inverse = np.unique(seconds[found].to_numpy(dtype=np.int64), return_inverse=True)
+    result[found] = np.array([formatter(int(s)) for s in unique_seconds], dtype=object)[inverse]
+    return result
+
+
+def format_duration_columns(df, formatters):
+    """Salinan df dengan kolom durasi detik (dict kolom -> formatter) diganti teks."""
+    df = df.copy()
+    for col, formatter in formatters.items():
+        if col in df.columns:
+            df[col] = format_durations(df[col], formatter)
+    return df
+
+
+def format_rekap_durations(df_rekap, kind=None):
+    """Salinan rekap dengan kolom durasi dalam teks seperti di file Excel (untuk ekspor dan tampilan)."""
+    return format_duration_columns(df_rekap, REKAP_DURATION_FORMATS[kind or rekap_kind(df_rekap)])
+
+
+SUMMARY_DURATION_COLUMNS = ['Total Jam Kerja', 'Lembur', 'Terlambat', 'Total Istirahat']
+
+
+def _clock_seconds(values):
+    """Detik sejak tengah malam dari kolom jam (datetime.time), -1 untuk sel kosong."""
+    return np.fromiter(
+        (v.hour * 3600 + v.minute * 60 + v.second if isinstance(v, time) else -1 for v in values),
+        dtype=np.int64, count=len(values),
+    )
+
+
+def employee_duration_summary(df_rekap, standard_work_hours=8, shift_start=None):
+    """
+    Ringkasan per karyawan dari kolom durasi detik, sesuai urutan nama di rekap.
+
+    Args:
+        standard_work_hours (float): Jam kerja normal per hari; kelebihannya dihitung sebagai lembur.
+        shift_start (datetime.time): Jam masuk; jika diberikan, Jam Datang setelahnya dijumlah sebagai
+            terlambat. Hanya bermakna untuk karyawan dengan satu jam masuk (bukan shift bergilir).
+
+    Returns:
+        DataFrame: Nama, Hari Hadir, lalu detik (int) untuk Total Jam Kerja, Lembur, Terlambat
+        (jika shift_start) dan Total Istirahat (jika rekap Eppos). Lihat SUMMARY_DURATION_COLUMNS.
+    """
+    work = df_rekap['Durasi Jam Kerja'].astype('Int64').fillna(0).to_numpy(dtype=np.int64)
+    arrival = _clock_seconds(df_rekap['Jam Datang'].tolist())
+    per_day = pd.DataFrame({
+        'Nama': df_rekap['Nama'].to_numpy(dtype=object),
+        'Hari Hadir': arrival >= 0,
+        'Total Jam Kerja': work,
+        'Lembur': np.maximum(work - round(standard_work_hours * 3600), 0),
+    })
+    if shift_start is not None:
+        start_seconds = shift_start.hour * 3600 + shift_start.minute * 60 + shift_start.second
+        per_day['Terlambat'] = np.where(arrival >= 0, np.maximum(arrival - start_seconds, 0), 0)
+    if 'Durasi Istirahat' in df_rekap.columns:
+        per_day['Total Istirahat'] = df_rekap['Durasi Istirahat'].astype('Int64').fillna(0).to_numpy(dtype=np.int64)
+    return per_day.groupby('Nama', sort=False).sum().reset_index()
@@ -0,0 +1,280 @@
+import numpy as np
+import pandas as pd
+
+from absen.durations import duration_seconds
+from absen.profiling import stage
+from absen.shift_rules import US_PER_SECOND, classify_punches_parallel
+from absen.store import build_attendance_store, seconds_to_times
+from absen.timeparse import key_to_time, parse_time_column
+
+# Kolom hasil rekap Eppos sesuai urutan di file Excel
+EPPOS_REKAP_COLUMNS = [
+    'No', 'Nama', 'Tanggal', 'Log Jam Mentah', 'Jam Datang', 'Jam Pulang',
+    'Jam Istirahat Mulai', 'Jam Istirahat Selesai',
+    'Durasi Jam Kerja', 'Durasi Istirahat',
+    'Keterangan Tambahan 1', 'Keterangan Tambahan 2',
+]
+
+_is_blank_text = np.frompyfunc(lambda v: isinstance(v, str) and v.strip() in ('', 'nan'), 1, 1)
+
+
+def _empty_cell_mask(values):
+    """
+    Mask sel kosong untuk array object 2D: NaN/None, string kosong, atau teks 'nan'.
+    """
+    return pd.isna(values) | _is_blank_text(values).astype(bool)
+
+
+def _extract_block_tokens(df_raw, col_day_mapping, employee_blocks, dates):
+    """
+    Mengekstrak semua jam log secara kolumnar.
+
+    Returns:
+        tuple: Array (indeks blok, indeks tanggal, mikrodetik) per token, terurut per blok,
+        tanggal, lalu jam; None jika tidak ada token sama sekali.
+    """
+    n_rows = df_raw.shape[0]
+    if n_rows == 0 or not employee_blocks:
+        return None
+
+    # Kolom hari yang dipakai periode ini; satu kolom bisa dipakai oleh beberapa tanggal
+    dates_per_col = {}
+    for date_idx, current_date in enumerate(dates):
+        col_idx = col_day_mapping.get(current_date.day)
+        if col_idx is not None:
+            dates_per_col.setdefault(col_idx, []).append(date_idx)
+    if not dates_per_col:
+        return None
+    day_cols = sorted(dates_per_col)
+
+    # Satu kali potong seluruh kolom hari sebagai array object
+    values = df_raw.iloc[:, day_cols].to_numpy(dtype=object)
+    empty = _empty_cell_mask(values)
+
+    # Baris berhenti: sel kosong yang diikuti dua sel kosong lagi, atau sel kosong di dua baris terakhir
+    next_two_empty = np.zeros_like(empty)
+    if n_rows > 2:
+        next_two_empty[:-2] = empty[1:-1] & empty[2:]
+    next_two_empty[max(n_rows - 2, 0):] = True
+    stop = empty & next_two_empty
+
+    # Peta baris -> blok karyawan (-1 untuk baris header/di luar blok)
+    row_block = np.full(n_rows, -1, dtype=np.int64)
+    row_block_start = np.zeros(n_rows, dtype=np.int64)
+    for block_id, (start_row, end_row, _) in enumerate(employee_blocks):
+        row_block[start_row + 1:end_row] = block_id
+        row_block_start[start_row + 1:end_row] = start_row
+
+    # Sel valid: di dalam blok, tidak kosong, dan belum melewati baris berhenti pertama di bloknya
+    stops_cumulative = np.cumsum(stop, axis=0)
+    stops_at_block_start = stops_cumulative[row_block_start]
+    valid = (row_block >= 0)[:, None] & ~empty & (stops_cumulative == stops_at_block_start)
+
+    cell_rows, cell_cols = np.nonzero(valid)
+    if cell_rows.size == 0:
+        return None
+    cell_values = values[cell_rows, cell_cols]
+
+    # Tokenisasi semua sel sekaligus
+    tokens = (
+        pd.Series(cell_values, dtype=object)
+        .astype(str)
+        .str.strip()
+        .str.split(r'\s+', regex=True)
+        .explode()
+    )
+    tokens = tokens[tokens.notna() & (tokens != '')]
+    cell_of_token = tokens.index.to_numpy()
+    tokens = tokens.reset_index(drop=True)
+
+    # Setiap teks token unik diparse sekali (regex vektor, rantai lama hanya untuk token aneh)
+    time_keys = parse_time_column(tokens, cell_values[cell_of_token])
+
+    keep = ~np.isnan(time_keys)
+    token_cells = cell_of_token[keep]
+    token_keys = time_keys[keep].astype(np.int64)
+
+    # Perluas token ke semua tanggal yang memakai kolom tersebut
+    col_dates = [dates_per_col[c] for c in day_cols]
+    dates_count = np.array([len(d) for d in col_dates], dtype=np.int64)
+    dates_flat = np.concatenate([np.asarray(d, dtype=np.int64) for d in col_dates])
+    dates_offset = np.concatenate([[0], np.cumsum(dates_count)[:-1]])
+    token_col = cell_cols[token_cells]
+    repeat = dates_count[token_col]
+    token_date = dates_flat[
+        np.repeat(dates_offset[token_col], repeat)
+        + (np.arange(repeat.sum()) - np.repeat(np.cumsum(repeat) - repeat, repeat))
+    ]
+    token_block = np.repeat(row_block[cell_rows[token_cells]], repeat)
+    token_keys = np.repeat(token_keys, repeat)
+
+    order = np.lexsort((token_keys, token_date, token_block))
+    token_block = token_block[order]
+    token_date = token_date[order]
+    token_keys = token_keys[order]
+
+    return token_block, token_date, token_keys
+
+
+def _token_groups(token_block, token_date):
+    """Awal dan akhir setiap kelompok (blok, tanggal) pada array token yang sudah terurut."""
+    group_starts = np.flatnonzero(
+        np.concatenate([[True], (token_block[1:] != token_block[:-1]) | (token_date[1:] != token_date[:-1])])
+    )
+    return group_starts, np.append(group_starts[1:], token_block.size)
+
+
+def _raw_log_label_func():
+    # Teks HH:MM:SS dibuat sekali per detik unik (maksimal 86.400)
+    label_cache = {}
+
+    def key_to_label(key):
+        seconds = key // US_PER_SECOND
+        label = label_cache.get(seconds)
+        if label is None:
+            label = f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+            label_cache[seconds] = label
+        return label
+    return key_to_label
+
+
+def extract_block_logs(df_raw, col_day_mapping, employee_blocks, dates):
+    """
+    Mengekstrak log jam mentah untuk setiap blok karyawan secara kolumnar.
+
+    Args:
+        df_raw (DataFrame): Sheet mentah hasil pd.read_excel(header=None).
+        col_day_mapping (dict): Nomor hari (1-31) -> indeks kolom.
+        employee_blocks (list): Daftar EmployeeBlock yang memiliki nama.
+        dates (list): Semua tanggal dalam periode laporan.
+
+    Returns:
+        list: Satu dict per blok (urutan sama dengan employee_blocks) berisi
+        tanggal -> (list datetime.time, string 'Log Jam Mentah').
+        Hanya berisi tanggal yang memiliki minimal satu log.
+    """
+    block_logs = [{} for _ in employee_blocks]
+    tokens = _extract_block_tokens(df_raw, col_day_mapping, employee_blocks, dates)
+    if tokens is None:
+        return block_logs
+    token_block, token_date, token_keys = tokens
+    group_starts, group_ends = _token_groups(token_block, token_date)
+
+    # Objek time dibuat sekali per nilai unik
+    time_cache = {}
+    key_to_label = _raw_log_label_func()
+
+    def cached_time(key):
+        cached = time_cache.get(key)
+        if cached is None:
+            cached = key_to_time(key)
+            time_cache[key] = cached
+        return cached
+
+    for start, end in zip(group_starts.tolist(), group_ends.tolist()):
+        current_date = dates[token_date[start]]
+        group_keys = token_keys[start:end].tolist()
+        times = [cached_time(key) for key in group_keys]
+        block_logs[token_block[start]][current_date] = (times, '\n'.join(key_to_label(key) for key in group_keys))
+
+    return block_logs
+
+
+def extract_attendance_store(df_raw, col_day_mapping, employee_blocks, dates):
+    """
+    Seperti extract_daily_logs, tetapi hasilnya langsung berupa AttendanceStore
+    (jam sebagai detik int32, tanpa dict dan objek datetime.time per log).
+    Nama sama di blok berbeda: log digabung, teks mentah mengikuti blok terakhir.
+    """
+    names = sorted({block.name for block in employee_blocks})
+    name_codes = {name: code for code, name in enumerate(names)}
+    raw_logs = np.full(len(names) * len(dates), '', dtype=object)
+
+    tokens = _extract_block_tokens(df_raw, col_day_mapping, employee_blocks, dates)
+    if tokens is None:
+        return build_attendance_store(names, dates, [], [], raw_logs)
+    token_block, token_date, token_keys = tokens
+
+    block_codes = np.array([name_codes[block.name] for block in employee_blocks], dtype=np.int64)
+    token_slots = block_codes[token_block] * len(dates) + token_date
+
+    # Token terurut per blok, jadi blok terakhir menimpa teks mentah blok sebelumnya
+    group_starts, group_ends = _token_groups(token_block, token_date)
+    key_to_label = _raw_log_label_func()
+    for start, end in zip(group_starts.tolist(), group_ends.tolist()):
+        raw_logs[token_slots[start]] = '\n'.join(key_to_label(key) for key in token_keys[start:end].tolist())
+
+    return build_attendance_store(names, dates, token_slots, token_keys // US_PER_SECOND, raw_logs)
+
+
+def merge_block_logs(logs, block, logs_for_block):
+    """
+    Menggabungkan log satu blok ke dict (nama, tanggal) -> (times, 'Log Jam Mentah').
+    Nama sama di blok berbeda: log digabung, teks mentah mengikuti blok terakhir.
+    """
+    for current_date, (times, raw_str) in logs_for_block.items():
+        key = (block.name, current_date)
+        entry = logs.get(key)
+        logs[key] = (times, raw_str) if entry is None else (entry[0] + times, raw_str)
+
+
+def extract_daily_logs(df_raw, col_day_mapping, employee_blocks, dates):
+    """
+    Mengekstrak log jam mentah untuk setiap (nama karyawan, tanggal).
+
+    Returns:
+        dict: (nama, tanggal) -> (list datetime.time, string 'Log Jam Mentah').
+    """
+    logs = {}
+    block_logs = extract_block_logs(df_raw, col_day_mapping, employee_blocks, dates)
+    for block, logs_for_block in zip(employee_blocks, block_logs):
+        merge_block_logs(logs, block, logs_for_block)
+    return logs
+
+
+def build_eppos_rekap(store, shift_rules, timings=None, memory=None):
+    """
+    Menyusun tabel rekap Eppos (satu baris per karyawan per tanggal) langsung dari AttendanceStore.
+
+    Args:
+        store (AttendanceStore): Log harian kolumnar (lihat extract_attendance_store).
+        shift_rules (ShiftRules): Aturan shift untuk Jam Datang/Pulang/Istirahat.
+        timings, memory (dict): Opsional, lama/memori tahap 'aturan_shift' dan 'rekap' (lihat absen.profiling.stage).
+
+    Returns:
+        DataFrame: Kolom EPPOS_REKAP_COLUMNS, diurutkan per nama lalu tanggal. Durasi Jam Kerja dan
+        Durasi Istirahat berupa detik (Int64); lihat absen.durations.format_rekap_durations.
+    """
+    with stage(timings, 'aturan_shift', memory):
+        punch_us = store.punch_seconds.astype(np.int64) * US_PER_SECOND
+        # Semua hari diklasifikasi sekaligus dengan searchsorted, bukan perulangan per hari;
+        # laporan besar dibagi per kelompok karyawan ke beberapa proses
+        hasil_shift = classify_punches_parallel(store.day_offsets, punch_us, shift_rules, len(store.dates))
+    with stage(timings, 'rekap', memory):
+        return _eppos_rekap_frame(store, hasil_shift)
+
+
+def _eppos_rekap_frame(store, hasil_shift):
+    n_slots = store.employee_codes.size
+    has_punch = store.day_offsets[1:] > store.day_offsets[:-1]
+
+    # Durasi dalam detik (Int64, <NA> jika kosong); teks baru dibuat saat ekspor (absen.durations)
+    durasi_kerja = duration_seconds(np.where(has_punch, hasil_shift.work_us // US_PER_SECOND, -1))
+    durasi_istirahat = duration_seconds(np.where(has_punch, hasil_shift.break_us // US_PER_SECOND, -1))
+
+    names = np.array(store.names, dtype=object)
+    dates = np.array(store.dates, dtype=object)
+    return pd.DataFrame({
+        'No': np.arange(1, n_slots + 1),
+        'Nama': names[store.employee_codes],
+        'Tanggal': np.tile(dates, len(store.names)),
+        'Log Jam Mentah': store.raw_logs,
+        'Jam Datang': seconds_to_times(store.punch_seconds, hasil_shift.arrival_idx),
+        'Jam Pulang': seconds_to_times(store.punch_seconds, hasil_shift.departure_idx),
+        'Jam Istirahat Mulai': seconds_to_times(store.punch_seconds, hasil_shift.break_start_idx),
+        'Jam Istirahat Selesai': seconds_to_times(store.punch_seconds, hasil_shift.break_end_idx),
+        'Durasi Jam Kerja': durasi_kerja,
+        'Durasi Istirahat': durasi_istirahat,
+        'Keterangan Tambahan 1': np.full(n_slots, '', dtype=object),
+        'Keterangan Tambahan 2': np.full(n_slots, '', dtype=object),
+    }, columns=EPPOS_REKAP_COLUMNS)
@@ -0,0 +1,220 @@
+import io
+from collections import namedtuple
+from datetime import date, time
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Protection, Side
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fills import DEFAULT_EMPTY_FILL
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.dataframe import dataframe_to_rows
+
+from absen.durations import format_rekap_durations
+from absen.sections import SECTION_COLUMN
+
+# Workbook ditulis dengan write_only=True: baris dikirim berurutan, dan setiap sel hanya merujuk
+# NamedStyle yang didaftarkan sekali per workbook (tanpa membuat objek style baru per sel)
+
+EPPOS_TIME_COLUMNS = ['Jam Datang', 'Jam Pulang', 'Jam Istirahat Mulai', 'Jam Istirahat Selesai']
+EPPOS_EXTRA_COLUMNS = ['Keterangan Tambahan 1', 'Keterangan Tambahan 2']
+EPPOS_COLUMN_WIDTH = 25
+
+TOMORO_DISPLAY_HEADERS = ['tanggal', 'data', 'datang', 'pulang', 'jumlah jam kerja']
+# Tabel kedua di setiap pasangan karyawan dimulai di kolom G
+TOMORO_TABLE2_COL_OFFSET = 6
+# Lebar kolom: kolom nama (A/G) 10, kolom 'data' 15, lainnya 12 (sama seperti versi lama, mulai dari B/H)
+TOMORO_NAME_COLUMN_WIDTH = 10
+TOMORO_DATA_COLUMN_WIDTH = 15
+TOMORO_DEFAULT_COLUMN_WIDTH = 12
+
+_THIN_SIDE = Side(style='thin')
+
+# Satu tabel karyawan di workbook Tomoro; durasi disimpan sebagai menit (int), -1 jika kosong
+TomoroTable = namedtuple('TomoroTable', [
+    'name',
+    'section',        # label bagian (kolom 'Bagian' rekap multi-bagian), None jika tidak ada
+    'rows',           # list tuple (nomor hari, data log, jam datang, jam pulang, menit kerja)
+    'total_minutes',  # jumlah menit kerja semua tanggal
+])
+
+# Nama style -> atribut; dibuat ulang sebagai NamedStyle di setiap workbook
+_REKAP_STYLES = {
+    'Rekap Eppos': dict(protection=Protection(locked=False)),
+    'Rekap Eppos Wrap': dict(protection=Protection(locked=False), alignment=Alignment(wrapText=True)),
+    'Rekap Judul': dict(font=Font(bold=True)),
+    'Rekap Wrap': dict(alignment=Alignment(wrapText=True, vertical='top')),
+    'Rekap Tomoro Nama': dict(font=Font(bold=True), alignment=Alignment(horizontal='left')),
+    'Rekap Tomoro Header': dict(
+        font=Font(bold=True),
+        alignment=Alignment(horizontal='center'),
+        border=Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE),
+        fill=PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid"),
+    ),
+    'Rekap Tomoro Tanggal': dict(
+        alignment=Alignment(horizontal='center'),
+        border=Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE),
+        number_format='0',
+    ),
+    'Rekap Tomoro Data': dict(
+        alignment=Alignment(wrapText=True, vertical='top', horizontal='left'),
+        border=Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE),
+    ),
+    'Rekap Tomoro Isi': dict(
+        alignment=Alignment(horizontal='center'),
+        border=Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE),
+    ),
+}
+
+
+def _new_write_only_workbook(sheet_title, style_names):
+    """Workbook write_only dengan NamedStyle yang dibutuhkan dan satu sheet pertama."""
+    wb = Workbook(write_only=True)
+    for name in style_names:
+        # Atribut yang tidak disebut mengikuti style default workbook (mis. font Calibri 11)
+        attributes = dict(font=DEFAULT_FONT, border=DEFAULT_BORDER, fill=DEFAULT_EMPTY_FILL)
+        attributes.update(_REKAP_STYLES[name])
+        wb.add_named_style(NamedStyle(name=name, **attributes))
+    return wb, wb.create_sheet(sheet_title)
+
+
+def _styled_cell(ws, style_name, value):
+    # Style dipasang sebelum nilai agar format angka otomatis (tanggal/jam) tetap berlaku
+    cell = WriteOnlyCell(ws)
+    cell.style = style_name
+    cell.value = value
+    return cell
+
+
+def _save(wb):
+    output_buffer = io.BytesIO()
+    wb.save(output_buffer)
+    return output_buffer.getvalue()
+
+
+def write_eppos_rekap_workbook(df_rekap):
+    """
+    Workbook 'Rekap Absensi' halaman Eppos: satu baris per karyawan per tanggal,
+    semua sel tidak terkunci dan kolom 'Log Jam Mentah' dengan wrap text.
+
+    Returns:
+        bytes: Isi file .xlsx.
+    """
+    df_excel = format_rekap_durations(df_rekap, 'eppos')
+    for col in EPPOS_EXTRA_COLUMNS:
+        if col not in df_excel.columns:
+            df_excel[col] = ''
+    for col in EPPOS_TIME_COLUMNS:
+        df_excel[col] = df_excel[col].apply(lambda x: x.strftime('%H:%M:%S') if isinstance(x, time) else '')
+
+    header_names = list(df_excel.columns)
+    column_styles = ['Rekap Eppos Wrap' if name == 'Log Jam Mentah' else 'Rekap Eppos' for name in header_names]
+
+    wb, ws = _new_write_only_workbook('Rekap Absensi', ['Rekap Eppos', 'Rekap Eppos Wrap'])
+    for i in range(len(header_names)):
+        ws.column_dimensions[get_column_letter(i + 1)].width = EPPOS_COLUMN_WIDTH
+
+    for row_data in dataframe_to_rows(df_excel, index=False, header=True):
+        ws.append([_styled_cell(ws, style, value) for style, value in zip(column_styles, row_data)])
+    return _save(wb)
+
+
+def minutes_to_hhmm(total_minutes):
+    """Total menit -> teks 'HH:MM'."""
+    if total_minutes is None:
+        return ""
+    hours = total_minutes // 60
+    minutes = total_minutes % 60
+    return f"{int(hours):02}:{int(minutes):02}"
+
+
+def build_tomoro_tables(df_rekap):
+    """
+    Menyusun tabel per karyawan untuk workbook Tomoro dalam satu kali groupby:
+    baris setiap karyawan dan total menit kerjanya, sesuai urutan nama di df_rekap.
+    Rekap multi-bagian (kolom 'Bagian') dikelompokkan per (bagian, nama), sehingga karyawan yang sama
+    di dua sheet atau dua periode menjadi dua tabel terpisah.
+
+    Returns:
+        list: TomoroTable per karyawan.
+    """
+    day_numbers = [value.day if isinstance(value, date) else "" for value in df_rekap['Tanggal']]
+    # Durasi detik (Int64) -> menit, -1 untuk sel kosong
+    minutes = (df_rekap['Durasi Jam Kerja'].astype('Int64') // 60).fillna(-1).to_numpy(dtype=np.int64)
+    all_rows = list(zip(
+        day_numbers, df_rekap['Data Log Mentah'], df_rekap['Jam Datang'], df_rekap['Jam Pulang'], minutes.tolist(),
+    ))
+
+    names = df_rekap['Nama'].to_numpy(dtype=object)
+    if SECTION_COLUMN in df_rekap.columns:
+        keys = pd.MultiIndex.from_arrays([df_rekap[SECTION_COLUMN].to_numpy(dtype=object), names])
+        codes, unique_keys = keys.factorize()
+    else:
+        codes, unique_names = pd.factorize(names, use_na_sentinel=False)
+        unique_keys = [(None, name) for name in unique_names]
+    # Total per karyawan: bincount atas kode nama, menit kosong (-1) dihitung 0
+    totals = np.bincount(codes, weights=np.maximum(minutes, 0), minlength=len(unique_keys)).astype(np.int64)
+    # Posisi baris per karyawan dengan sort stabil (urutan baris di dalam karyawan tetap)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(unique_keys) + 1))
+    return [
+        TomoroTable(name, section, [all_rows[i] for i in order[bounds[k]:bounds[k + 1]]], int(totals[k]))
+        for k, (section, name) in enumerate(unique_keys)
+    ]
+
+
+def _tomoro_table_cells(ws, table, col_offset):
+    """Sel satu tabel karyawan sebagai dict (baris_relatif, kolom) -> WriteOnlyCell."""
+    title = table.name if table.section is None else f"{table.name} ({table.section})"
+    cells = {(0, 1 + col_offset): _styled_cell(ws, 'Rekap Tomoro Nama', title)}
+    for c_idx, header in enumerate(TOMORO_DISPLAY_HEADERS):
+        cells[(1, c_idx + 1 + col_offset)] = _styled_cell(ws, 'Rekap Tomoro Header', header)
+
+    for r_data_idx, (day_number, data, datang, pulang, menit) in enumerate(table.rows):
+        row = 2 + r_data_idx
+        cells[(row, 1 + col_offset)] = _styled_cell(ws, 'Rekap Tomoro Tanggal', day_number)
+        cells[(row, 2 + col_offset)] = _styled_cell(ws, 'Rekap Tomoro Data', data)
+        cells[(row, 3 + col_offset)] = _styled_cell(ws, 'Rekap Tomoro Isi', datang)
+        cells[(row, 4 + col_offset)] = _styled_cell(ws, 'Rekap Tomoro Isi', pulang)
+        # Menit baru diubah ke teks 'HH:MM' saat ditulis
+        cells[(row, 5 + col_offset)] = _styled_cell(ws, 'Rekap Tomoro Isi', minutes_to_hhmm(menit) if menit >= 0 else "")
+
+    total_col = TOMORO_DISPLAY_HEADERS.index('jumlah jam kerja') + 1 + col_offset
+    cells[(2 + len(table.rows), total_col)] = _styled_cell(ws, 'Rekap Tomoro Header', minutes_to_hhmm(table.total_minutes))
+    return cells
+
+
+def write_tomoro_rekap_workbook(df_rekap):
+    """
+    Workbook 'Rekap Absensi' halaman Tomoro: tabel per karyawan, dua karyawan berdampingan
+    (kolom A dan G), dengan baris total jam kerja dan dua baris kosong antar pasangan.
+
+    Returns:
+        bytes: Isi file .xlsx.
+    """
+    tables = build_tomoro_tables(df_rekap)
+
+    wb, ws = _new_write_only_workbook('Rekap Absensi', [name for name in _REKAP_STYLES if name.startswith('Rekap Tomoro')])
+    for table_offset in (0, TOMORO_TABLE2_COL_OFFSET):
+        ws.column_dimensions[get_column_letter(1 + table_offset)].width = TOMORO_NAME_COLUMN_WIDTH
+        for i, col_name in enumerate(TOMORO_DISPLAY_HEADERS):
+            ws.column_dimensions[get_column_letter(i + 2 + table_offset)].width = (
+                TOMORO_DATA_COLUMN_WIDTH if col_name == 'data' else TOMORO_DEFAULT_COLUMN_WIDTH
+            )
+
+    for i in range(0, len(tables), 2):
+        pair = tables[i:i + 2]
+        cells = {}
+        for table, col_offset in zip(pair, (0, TOMORO_TABLE2_COL_OFFSET)):
+            cells.update(_tomoro_table_cells(ws, table, col_offset))
+
+        # Nama + header + data + total, lalu 2 baris kosong pemisah (kecuali setelah pasangan terakhir)
+        max_rows_in_pair = max(len(table.rows) for table in pair)
+        n_rows = 1 + 1 + max_rows_in_pair + 1 + (2 if i + 2 < len(tables) else 0)
+        n_cols = max(col for _, col in cells)
+        for r_offset in range(n_rows):
+            ws.append([cells.get((r_offset, col)) for col in range(1, n_cols + 1)])
+    return _save(wb)
@@ -0,0 +1,343 @@
+import os
+import sqlite3
+from collections import namedtuple
+from contextlib import closing
+from datetime import date, time
+
+import numpy as np
+import pandas as pd
+
+from absen.batch import _merge_section_outcomes, _report_layout, _unnamed_block_warnings
+from absen.durations import REKAP_DURATION_FORMATS
+from absen.eppos import EPPOS_REKAP_COLUMNS, build_eppos_rekap, extract_attendance_store
+from absen.layout import map_dates_to_columns, period_dates
+from absen.profiling import stage
+from absen.sections import read_report_sections
+from absen.shift_rules import DEFAULT_RULES_PATH, load_shift_rules, shift_rules_fingerprint
+from absen.tomoro import TOMORO_REKAP_COLUMNS, build_tomoro_rekap, extract_block_punches
+
+# Hasil rekap per (karyawan, tanggal) disimpan di SQLite lokal, bersama hash sel mentahnya.
+# Laporan yang diekspor ulang (tanggal awal sama, tanggal akhir bertambah) hanya mengolah ulang
+# pasangan (karyawan, tanggal) yang sel mentahnya berubah.
+DEFAULT_DB_PATH = os.environ.get('TARI_ABSEN_DB') or os.path.join(
+    os.path.expanduser('~'), '.cache', 'tari-absen', 'rekap_inkremental.sqlite3'
+)
+
+# Kolom rekap yang disimpan per jenis laporan (Nama dan Tanggal menjadi kunci; No dinomori ulang)
+_STORED_COLUMNS = {
+    'eppos': [col for col in EPPOS_REKAP_COLUMNS if col not in ('No', 'Nama', 'Tanggal')],
+    'tomoro': [col for col in TOMORO_REKAP_COLUMNS if col not in ('Nama', 'Tanggal')],
+}
+
+# Kolom jam disimpan sebagai teks ISO ('HH:MM:SS'), kolom durasi sebagai detik (INTEGER, NULL jika kosong);
+# nilai lain (teks, None) apa adanya
+_TIME_COLUMNS = {
+    'eppos': ['Jam Datang', 'Jam Pulang', 'Jam Istirahat Mulai', 'Jam Istirahat Selesai'],
+    'tomoro': ['Jam Datang', 'Jam Pulang'],
+}
+
+# Ringkasan satu kali proses inkremental
+IncrementalStats = namedtuple('IncrementalStats', [
+    'cells',       # jumlah pasangan (karyawan, tanggal) di laporan
+    'recomputed',  # pasangan yang diolah ulang karena sel mentahnya berubah atau baru
+    'removed',     # pasangan tersimpan yang tidak ada lagi di laporan
+])
+
+
+def _connect(db_path):
+    db_path = db_path or DEFAULT_DB_PATH
+    if db_path != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    for kind, columns in _STORED_COLUMNS.items():
+        value_columns = ''.join(f', "{col}"' for col in columns)
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS rekap_{kind} (report_key TEXT NOT NULL, nama TEXT NOT NULL, "
+            f"tanggal TEXT NOT NULL, cell_hash TEXT NOT NULL{value_columns}, PRIMARY KEY (report_key, nama, tanggal))"
+        )
+    return conn
+
+
+# Versi format baris tersimpan, ikut di kunci laporan: baris lama (durasi berupa teks) tidak dipakai lagi
+# dan diolah ulang sekali
+_STORE_VERSION = 2
+
+
+def _report_key(kind, report_id, start_date, params):
+    # Tanggal akhir sengaja tidak ikut: ekspor ulang dengan periode yang lebih panjang memakai kunci yang sama
+    return f"v{_STORE_VERSION}|{kind}|{report_id}|{start_date.isoformat()}|{params}"
+
+
+def _stored_value(value):
+    if isinstance(value, time):
+        return value.isoformat()
+    if value is pd.NA:
+        return None
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def cell_hashes(df_raw, employee_blocks, dates, date_columns):
+    """
+    Hash sel mentah per (nama, tanggal): isi kolom tanggal tersebut di semua baris blok karyawan.
+    Blok dengan nama sama digabung sesuai urutannya.
+
+    Args:
+        date_columns (list): Indeks kolom untuk setiap tanggal (-1 jika kolomnya tidak ada).
+
+    Returns:
+        dict: (nama, tanggal) -> hash (teks).
+    """
+    columns = sorted({c for c in date_columns if c >= 0})
+    col_pos = {c: i for i, c in enumerate(columns)}
+    n_rows = df_raw.shape[0]
+    if columns:
+        text = df_raw.iloc[:, columns].to_numpy(dtype=object).astype(str)
+        per_cell = pd.util.hash_array(text.ravel(), categorize=True).reshape(n_rows, len(columns))
+    else:
+        per_cell = np.zeros((n_rows, 0), dtype=np.uint64)
+
+    # Per blok: jumlah hash sel dikali posisi barisnya (aritmetika uint64, boleh overflow)
+    per_name = {}
+    with np.errstate(over='ignore'):
+        for block in employee_blocks:
+            rows = per_cell[block.start_row + 1:block.end_row]
+            weights = np.arange(1, rows.shape[0] + 1, dtype=np.uint64)[:, None]
+            block_hash = (rows * weights).sum(axis=0, dtype=np.uint64)
+            previous = per_name.get(block.name)
+            per_name[block.name] = block_hash if previous is None else previous * np.uint64(31) + block_hash
+
+    hashes = {}
+    for name, column_hashes in per_name.items():
+        for single_date, col_idx in zip(dates, date_columns):
+            hashes[(name, single_date)] = str(int(column_hashes[col_pos[col_idx]])) if col_idx >= 0 else 'tanpa-kolom'
+    return hashes
+
+
+def _sync_rows(db_path, kind, key, hashes, recompute):
+    """
+    Inti mode inkremental: membandingkan hash dengan yang tersimpan, memanggil
+    recompute(nama_berubah, tanggal_berubah) -> DataFrame rekap untuk pasangan yang berubah,
+    lalu menyimpan hasilnya.
+
+    Returns:
+        tuple: (dict (nama, tanggal) -> tuple nilai _STORED_COLUMNS[kind] untuk semua pasangan di hashes,
+        IncrementalStats). Nilai jam dari SQLite masih berupa teks ISO (lihat _rekap_columns).
+    """
+    columns = _STORED_COLUMNS[kind]
+    dates = {single_date.isoformat(): single_date for single_date in {d for _, d in hashes}}
+
+    conn = _connect(db_path)
+    with closing(conn), conn:
+        value_columns = ''.join(f', "{col}"' for col in columns)
+        stored_hashes = {}
+        rows = {}
+        for row in conn.execute(
+            f"SELECT nama, tanggal, cell_hash{value_columns} FROM rekap_{kind} WHERE report_key = ?", (key,)
+        ):
+            tanggal = row[1]
+            if tanggal not in dates:
+                dates[tanggal] = date.fromisoformat(tanggal)
+            pair = (row[0], dates[tanggal])
+            stored_hashes[pair] = row[2]
+            if hashes.get(pair) == row[2]:
+                rows[pair] = row[3:]
+
+        changed = [pair for pair in hashes if pair not in rows]
+        fresh = []
+        if changed:
+            changed_names = sorted({name for name, _ in changed})
+            changed_dates = sorted({single_date for _, single_date in changed})
+            rekap = recompute(changed_names, changed_dates)
+            for name, single_date, *values in rekap[['Nama', 'Tanggal'] + columns].itertuples(index=False, name=None):
+                pair = (name, single_date)
+                rows[pair] = tuple(values)
+                fresh.append((key, name, single_date.isoformat(), hashes[pair], *map(_stored_value, values)))
+
+        removed = [pair for pair in stored_hashes if pair not in hashes]
+        conn.executemany(
+            f"DELETE FROM rekap_{kind} WHERE report_key = ? AND nama = ? AND tanggal = ?",
+            [(key, name, single_date.isoformat()) for name, single_date in removed],
+        )
+        conn.executemany(
+            f"INSERT OR REPLACE INTO rekap_{kind} (report_key, nama, tanggal, cell_hash{value_columns}) "
+            f"VALUES ({', '.join('?' * (4 + len(columns)))})",
+            fresh,
+        )
+    return rows, IncrementalStats(len(hashes), len(changed), len(removed))
+
+
+def _rekap_columns(kind, rows, pairs):
+    """Kolom rekap (list per kolom, durasi sebagai array Int64) untuk pasangan (nama, tanggal) yang sudah terurut."""
+    columns = _STORED_COLUMNS[kind]
+    result = {'Nama': [name for name, _ in pairs], 'Tanggal': [single_date for _, single_date in pairs]}
+    result.update(zip(columns, map(list, zip(*(rows[pair] for pair in pairs))) if pairs else ([] for _ in columns)))
+    for col in _TIME_COLUMNS[kind]:
+        # Teks ISO dari SQLite menjadi datetime.time; setiap nilai unik hanya diurai sekali
+        parsed = {text: time.fromisoformat(text) for text in set(result[col]) if isinstance(text, str) and text}
+        result[col] = [parsed.get(value, value) for value in result[col]]
+    for col in REKAP_DURATION_FORMATS[kind]:
+        result[col] = pd.array(result[col], dtype='Int64')
+    return result
+
+
+def _process_sections_incremental(section_rekap, file_bytes, report_id, timings=None, memory=None):
+    """
+    Menjalankan section_rekap(df_raw, report_id_bagian, timings, memory) -> (rekap, tanggal_awal, peringatan,
+    IncrementalStats) untuk setiap bagian workbook (lihat absen.sections.read_report_sections), berurutan.
+    Setiap bagian punya kunci tersimpan sendiri (report_id ditambah label bagian); workbook satu bagian
+    memakai report_id apa adanya dan rekapnya tanpa kolom 'Bagian', sama seperti process_report_sections.
+    """
+    with stage(timings, 'baca_excel', memory):
+        sections = read_report_sections(file_bytes)
+    if len(sections) == 1:
+        rekap, start_date, warnings, stats = section_rekap(sections[0].df_raw, report_id, timings, memory)
+        return rekap, start_date.month, start_date.year, warnings, stats
+
+    outcomes, section_stats = [], []
+    for section in sections:
+        section_timings = {}
+        try:
+            rekap, start_date, warnings, stats = section_rekap(
+                section.df_raw, f"{report_id}|{section.label}", section_timings, memory
+            )
+        except ValueError as e:
+            outcomes.append((None, e, section_timings))
+            continue
+        outcomes.append(((rekap, start_date, warnings), None, section_timings))
+        section_stats.append(stats)
+    rekap, bulan, tahun, warnings = _merge_section_outcomes(sections, outcomes, timings)
+    return rekap, bulan, tahun, warnings, IncrementalStats(*map(sum, zip(*section_stats)))
+
+
+def process_eppos_report_incremental(file_bytes, report_id, db_path=None, shift_rules=None, timings=None,
+                                     memory=None):
+    """
+    Seperti process_eppos_report, tetapi hasil per (karyawan, tanggal) disimpan di SQLite
+    (db_path, default DEFAULT_DB_PATH) dan hanya pasangan yang sel mentahnya berubah yang diolah ulang.
+    report_id membedakan laporan (mis. nama cabang); aturan shift yang berbeda disimpan terpisah.
+    Semua sheet dan periode diolah, masing-masing dengan kunci tersimpan sendiri.
+
+    Returns:
+        tuple: (DataFrame rekap, bulan, tahun, list peringatan, IncrementalStats dijumlah untuk semua bagian).
+    """
+    if shift_rules is None:
+        shift_rules = load_shift_rules(DEFAULT_RULES_PATH)
+
+    def section_rekap(df_raw, section_id, section_timings, section_memory):
+        return _eppos_section_incremental(df_raw, section_id, db_path, shift_rules, section_timings, section_memory)
+
+    return _process_sections_incremental(section_rekap, file_bytes, report_id, timings, memory)
+
+
+def _eppos_section_incremental(df_raw, report_id, db_path, shift_rules, timings=None, memory=None):
+    # Satu bagian laporan Eppos; lihat process_eppos_report_incremental
+    layout = _report_layout(df_raw, timings, memory)
+    if not layout.col_day_mapping:
+        raise ValueError("Tidak dapat menemukan nomor hari (1-31) di baris yang diharapkan.")
+
+    dates = period_dates(layout.start_date, layout.end_date)
+    warnings = _unnamed_block_warnings(layout.blocks)
+    warnings.extend(
+        f"Kolom untuk hari {day_num} tidak ditemukan di baris nomor hari."
+        for day_num in sorted({d.day for d in dates if d.day not in layout.col_day_mapping})
+    )
+    employee_blocks = [block for block in layout.blocks if block.name]
+
+    with stage(timings, 'hash_sel', memory):
+        hashes = cell_hashes(df_raw, employee_blocks, dates, [layout.col_day_mapping.get(d.day, -1) for d in dates])
+
+    def recompute(changed_names, changed_dates):
+        changed_blocks = [block for block in employee_blocks if block.name in set(changed_names)]
+        with stage(timings, 'ekstraksi', memory):
+            store = extract_attendance_store(df_raw, layout.col_day_mapping, changed_blocks, changed_dates)
+        return build_eppos_rekap(store, shift_rules, timings, memory)
+
+    key = _report_key('eppos', report_id, layout.start_date, shift_rules_fingerprint(shift_rules))
+    rows, stats = _sync_rows(db_path, 'eppos', key, hashes, recompute)
+    data = _rekap_columns('eppos', rows, sorted(rows))
+    if not any(data['Log Jam Mentah']):
+        raise ValueError("Tidak ada log absensi yang berhasil diekstrak dari file untuk karyawan manapun.")
+
+    data['No'] = np.arange(1, len(rows) + 1)
+    rekap = pd.DataFrame({
+        col: np.array(values, dtype=object) if isinstance(values, list) else values for col, values in data.items()
+    }, columns=EPPOS_REKAP_COLUMNS)
+    return rekap, layout.start_date, warnings, stats
+
+
+def process_tomoro_report_incremental(file_bytes, report_id, db_path=None, shift_rules=None, timings=None,
+                                      memory=None):
+    """
+    Versi inkremental process_tomoro_report (log pertama/terakhir per tanggal), untuk semua sheet dan periode.
+    Mode shift malam (PairingRules) tidak didukung karena hasil satu tanggal bergantung pada tanggal lain.
+
+    Returns:
+        tuple: (DataFrame rekap, bulan, tahun, list peringatan, IncrementalStats dijumlah untuk semua bagian).
+    """
+    if shift_rules is not None:
+        raise ValueError("Mode inkremental tidak mendukung pemasangan shift malam.")
+
+    def section_rekap(df_raw, section_id, section_timings, section_memory):
+        return _tomoro_section_incremental(df_raw, section_id, db_path, section_timings, section_memory)
+
+    return _process_sections_incremental(section_rekap, file_bytes, report_id, timings, memory)
+
+
+def _tomoro_section_incremental(df_raw, report_id, db_path, timings=None, memory=None):
+    # Satu bagian laporan Tomoro; lihat process_tomoro_report_incremental
+    layout = _report_layout(df_raw, timings, memory)
+    dates = period_dates(layout.start_date, layout.end_date)
+    col_date_mapping = map_dates_to_columns(layout.day_columns, dates)
+    if not col_date_mapping or len(col_date_mapping) != len(dates):
+        raise ValueError(
+            f"Nomor hari di header tidak sepenuhnya cocok dengan periode. Diharapkan {len(dates)} hari, "
+            f"tetapi {len(col_date_mapping)} kolom hari yang cocok ditemukan."
+        )
+    employee_blocks = [block for block in layout.blocks if block.name]
+    if not employee_blocks:
+        raise ValueError("Tidak ada nama karyawan yang ditemukan dalam file.")
+
+    with stage(timings, 'hash_sel', memory):
+        hashes = cell_hashes(df_raw, employee_blocks, dates, [col_date_mapping[d] for d in dates])
+
+    def recompute(changed_names, changed_dates):
+        changed_blocks = [block for block in employee_blocks if block.name in set(changed_names)]
+        changed_mapping = {d: col_date_mapping[d] for d in changed_dates}
+        with stage(timings, 'ekstraksi', memory):
+            raw_values = df_raw.to_numpy(dtype=object)
+            raw_logs = []
+            for block in changed_blocks:
+                raw_logs.extend(extract_block_punches(raw_values, 0, block, changed_mapping))
+        with stage(timings, 'rekap', memory):
+            # Karyawan tanpa log juga disimpan; penyaringan seperti build_tomoro_rekap dilakukan setelah digabung
+            names_with_logs = {log['Nama'] for log in raw_logs}
+            idle_blocks = [block for block in changed_blocks if block.name not in names_with_logs]
+            parts = []
+            if raw_logs:
+                parts.append(build_tomoro_rekap(raw_logs, changed_blocks, changed_dates))
+            if idle_blocks:
+                parts.append(build_tomoro_rekap([], idle_blocks, changed_dates))
+            return pd.concat(parts)
+
+    key = _report_key('tomoro', report_id, layout.start_date, 'pertama-terakhir')
+    rows, stats = _sync_rows(db_path, 'tomoro', key, hashes, recompute)
+
+    # Sama seperti build_tomoro_rekap: jika ada log, hanya karyawan yang memiliki log yang ditampilkan
+    warnings = _unnamed_block_warnings(layout.blocks)
+    raw_log_pos = _STORED_COLUMNS['tomoro'].index('Data Log Mentah')
+    names_with_logs = {name for (name, _), values in rows.items() if values[raw_log_pos]}
+    pairs = sorted(rows)
+    if names_with_logs:
+        pairs = [pair for pair in pairs if pair[0] in names_with_logs]
+    else:
+        warnings.append("Tidak ada log absensi yang berhasil diekstrak dari file.")
+    rekap = pd.DataFrame(_rekap_columns('tomoro', rows, pairs), columns=TOMORO_REKAP_COLUMNS)
+    return rekap, layout.start_date, warnings, stats
+
+
+INCREMENTAL_PROCESSORS = {
+    'eppos': process_eppos_report_incremental,
+    'tomoro': process_tomoro_report_incremental,
+}
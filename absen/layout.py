@@ -0,0 +1,173 @@
+import hashlib
+import re
+from collections import OrderedDict, namedtuple
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Periode :YYYY/MM/DD ~ MM/DD atau Periode :YYYY/MM/DD ~ YYYY/MM/DD
+PERIODE_RE = re.compile(r'Periode\s*:\s*(\d{4})/(\d{2})/(\d{2})\s*~\s*(?:(\d{4})/)?(\d{2})/(\d{2})')
+
+# Satu blok karyawan: baris header 'No :' sampai sebelum header blok berikutnya
+EmployeeBlock = namedtuple('EmployeeBlock', ['start_row', 'end_row', 'name'])
+
+ReportLayout = namedtuple('ReportLayout', [
+    'period_row',       # indeks baris 'Periode', -1 jika tidak ditemukan
+    'start_date',       # tanggal awal periode (date) atau None
+    'end_date',         # tanggal akhir periode (date) atau None
+    'day_row',          # indeks baris nomor hari (period_row + 1)
+    'day_columns',      # list (indeks_kolom, nomor_hari) sesuai urutan kolom
+    'col_day_mapping',  # dict nomor hari (1-31) -> indeks kolom
+    'blocks',           # list EmployeeBlock, termasuk blok tanpa nama (name=None)
+])
+
+_LAYOUT_CACHE = OrderedDict()
+_LAYOUT_CACHE_MAX_ENTRIES = 16
+
+_contains_no_label = np.frompyfunc(lambda v: 'No :' in str(v), 1, 1)
+_contains_periode_label = np.frompyfunc(lambda v: isinstance(v, str) and 'Periode' in v, 1, 1)
+
+
+def file_content_hash(file_bytes):
+    """Hash SHA-256 dari isi file, dipakai sebagai kunci cache."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def parse_period(match):
+    """
+    Mengubah hasil regex PERIODE_RE menjadi (tanggal_awal, tanggal_akhir).
+    Jika tahun akhir tidak ditulis, periode yang melewati pergantian tahun
+    (mis. 2024/12/20 ~ 01/19) otomatis memakai tahun berikutnya.
+    Melempar ValueError jika tanggal tidak valid.
+    """
+    start_year, start_month, start_day = int(match.group(1)), int(match.group(2)), int(match.group(3))
+    end_month, end_day = int(match.group(5)), int(match.group(6))
+
+    start_date = date(start_year, start_month, start_day)
+    if match.group(4):
+        end_year = int(match.group(4))
+    elif end_month < start_month or (end_month == start_month and end_day < start_day):
+        end_year = start_year + 1
+    else:
+        end_year = start_year
+    return start_date, date(end_year, end_month, end_day)
+
+
+def _parse_day_number(cell_val):
+    if pd.isna(cell_val):
+        return None
+    try:
+        return int(float(cell_val))
+    except (ValueError, TypeError):
+        return None
+
+
+def _find_employee_name(header_row):
+    """Nama karyawan ada di sel tidak kosong pertama setelah label 'Nama :'."""
+    for col_idx, cell_val in enumerate(header_row):
+        if 'Nama :' in str(cell_val).strip():
+            for candidate in header_row[col_idx + 1:]:
+                candidate_name = str(candidate).strip()
+                if candidate_name and candidate_name != 'nan' and not candidate_name.startswith('Dept :'):
+                    return candidate_name
+            return None
+    return None
+
+
+def _row_text(row):
+    return ' '.join(str(v) for v in row if not pd.isna(v))
+
+
+def find_period_rows(df_raw):
+    """
+    Indeks semua baris 'Periode' yang valid formatnya (PERIODE_RE), untuk sheet berisi beberapa
+    periode bertumpuk. Hanya baris yang punya sel teks berisi 'Periode' yang dicocokkan dengan regex.
+    """
+    values = df_raw.to_numpy(dtype=object)
+    if values.size == 0:
+        return []
+    candidates = np.flatnonzero(_contains_periode_label(values).astype(bool).any(axis=1)).tolist()
+    return [r_idx for r_idx in candidates if PERIODE_RE.search(_row_text(values[r_idx]))]
+
+
+def index_report_layout(df_raw):
+    """
+    Membaca tata letak laporan sidik jari (Eppos/Tomoro) dalam satu kali jalan:
+    baris periode, baris nomor hari, dan batas setiap blok karyawan.
+
+    Melempar ValueError jika baris 'Periode' ditemukan tetapi tanggalnya tidak valid.
+    """
+    values = df_raw.to_numpy(dtype=object)
+    n_rows, n_cols = values.shape
+
+    period_row, start_date, end_date = -1, None, None
+    for r_idx in range(n_rows):
+        match = PERIODE_RE.search(_row_text(values[r_idx]))
+        if match:
+            start_date, end_date = parse_period(match)
+            period_row = r_idx
+            break
+
+    day_row = period_row + 1
+    day_columns = []
+    col_day_mapping = {}
+    if period_row != -1 and day_row < n_rows:
+        for c_idx, cell_val_day in enumerate(values[day_row]):
+            day_num = _parse_day_number(cell_val_day)
+            if day_num is None:
+                continue
+            day_columns.append((c_idx, day_num))
+            if 1 <= day_num <= 31:
+                col_day_mapping[day_num] = c_idx
+
+    # Baris header blok: 'No :' di kolom pertama atau kedua
+    is_block_start = np.zeros(n_rows, dtype=bool)
+    for c_idx in range(min(n_cols, 2)):
+        is_block_start |= _contains_no_label(values[:, c_idx]).astype(bool)
+    block_starts = np.flatnonzero(is_block_start).tolist()
+
+    blocks = []
+    for i, start_row in enumerate(block_starts):
+        end_row = block_starts[i + 1] if i + 1 < len(block_starts) else n_rows
+        blocks.append(EmployeeBlock(start_row, end_row, _find_employee_name(values[start_row])))
+
+    return ReportLayout(period_row, start_date, end_date, day_row, day_columns, col_day_mapping, blocks)
+
+
+def get_report_layout(df_raw, content_hash):
+    """
+    Versi ber-cache dari index_report_layout, dikunci dengan hash isi file sehingga
+    rerun Streamlit (mis. saat widget berubah) tidak membaca ulang tata letak.
+    """
+    layout = _LAYOUT_CACHE.get(content_hash)
+    if layout is not None:
+        _LAYOUT_CACHE.move_to_end(content_hash)
+        return layout
+
+    layout = index_report_layout(df_raw)
+    _LAYOUT_CACHE[content_hash] = layout
+    while len(_LAYOUT_CACHE) > _LAYOUT_CACHE_MAX_ENTRIES:
+        _LAYOUT_CACHE.popitem(last=False)
+    return layout
+
+
+def period_dates(start_date, end_date):
+    """Semua tanggal dari start_date sampai end_date (inklusif)."""
+    return [d.date() for d in pd.date_range(start_date, end_date, freq='D')]
+
+
+def map_dates_to_columns(day_columns, dates):
+    """
+    Mencocokkan tanggal periode secara berurutan dengan kolom nomor hari
+    (format Tomoro). Kolom yang nomornya tidak cocok dengan tanggal berikutnya dilewati.
+    """
+    col_date_mapping = {}
+    date_idx = 0
+    for c_idx, day_num in day_columns:
+        if date_idx >= len(dates):
+            break
+        if day_num == dates[date_idx].day:
+            col_date_mapping[dates[date_idx]] = c_idx
+            date_idx += 1
+    return col_date_mapping
@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+import numpy as np
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+DEFAULT_MAX_SHIFT_HOURS = 14
+DEFAULT_DUPLICATE_MINUTES = 2
+
+# Aturan pemasangan log masuk/pulang lintas hari (semua dalam detik)
+PairingRules = namedtuple('PairingRules', [
+    'max_shift_seconds',  # log dalam jendela ini sejak log masuk masih milik shift yang sama
+    'duplicate_seconds',  # log sedekat ini dengan log masuk dianggap tap ganda, bukan log pulang
+])
+
+# Hasil pemasangan: satu elemen per shift, indeks ke stream punch
+ShiftPairs = namedtuple('ShiftPairs', [
+    'employee_codes',  # kode karyawan pemilik shift
+    'start',           # indeks log masuk (log pertama shift)
+    'end',             # indeks setelah log terakhir shift; log shift = stream[start:end]
+    'out_idx',         # indeks log pulang (log terakhir di jendela), -1 jika tidak ada
+])
+
+
+def make_pairing_rules(max_shift_hours=DEFAULT_MAX_SHIFT_HOURS, duplicate_minutes=DEFAULT_DUPLICATE_MINUTES):
+    """PairingRules dari jam/menit; melempar ValueError jika nilainya tidak masuk akal."""
+    if not 0 < max_shift_hours < 24:
+        raise ValueError("Lama shift maksimum harus lebih dari 0 dan kurang dari 24 jam.")
+    if duplicate_minutes < 0 or duplicate_minutes * 60 >= max_shift_hours * 3600:
+        raise ValueError("Batas tap ganda harus 0 atau lebih dan lebih pendek dari lama shift maksimum.")
+    return PairingRules(int(max_shift_hours * 3600), int(duplicate_minutes * 60))
+
+
+def pair_punches(employee_codes, punch_seconds, rules):
+    """
+    Memasangkan log masuk/pulang dari stream punch seluruh periode, satu kali jalan linear.
+
+    Setiap karyawan diproses sebagai satu stream terurut (detik sejak awal periode), jadi shift
+    boleh melewati tengah malam. Mesin status: log pertama membuka shift; log berikutnya yang
+    masih di dalam jendela max_shift_seconds sejak log masuk menjadi kandidat log pulang (yang
+    terakhir menang); log pertama di luar jendela menutup shift dan membuka shift baru.
+
+    Args:
+        employee_codes (ndarray): Kode karyawan per punch.
+        punch_seconds (ndarray): Detik sejak awal periode per punch, terurut per karyawan lalu waktu.
+        rules (PairingRules): Jendela shift dan batas tap ganda.
+
+    Returns:
+        ShiftPairs: Array per shift, terurut seperti stream.
+    """
+    codes = np.asarray(employee_codes, dtype=np.int64).tolist()
+    seconds = np.asarray(punch_seconds, dtype=np.int64).tolist()
+    max_shift = rules.max_shift_seconds
+    duplicate = rules.duplicate_seconds
+
+    shift_codes, starts, outs = [], [], []
+    current_code, in_seconds = None, 0
+    for i, (code, t) in enumerate(zip(codes, seconds)):
+        if code == current_code and t - in_seconds <= max_shift:
+            # Masih di jendela shift: log terakhir di luar batas tap ganda menjadi log pulang
+            if t - in_seconds > duplicate:
+                outs[-1] = i
+            continue
+        # Karyawan lain atau sudah di luar jendela: shift sebelumnya selesai, log ini membuka shift baru
+        current_code, in_seconds = code, t
+        shift_codes.append(code)
+        starts.append(i)
+        outs.append(-1)
+
+    start = np.asarray(starts, dtype=np.int64)
+    end = np.append(start[1:], len(seconds)).astype(np.int64)
+    return ShiftPairs(np.asarray(shift_codes, dtype=np.int64), start, end, np.asarray(outs, dtype=np.int64))
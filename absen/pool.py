@@ -0,0 +1,21 @@
+import multiprocessing
+
+# Worker tidak dibuat dengan fork: pemanggilnya (server Streamlit, thread pool process_report_sections)
+# punya banyak thread, dan fork dari proses multi-thread bisa deadlock pada lock yang sedang dipegang.
+# Forkserver memuat paket absen (dan numpy/pandas) sekali, worker di-fork dari sana
+POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Modul yang dimuat forkserver sebelum mem-fork worker. Python 3.11 mengabaikan sys.path induk di
+# forkserver, jadi preload hanya berlaku jika paket bisa diimpor dari direktori kerja (root repo)
+_FORKSERVER_PRELOAD = ['absen']
+
+
+def process_pool_context():
+    """
+    Konteks multiprocessing untuk semua ProcessPoolExecutor di paket ini (mp_context=...).
+    Satu forkserver dipakai bersama oleh pool batch (run_jobs) dan klasifikasi shift paralel.
+    """
+    context = multiprocessing.get_context(POOL_START_METHOD)
+    if POOL_START_METHOD == 'forkserver':
+        context.set_forkserver_preload(_FORKSERVER_PRELOAD)
+    return context
@@ -0,0 +1,172 @@
+"""
+Pencatatan lama (dan opsional puncak memori) setiap tahap pengolahan absensi.
+
+Tahap dicatat dengan stage(timings, nama) ke dict nama -> detik. Trace JSON dari build_trace/save_trace
+bisa dibandingkan antar versi kode:
+
+    python benchmarks/compare_traces.py trace_lama.json trace_baru.json
+"""
+
+import json
+import os
+import platform
+import subprocess
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+
+import pandas as pd
+
+TRACE_FORMAT_VERSION = 1
+
+# Urutan dan label tahap di panel profil dan --profile
+STAGE_LABELS = {
+    'baca_excel': 'Baca Excel (read_excel)',
+    'tata_letak': 'Periode, nomor hari & blok karyawan',
+    'hash_sel': 'Hash sel (mode inkremental)',
+    'ekstraksi': 'Parsing token jam',
+    'aturan_shift': 'Aturan shift / pemasangan log',
+    'rekap': 'Susun DataFrame rekap',
+    'ekspor': 'Ekspor Excel (openpyxl)',
+    'dataset': 'Ekspor dataset Parquet/Arrow',
+}
+
+
+@contextmanager
+def stage(timings, name, memory=None):
+    """
+    Mencatat lama satu tahap pengolahan ke timings[name] (detik), jika timings diberikan.
+    Jika memory (dict) diberikan dan tracemalloc aktif (lihat memory_tracing), puncak memori
+    yang dialokasikan selama tahap (byte) dicatat ke memory[name].
+    """
+    tracing = memory is not None and tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + perf_counter() - started
+        if tracing:
+            memory[name] = max(memory.get(name, 0), tracemalloc.get_traced_memory()[1] - baseline)
+
+
+@contextmanager
+def memory_tracing(enabled=True):
+    """Menyalakan tracemalloc selama blok jika enabled (dan belum menyala). Pengolahan jadi beberapa kali lebih lambat."""
+    started_here = enabled and not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+
+def ordered_stages(names):
+    """Nama tahap sesuai urutan STAGE_LABELS, tahap lain di belakang (urut abjad)."""
+    names = set(names)
+    return [name for name in STAGE_LABELS if name in names] + sorted(names - set(STAGE_LABELS))
+
+
+def _code_version():
+    # Commit git kode yang sedang berjalan, None jika bukan checkout git
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def build_trace(label, timings, memory=None, info=None):
+    """
+    Trace JSON-able satu kali pengolahan: versi kode/lingkungan dan daftar tahap.
+
+    Args:
+        label (str): Nama pengolahan, mis. 'eppos' atau nama halaman.
+        timings (dict): Tahap -> detik (dari stage).
+        memory (dict): Tahap -> puncak memori (byte), opsional.
+        info (dict): Keterangan tambahan, mis. nama file dan jumlah baris.
+    """
+    memory = memory or {}
+    return {
+        'format': TRACE_FORMAT_VERSION,
+        'label': label,
+        'dibuat': datetime.now().isoformat(timespec='seconds'),
+        'versi_kode': _code_version(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'info': info or {},
+        'tahap': [
+            {'nama': name, 'detik': round(timings.get(name, 0.0), 6), 'memori_puncak_byte': memory.get(name)}
+            for name in ordered_stages(list(timings) + list(memory))
+        ],
+        'total_detik': round(sum(timings.values()), 6),
+    }
+
+
+def trace_frame(trace):
+    """DataFrame tahap trace untuk ditampilkan: label, detik, persen dari total, puncak memori (MB)."""
+    total = trace['total_detik'] or 1.0
+    return pd.DataFrame([
+        {
+            'Tahap': STAGE_LABELS.get(row['nama'], row['nama']),
+            'Detik': row['detik'],
+            '% Total': round(100 * row['detik'] / total, 1),
+            'Memori Puncak (MB)': (
+                None if row['memori_puncak_byte'] is None else round(row['memori_puncak_byte'] / (1024 * 1024), 2)
+            ),
+        }
+        for row in trace['tahap']
+    ])
+
+
+def save_trace(trace, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(trace, f, indent=2, ensure_ascii=False)
+
+
+def load_trace(source):
+    """Trace dari path atau file-like (mis. hasil st.file_uploader). Melempar ValueError jika bukan trace."""
+    try:
+        if hasattr(source, 'read'):
+            trace = json.loads(source.read())
+        else:
+            with open(source, encoding='utf-8') as f:
+                trace = json.load(f)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"File trace tidak dapat dibaca: {e}")
+    if not isinstance(trace, dict) or not isinstance(trace.get('tahap'), list):
+        raise ValueError("File bukan trace profil absensi (kunci 'tahap' tidak ada).")
+    return trace
+
+
+def compare_traces(old, new):
+    """
+    Perbandingan dua trace per tahap.
+
+    Returns:
+        DataFrame: Tahap, detik lama, detik baru, rasio (baru / lama), plus baris TOTAL.
+    """
+    old_seconds = {row['nama']: row['detik'] for row in old['tahap']}
+    new_seconds = {row['nama']: row['detik'] for row in new['tahap']}
+    rows = [(STAGE_LABELS.get(name, name), old_seconds.get(name), new_seconds.get(name))
+            for name in ordered_stages(list(old_seconds) + list(new_seconds))]
+    rows.append(('TOTAL', old['total_detik'], new['total_detik']))
+    return pd.DataFrame([
+        {
+            'Tahap': label,
+            'Lama (detik)': old_value,
+            'Baru (detik)': new_value,
+            'Rasio': round(new_value / old_value, 2) if old_value and new_value is not None else None,
+        }
+        for label, old_value, new_value in rows
+    ])
+
@@ -0,0 +1,102 @@
+import io
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from absen.layout import find_period_rows
+
+# Satu workbook mesin bisa berisi satu sheet per departemen, dan satu sheet bisa berisi beberapa
+# periode bertumpuk (masing-masing diawali baris 'Periode'). Setiap bagian diolah sebagai laporan
+# tersendiri lalu rekapnya digabung dengan kolom 'Bagian'.
+ReportSection = namedtuple('ReportSection', [
+    'label',   # nama sheet, ditambah ' - periode N' jika sheet berisi beberapa periode
+    'sheet',   # nama sheet asal
+    'df_raw',  # DataFrame mentah bagian ini (seperti pd.read_excel(header=None)), indeks baris mulai 0
+])
+
+SECTION_COLUMN = 'Bagian'
+
+
+def section_label(sheet_name, period_index, period_count):
+    """Label bagian: nama sheet, ditambah ' - periode N' (period_index mulai 0) jika sheet berisi beberapa periode."""
+    return sheet_name if period_count <= 1 else f"{sheet_name} - periode {period_index + 1}"
+
+
+def read_report_sheets(file_bytes, max_workers=1):
+    """
+    Semua sheet workbook sebagai list (nama_sheet, DataFrame mentah), sesuai urutan sheet.
+
+    Default (max_workers=1) semua sheet dibaca dari satu pd.ExcelFile. Dengan max_workers > 1 (None =
+    jumlah CPU) sheet dibaca di thread pool, satu pd.read_excel per sheet; setiap thread membuka ulang
+    workbook (termasuk sharedStrings) dan parsing XML openpyxl tetap memegang GIL, sehingga pada
+    4 sheet x 500 karyawan di satu CPU cara ini 2x lebih lambat. Hanya layak dicoba di mesin multi-core.
+    """
+    with pd.ExcelFile(io.BytesIO(file_bytes)) as excel_file:
+        sheet_names = excel_file.sheet_names
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, len(sheet_names)))
+        if max_workers == 1:
+            return [(name, excel_file.parse(name, header=None)) for name in sheet_names]
+
+    def read_sheet(name):
+        return pd.read_excel(io.BytesIO(file_bytes), sheet_name=name, header=None)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(zip(sheet_names, executor.map(read_sheet, sheet_names)))
+
+
+def split_report_sections(sheet_name, df_raw, period_rows=None):
+    """
+    Memecah satu sheet di setiap baris 'Periode' (period_rows, default dicari dengan find_period_rows).
+    Baris sebelum periode pertama (judul laporan) ikut bagian pertama. Sheet tanpa atau dengan satu
+    baris 'Periode' menjadi satu bagian utuh.
+    """
+    if period_rows is None:
+        period_rows = find_period_rows(df_raw)
+    if len(period_rows) <= 1:
+        return [ReportSection(sheet_name, sheet_name, df_raw)]
+    bounds = [0] + period_rows[1:] + [len(df_raw)]
+    return [
+        ReportSection(
+            section_label(sheet_name, i, len(period_rows)), sheet_name, df_raw.iloc[start:end].reset_index(drop=True)
+        )
+        for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:]))
+    ]
+
+
+def read_report_sections(file_bytes, max_workers=1):
+    """
+    Semua bagian laporan (sheet x periode) dalam satu workbook. Sheet tanpa baris 'Periode'
+    (mis. sheet keterangan) dilewati; jika tidak ada sheet yang berisi periode, sheet pertama
+    dikembalikan apa adanya agar pesan error format laporan tetap muncul seperti biasa.
+    max_workers diteruskan ke read_report_sheets.
+    """
+    sheets = read_report_sheets(file_bytes, max_workers)
+    sections = []
+    for sheet_name, df_raw in sheets:
+        period_rows = find_period_rows(df_raw)
+        if period_rows:
+            sections.extend(split_report_sections(sheet_name, df_raw, period_rows))
+    if not sections:
+        sheet_name, df_raw = sheets[0]
+        sections = [ReportSection(sheet_name, sheet_name, df_raw)]
+    return sections
+
+
+def merge_section_rekaps(section_rekaps):
+    """
+    Menggabungkan rekap per bagian (list pasangan (ReportSection, DataFrame)) sesuai urutan bagian.
+    Kolom 'Bagian' (label bagian) disisipkan sebelum 'Nama', dan kolom 'No' (rekap Eppos) dinomori ulang.
+    """
+    frames = []
+    for section, rekap in section_rekaps:
+        rekap = rekap.copy()
+        rekap.insert(rekap.columns.get_loc('Nama'), SECTION_COLUMN, section.label)
+        frames.append(rekap)
+    merged = pd.concat(frames, ignore_index=True)
+    if 'No' in merged.columns:
+        merged['No'] = range(1, len(merged) + 1)
+    return merged
@@ -0,0 +1,304 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from absen.pool import process_pool_context
+
+RULES_DIR = os.path.join(os.path.dirname(__file__), 'rules')
+DEFAULT_RULES_PATH = os.path.join(RULES_DIR, 'eppos_default.json')
+
+# Semua jam disimpan sebagai mikrodetik sejak tengah malam (int64)
+US_PER_SECOND = 1_000_000
+US_PER_DAY = 24 * 60 * 60 * US_PER_SECOND
+
+# Aturan shift yang sudah dikompilasi: setiap jendela berupa array (N, 2) [mulai, selesai] inklusif
+ShiftRules = namedtuple('ShiftRules', [
+    'name',
+    'arrival_windows',    # urutan prioritas Jam Datang (log paling awal di jendela pertama yang cocok)
+    'departure_windows',  # urutan prioritas Jam Pulang (log paling akhir di jendela pertama yang cocok)
+    'break_windows',      # jendela istirahat, sudah diurutkan dan digabung jika tumpang tindih
+    'max_break_gap_us',   # jeda maksimum antar log istirahat sebelum Jam Pulang tidak dianggap selesai istirahat
+    'overnight_cutoff_us',  # log sebelum jam ini (dan sebelum Jam Datang) dianggap milik hari berikutnya
+])
+
+# Klasifikasi dibagi ke beberapa proses hanya jika jumlah hari (karyawan x tanggal) minimal sebanyak ini;
+# di bawahnya biaya membuat pool dan mengirim array lebih besar dari waktu klasifikasinya sendiri
+PARALLEL_MIN_DAYS = 100_000
+
+# Hasil klasifikasi per hari: indeks ke array punch (-1 jika tidak ada) dan durasi dalam mikrodetik (-1 jika kosong)
+DayClassification = namedtuple('DayClassification', [
+    'arrival_idx', 'departure_idx', 'break_start_idx', 'break_end_idx', 'work_us', 'break_us',
+])
+
+
+def _parse_clock(value):
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            parsed = datetime.strptime(value, fmt)
+            return (parsed.hour * 3600 + parsed.minute * 60 + parsed.second) * US_PER_SECOND
+        except (ValueError, TypeError):
+            continue
+    raise ValueError(f"Format jam '{value}' tidak valid, gunakan HH:MM atau HH:MM:SS.")
+
+
+def _compile_windows(windows, key):
+    if not windows:
+        raise ValueError(f"Aturan shift harus memiliki minimal satu jendela '{key}'.")
+    compiled = []
+    for window in windows:
+        start, end = _parse_clock(window['start']), _parse_clock(window['end'])
+        if start > end:
+            raise ValueError(f"Jendela '{key}' {window['start']} ~ {window['end']} melewati tengah malam; pecah menjadi dua jendela.")
+        compiled.append((start, end))
+    return np.array(compiled, dtype=np.int64).reshape(-1, 2)
+
+
+def _merge_windows(windows):
+    merged = []
+    for start, end in sorted(windows.tolist()):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return np.array(merged, dtype=np.int64).reshape(-1, 2)
+
+
+def compile_shift_rules(config):
+    """
+    Mengubah konfigurasi aturan shift (dict dari JSON) menjadi ShiftRules.
+    Melempar ValueError jika konfigurasi tidak lengkap atau formatnya salah.
+    """
+    try:
+        return ShiftRules(
+            name=config.get('name', 'Tanpa nama'),
+            arrival_windows=_compile_windows(config['arrival_windows'], 'arrival_windows'),
+            departure_windows=_compile_windows(config['departure_windows'], 'departure_windows'),
+            break_windows=_merge_windows(_compile_windows(config['break_windows'], 'break_windows')),
+            max_break_gap_us=int(config.get('max_continuous_break_gap_minutes', 60)) * 60 * US_PER_SECOND,
+            overnight_cutoff_us=_parse_clock(config.get('overnight_log_cutoff', '05:00:00')),
+        )
+    except KeyError as e:
+        raise ValueError(f"Aturan shift tidak memiliki kunci {e}.") from e
+
+
+def load_shift_rules(source):
+    """
+    Memuat aturan shift dari path file JSON atau objek file (mis. hasil st.file_uploader).
+    """
+    if hasattr(source, 'read'):
+        raw = source.read()
+        return _load_shift_rules_from_text(raw.decode('utf-8') if isinstance(raw, bytes) else raw)
+    return _load_shift_rules_from_path(os.path.abspath(source))
+
+
+@lru_cache(maxsize=32)
+def _load_shift_rules_from_path(path):
+    with open(path, encoding='utf-8') as f:
+        return _load_shift_rules_from_text(f.read())
+
+
+@lru_cache(maxsize=32)
+def _load_shift_rules_from_text(text):
+    try:
+        config = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"File aturan shift bukan JSON yang valid: {e}") from e
+    return compile_shift_rules(config)
+
+
+def shift_rules_fingerprint(rules):
+    """Hash isi aturan shift yang sudah dikompilasi, dipakai sebagai bagian kunci cache hasil."""
+    digest = hashlib.sha256(rules.name.encode('utf-8'))
+    for windows in (rules.arrival_windows, rules.departure_windows, rules.break_windows):
+        digest.update(windows.tobytes())
+        digest.update(b'|')
+    digest.update(f"{rules.max_break_gap_us}|{rules.overnight_cutoff_us}".encode('ascii'))
+    return digest.hexdigest()
+
+
+def list_rule_sets():
+    """Aturan shift bawaan di folder absen/rules: dict nama -> path file."""
+    rule_sets = {}
+    for file_name in sorted(os.listdir(RULES_DIR)):
+        if file_name.endswith('.json'):
+            path = os.path.join(RULES_DIR, file_name)
+            rule_sets[_load_shift_rules_from_path(path).name] = path
+    return rule_sets
+
+
+def times_to_us(times):
+    """Mengubah list datetime.time menjadi array int64 mikrodetik sejak tengah malam."""
+    return np.fromiter(
+        (((t.hour * 60 + t.minute) * 60 + t.second) * US_PER_SECOND + t.microsecond for t in times),
+        dtype=np.int64,
+        count=len(times),
+    )
+
+
+def _first_in_window(composite, day_base, group_end, start, end):
+    idx = np.searchsorted(composite, day_base + start, side='left')
+    safe = np.minimum(idx, composite.size - 1)
+    found = (idx < group_end) & (composite[safe] <= day_base + end)
+    return np.where(found, idx, -1)
+
+
+def _last_in_window(composite, day_base, group_start, start, end):
+    idx = np.searchsorted(composite, day_base + end, side='right') - 1
+    safe = np.maximum(idx, 0)
+    found = (idx >= group_start) & (composite[safe] >= day_base + start)
+    return np.where(found, idx, -1)
+
+
+def classify_punches(day_offsets, punch_us, rules):
+    """
+    Menentukan Jam Datang, Jam Pulang, dan istirahat untuk semua hari sekaligus.
+
+    Args:
+        day_offsets (ndarray): Offset gaya CSR, panjang n_hari + 1; punch hari ke-i
+            ada di punch_us[day_offsets[i]:day_offsets[i + 1]].
+        punch_us (ndarray): Jam punch (mikrodetik sejak tengah malam), terurut di dalam setiap hari.
+        rules (ShiftRules): Aturan shift yang sudah dikompilasi.
+
+    Returns:
+        DayClassification: Array per hari, berisi indeks ke punch_us (-1 jika tidak ada).
+    """
+    day_offsets = np.asarray(day_offsets, dtype=np.int64)
+    punch_us = np.asarray(punch_us, dtype=np.int64)
+    n_days = day_offsets.size - 1
+    group_start = day_offsets[:-1]
+    group_end = day_offsets[1:]
+    has_punch = group_end > group_start
+
+    if punch_us.size == 0:
+        missing = np.full(n_days, -1, dtype=np.int64)
+        return DayClassification(missing, missing, missing, missing, missing, missing)
+
+    # Kunci gabungan hari + jam agar satu searchsorted berlaku untuk semua hari
+    day_base = np.arange(n_days, dtype=np.int64) * US_PER_DAY
+    composite = np.repeat(day_base, group_end - group_start) + punch_us
+
+    # Jam Datang: log paling awal di jendela prioritas pertama yang cocok, jika tidak ada ambil log pertama
+    arrival_idx = np.full(n_days, -1, dtype=np.int64)
+    for start, end in rules.arrival_windows.tolist():
+        candidate = _first_in_window(composite, day_base, group_end, start, end)
+        arrival_idx = np.where(arrival_idx < 0, candidate, arrival_idx)
+    arrival_idx = np.where((arrival_idx < 0) & has_punch, group_start, arrival_idx)
+
+    # Jam Pulang: log paling akhir di jendela prioritas pertama yang cocok
+    departure_idx = np.full(n_days, -1, dtype=np.int64)
+    for start, end in rules.departure_windows.tolist():
+        candidate = _last_in_window(composite, day_base, group_start, start, end)
+        departure_idx = np.where(departure_idx < 0, candidate, departure_idx)
+
+    arrival_us = np.where(arrival_idx >= 0, punch_us[np.maximum(arrival_idx, 0)], -1)
+    departure_us = np.where(departure_idx >= 0, punch_us[np.maximum(departure_idx, 0)], -1)
+
+    # Log istirahat harus setelah Jam Datang dan paling lambat Jam Pulang (atau log terakhir).
+    # Shift malam (batas akhir lebih awal dari Jam Datang): log setelah Jam Datang, ditambah log dini hari
+    # (sebelum overnight_cutoff) sampai batas akhir yang dianggap milik hari berikutnya.
+    last_us = punch_us[np.maximum(group_end - 1, 0)]
+    effective_end_us = np.where(departure_idx >= 0, departure_us, last_us)
+    overnight = effective_end_us < arrival_us
+    candidate_ranges = [
+        (np.zeros(n_days, dtype=np.int64),
+         np.where(overnight, np.minimum(effective_end_us, rules.overnight_cutoff_us - 1), -1)),
+        (arrival_us + 1, np.where(overnight, US_PER_DAY - 1, effective_end_us)),
+    ]
+
+    break_first = np.full(n_days, -1, dtype=np.int64)
+    break_last = np.full(n_days, -1, dtype=np.int64)
+    break_second_last = np.full(n_days, -1, dtype=np.int64)
+    break_count = np.zeros(n_days, dtype=np.int64)
+    for lower, upper in candidate_ranges:
+        for start, end in rules.break_windows.tolist():
+            window_start = np.maximum(start, lower)
+            window_end = np.minimum(end, upper)
+            first = _first_in_window(composite, day_base, group_end, window_start, window_end)
+            last = _last_in_window(composite, day_base, group_start, window_start, window_end)
+            found = has_punch & (first >= 0) & (last >= first)
+            count = np.where(found, last - first + 1, 0)
+
+            break_first = np.where((break_first < 0) & found, first, break_first)
+            break_second_last = np.where(found, np.where(count >= 2, last - 1, break_last), break_second_last)
+            break_last = np.where(found, last, break_last)
+            break_count += count
+
+    # Selesai istirahat: log istirahat terakhir, kecuali jika itu adalah Jam Pulang dan jaraknya
+    # dari log istirahat sebelumnya terlalu jauh
+    break_last_us = punch_us[np.maximum(break_last, 0)]
+    break_second_last_us = punch_us[np.maximum(break_second_last, 0)]
+    use_second_last = (
+        (break_count >= 2)
+        & (departure_idx >= 0)
+        & (break_last_us == departure_us)
+        & (break_last_us - break_second_last_us > rules.max_break_gap_us)
+    )
+    break_start_idx = break_first
+    break_end_idx = np.where(use_second_last, break_second_last, break_last)
+
+    work_us = np.where(departure_idx >= 0, departure_us - arrival_us, -1)
+    work_us = np.where((departure_idx >= 0) & (work_us < 0), work_us + US_PER_DAY, work_us)
+    break_us = np.where(
+        break_start_idx >= 0,
+        punch_us[np.maximum(break_end_idx, 0)] - punch_us[np.maximum(break_start_idx, 0)],
+        -1,
+    )
+    break_us = np.where((break_start_idx >= 0) & (break_us < 0), break_us + US_PER_DAY, break_us)
+
+    return DayClassification(arrival_idx, departure_idx, break_start_idx, break_end_idx, work_us, break_us)
+
+
+def _classify_chunk(day_offsets, punch_us, rules):
+    # Dijalankan di proses worker; indeks punch lokal terhadap potongan dikirim balik sebagai int32
+    result = classify_punches(day_offsets, punch_us, rules)
+    return result._replace(**{
+        field: getattr(result, field).astype(np.int32)
+        for field in ('arrival_idx', 'departure_idx', 'break_start_idx', 'break_end_idx')
+    })
+
+
+def classify_punches_parallel(day_offsets, punch_us, rules, days_per_group=1, max_workers=None):
+    """
+    Seperti classify_punches, tetapi hari-hari dibagi menjadi potongan yang diklasifikasi paralel
+    di ProcessPoolExecutor. Potongan tidak memotong grup days_per_group hari (mis. semua tanggal
+    satu karyawan). Jika jumlah hari di bawah PARALLEL_MIN_DAYS, hanya ada satu CPU, atau sudah
+    berjalan di proses worker (mis. mode batch, satu file per proses), classify_punches langsung
+    dijalankan di proses ini.
+    """
+    day_offsets = np.asarray(day_offsets, dtype=np.int64)
+    punch_us = np.asarray(punch_us, dtype=np.int64)
+    n_days = day_offsets.size - 1
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    n_groups = n_days // max(days_per_group, 1)
+    max_workers = max(1, min(max_workers, n_groups))
+    if max_workers == 1 or n_days < PARALLEL_MIN_DAYS or multiprocessing.parent_process() is not None:
+        return classify_punches(day_offsets, punch_us, rules)
+
+    # Dua potongan per worker agar worker yang selesai lebih dulu tidak menganggur
+    bounds = np.linspace(0, n_groups, 2 * max_workers + 1).astype(np.int64) * days_per_group
+    bounds[-1] = n_days
+    chunks = [(start, end) for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()) if end > start]
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context()) as executor:
+        results = list(executor.map(
+            _classify_chunk,
+            [day_offsets[start:end + 1] - day_offsets[start] for start, end in chunks],
+            [punch_us[day_offsets[start]:day_offsets[end]] for start, end in chunks],
+            [rules] * len(chunks),
+        ))
+
+    fields = {}
+    for field in DayClassification._fields:
+        parts = [getattr(result, field).astype(np.int64) for result in results]
+        if field.endswith('_idx'):
+            # Indeks lokal potongan -> indeks ke punch_us penuh
+            parts = [np.where(part >= 0, part + day_offsets[start], -1) for part, (start, _) in zip(parts, chunks)]
+        fields[field] = np.concatenate(parts)
+    return DayClassification(**fields)
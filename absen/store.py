@@ -0,0 +1,100 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from absen.timeparse import US_PER_SECOND, key_to_time
+
+# Penyimpanan log harian secara kolumnar. Satu "slot" = satu karyawan pada satu tanggal,
+# slot = kode_karyawan * jumlah_tanggal + indeks_tanggal, diurutkan per nama lalu tanggal.
+# Jam punch slot ke-i ada di punch_seconds[day_offsets[i]:day_offsets[i + 1]] (gaya CSR).
+AttendanceStore = namedtuple('AttendanceStore', [
+    'names',           # nama karyawan unik, terurut (kategori untuk employee_codes)
+    'dates',           # semua tanggal dalam periode
+    'employee_codes',  # int32 per slot: indeks ke names
+    'day_offsets',     # int64, panjang jumlah slot + 1
+    'punch_seconds',   # int32 detik sejak tengah malam, terurut di dalam setiap slot
+    'raw_logs',        # object per slot: teks 'Log Jam Mentah' ('' jika tidak ada log)
+])
+
+
+def build_attendance_store(names, dates, punch_slots, punch_seconds, raw_logs):
+    """
+    Menyusun AttendanceStore dari punch yang belum terurut.
+
+    Args:
+        names (list): Nama karyawan unik, terurut.
+        dates (list): Semua tanggal dalam periode.
+        punch_slots (ndarray): Slot setiap punch.
+        punch_seconds (ndarray): Detik sejak tengah malam setiap punch.
+        raw_logs (ndarray): Teks 'Log Jam Mentah' per slot (object, panjang len(names) * len(dates)).
+    """
+    n_slots = len(names) * len(dates)
+    punch_slots = np.asarray(punch_slots, dtype=np.int64)
+    punch_seconds = np.asarray(punch_seconds, dtype=np.int32)
+    order = np.lexsort((punch_seconds, punch_slots))
+
+    day_offsets = np.zeros(n_slots + 1, dtype=np.int64)
+    np.cumsum(np.bincount(punch_slots, minlength=n_slots), out=day_offsets[1:])
+    employee_codes = np.repeat(np.arange(len(names), dtype=np.int32), len(dates))
+    return AttendanceStore(list(names), list(dates), employee_codes, day_offsets, punch_seconds[order], raw_logs)
+
+
+def store_from_daily_logs(logs_per_day, employee_blocks, dates):
+    """
+    AttendanceStore dari dict (nama, tanggal) -> (list datetime.time, 'Log Jam Mentah'),
+    mis. hasil mode streaming. Detik pecahan (mikrodetik) dibuang.
+    """
+    names = sorted({block.name for block in employee_blocks})
+    name_codes = {name: code for code, name in enumerate(names)}
+    date_index = {single_date: i for i, single_date in enumerate(dates)}
+
+    raw_logs = np.full(len(names) * len(dates), '', dtype=object)
+    punch_slots = []
+    punch_seconds = []
+    for (name, single_date), (times, raw_log_str) in logs_per_day.items():
+        slot = name_codes[name] * len(dates) + date_index[single_date]
+        raw_logs[slot] = raw_log_str
+        punch_slots.extend([slot] * len(times))
+        punch_seconds.extend(t.hour * 3600 + t.minute * 60 + t.second for t in times)
+    return build_attendance_store(names, dates, punch_slots, punch_seconds, raw_logs)
+
+
+def store_has_punches(store):
+    """True jika ada minimal satu log jam di store."""
+    return store.punch_seconds.size > 0
+
+
+def store_nbytes(store):
+    """Ukuran array numerik store (byte), tanpa nama, tanggal, dan teks mentah."""
+    return store.employee_codes.nbytes + store.day_offsets.nbytes + store.punch_seconds.nbytes
+
+
+def seconds_to_times(seconds, indices):
+    """
+    Objek datetime.time untuk seconds[indices] (None untuk indeks -1).
+    Setiap nilai jam unik hanya dibuat sekali.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    result = np.full(indices.size, None, dtype=object)
+    found = indices >= 0
+    if not found.any():
+        return result
+    unique_seconds, inverse = np.unique(seconds[indices[found]], return_inverse=True)
+    unique_times = np.array([key_to_time(int(s) * US_PER_SECOND) for s in unique_seconds], dtype=object)
+    result[found] = unique_times[inverse]
+    return result
+
+
+def store_punch_frame(store, limit=None):
+    """DataFrame (Nama, Tanggal, Jam) satu baris per punch, terurut per nama, tanggal, jam."""
+    n_punches = store.punch_seconds.size if limit is None else min(limit, store.punch_seconds.size)
+    punch_index = np.arange(n_punches)
+    punch_slot = np.searchsorted(store.day_offsets, punch_index, side='right') - 1
+    names = np.array(store.names, dtype=object)
+    dates = np.array(store.dates, dtype=object)
+    return pd.DataFrame({
+        'Nama': names[store.employee_codes[punch_slot]],
+        'Tanggal': dates[punch_slot % len(store.dates)],
+        'Jam': seconds_to_times(store.punch_seconds, punch_index),
+    })
@@ -0,0 +1,343 @@
+from openpyxl import load_workbook
+import pandas as pd
+
+from absen.batch import _merge_section_outcomes, _unnamed_block_warnings
+from absen.eppos import build_eppos_rekap, extract_block_logs, merge_block_logs
+from absen.layout import (
+    PERIODE_RE,
+    EmployeeBlock,
+    ReportLayout,
+    _find_employee_name,
+    _parse_day_number,
+    _row_text,
+    map_dates_to_columns,
+    parse_period,
+    period_dates,
+)
+from absen.pairing import PairingRules
+from absen.profiling import stage
+from absen.sections import ReportSection, section_label
+from absen.shift_rules import DEFAULT_RULES_PATH, load_shift_rules
+from absen.store import store_from_daily_logs, store_has_punches
+from absen.tomoro import build_tomoro_rekap, build_tomoro_rekap_overnight, extract_block_punches
+
+# Jumlah baris yang diproses sekaligus; memori puncak dibatasi oleh ukuran ini, bukan ukuran sheet
+DEFAULT_CHUNK_ROWS = 2000
+
+# Ukuran file .xlsx yang secara default memakai mode streaming di halaman Streamlit
+STREAMING_AUTO_THRESHOLD_BYTES = 10 * 1024 * 1024
+
+
+def _normalize_cell(value):
+    # Samakan dengan pd.read_excel: sel kosong -> NaN, angka bulat -> int
+    if value is None:
+        return float('nan')
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _is_block_start(row):
+    return any('No :' in str(v) for v in row[:2])
+
+
+def iter_sheet_rows(file_obj):
+    """
+    Membaca sheet pertama baris demi baris dengan openpyxl read_only,
+    tanpa memuat seluruh workbook ke DataFrame.
+    """
+    wb = load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        for row in ws.iter_rows(values_only=True):
+            yield tuple(_normalize_cell(v) for v in row)
+    finally:
+        wb.close()
+
+
+def iter_workbook_sheets(file_obj):
+    """
+    Semua sheet workbook sebagai (nama_sheet, iterator baris), sesuai urutan sheet, dibaca dengan
+    openpyxl read_only seperti iter_sheet_rows. Iterator baris satu sheet harus dipakai sebelum sheet berikutnya.
+    """
+    wb = load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            yield ws.title, (tuple(_normalize_cell(v) for v in row) for row in ws.iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def _is_period_row(row):
+    # Sama seperti find_period_rows: regex hanya dicoba pada baris yang punya sel teks berisi 'Periode'
+    return any(isinstance(v, str) and 'Periode' in v for v in row) and PERIODE_RE.search(_row_text(row)) is not None
+
+
+def iter_report_streams(rows):
+    """
+    Memecah iterator baris satu sheet di setiap baris 'Periode', seperti absen.sections.split_report_sections.
+
+    Yields:
+        tuple: (ReportLayout dengan blocks=None, iterator (indeks_baris, baris)) per periode. Iterator baris
+        dimulai dari baris nomor hari dan berhenti sebelum baris 'Periode' berikutnya; baris yang belum
+        dibaca saat periode berikutnya diminta dilewati. Melempar ValueError jika tanggal 'Periode' tidak valid.
+    """
+    rows = enumerate(rows)
+    next_period = None  # (indeks_baris, baris) 'Periode' yang sudah terbaca oleh iterator periode sebelumnya
+
+    def section_rows():
+        nonlocal next_period
+        for r_idx, row in rows:
+            if _is_period_row(row):
+                next_period = (r_idx, row)
+                return
+            yield r_idx, row
+
+    while True:
+        if next_period is None:
+            # Baris sebelum periode pertama (judul laporan) atau sisa periode sebelumnya yang tidak dibaca
+            next_period = next(((r_idx, row) for r_idx, row in rows if _is_period_row(row)), None)
+            if next_period is None:
+                return
+        (period_row, row), next_period = next_period, None
+        start_date, end_date = parse_period(PERIODE_RE.search(_row_text(row)))
+
+        day_columns = []
+        col_day_mapping = {}
+        indexed_rows = section_rows()
+        day_row = next(indexed_rows, None)
+        if day_row is not None:
+            for c_idx, cell_val_day in enumerate(day_row[1]):
+                day_num = _parse_day_number(cell_val_day)
+                if day_num is None:
+                    continue
+                day_columns.append((c_idx, day_num))
+                if 1 <= day_num <= 31:
+                    col_day_mapping[day_num] = c_idx
+            # Baris nomor hari tetap dikembalikan ke iterator untuk deteksi blok
+            indexed_rows = _chain_first(day_row, indexed_rows)
+        layout = ReportLayout(period_row, start_date, end_date, period_row + 1, day_columns, col_day_mapping, None)
+        yield layout, indexed_rows
+
+
+def open_report_stream(rows):
+    """
+    Membaca bagian atas laporan (baris 'Periode' dan baris nomor hari) dari iterator baris.
+    Hanya periode pertama; lihat iter_report_streams untuk sheet berisi beberapa periode.
+
+    Returns:
+        tuple: (ReportLayout dengan blocks=None, iterator (indeks_baris, baris) sampai sebelum periode berikutnya).
+        Melempar ValueError jika tanggal 'Periode' tidak valid.
+    """
+    return next(iter_report_streams(rows), (ReportLayout(-1, None, None, 0, [], {}, None), iter(())))
+
+
+def _chain_first(first, rest):
+    yield first
+    yield from rest
+
+
+def iter_block_chunks(indexed_rows, chunk_rows=DEFAULT_CHUNK_ROWS, lookahead_rows=2):
+    """
+    Mengelompokkan baris menjadi potongan berisi blok-blok karyawan utuh.
+
+    Setiap potongan berisi (blocks, first_row_idx, rows): blocks memakai indeks baris
+    absolut, dan rows menyertakan hingga `lookahead_rows` baris setelah blok terakhir
+    (dibutuhkan aturan "tiga sel kosong berturut-turut" pada format Eppos).
+    Baris kosong di akhir sheet dibuang, sama seperti pd.read_excel.
+    """
+    buffer = []          # baris mulai dari header blok pertama yang belum dikirim
+    buffer_first = None  # indeks baris absolut untuk buffer[0]
+    block_starts = []    # indeks absolut header blok di dalam buffer
+    trailing_empty = 0
+
+    def flush(n_complete, end_row):
+        blocks = []
+        for i in range(n_complete):
+            start_row = block_starts[i]
+            block_end = block_starts[i + 1] if i + 1 < len(block_starts) else end_row
+            header = buffer[start_row - buffer_first]
+            blocks.append(EmployeeBlock(start_row, block_end, _find_employee_name(header)))
+        return blocks
+
+    for r_idx, row in indexed_rows:
+        if _is_block_start(row):
+            if buffer_first is None:
+                buffer_first = r_idx
+            block_starts.append(r_idx)
+        if buffer_first is None:
+            continue
+        buffer.append(row)
+        trailing_empty = trailing_empty + 1 if all(pd.isna(v) for v in row) else 0
+
+        # Kirim blok yang sudah lengkap jika potongan cukup besar dan lookahead tersedia
+        if len(block_starts) >= 2:
+            last_complete_end = block_starts[-1]
+            if last_complete_end - buffer_first >= chunk_rows and r_idx >= last_complete_end + lookahead_rows - 1:
+                n_complete = len(block_starts) - 1
+                blocks = flush(n_complete, last_complete_end)
+                keep_from = last_complete_end - buffer_first
+                yield blocks, buffer_first, buffer[:keep_from + lookahead_rows]
+                buffer = buffer[keep_from:]
+                buffer_first = last_complete_end
+                block_starts = block_starts[n_complete:]
+
+    if buffer_first is None:
+        return
+    if trailing_empty:
+        buffer = buffer[:len(buffer) - trailing_empty]
+    end_row = buffer_first + len(buffer)
+    yield flush(len(block_starts), end_row), buffer_first, buffer
+
+
+def iter_eppos_employee_logs(indexed_rows, col_day_mapping, dates, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Generator rekaman per karyawan untuk format Eppos: (EmployeeBlock, dict tanggal -> (times, teks mentah)).
+    Blok tanpa nama tetap dikirim (dengan dict kosong) agar pemanggil bisa memberi peringatan.
+    """
+    for blocks, first_row, rows in iter_block_chunks(indexed_rows, chunk_rows):
+        width = max(max(len(r) for r in rows), max(col_day_mapping.values(), default=-1) + 1)
+        chunk_df = pd.DataFrame([tuple(r) + (float("nan"),) * (width - len(r)) for r in rows], dtype=object)
+        named = [b for b in blocks if b.name]
+        rebased = [EmployeeBlock(b.start_row - first_row, b.end_row - first_row, b.name) for b in named]
+        named_logs = iter(extract_block_logs(chunk_df, col_day_mapping, rebased, dates))
+        for block in blocks:
+            yield block, (next(named_logs) if block.name else {})
+
+
+def iter_tomoro_employee_punches(indexed_rows, col_date_mapping, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Generator rekaman per karyawan untuk format Tomoro: (EmployeeBlock, list log {'Nama', 'Tanggal', 'Jam'}).
+    """
+    for blocks, first_row, rows in iter_block_chunks(indexed_rows, chunk_rows, lookahead_rows=0):
+        for block in blocks:
+            yield block, (extract_block_punches(rows, first_row, block, col_date_mapping) if block.name else [])
+
+
+def eppos_stream_rekap(layout, indexed_rows, shift_rules, timings=None, memory=None):
+    """
+    Rekap satu bagian laporan Eppos dari iterator baris (lihat iter_report_streams), seperti
+    absen.batch.eppos_section_rekap: blok karyawan dibaca dan diekstrak satu per satu.
+
+    Returns:
+        tuple: (DataFrame rekap, tanggal awal periode, list peringatan).
+        Melempar ValueError jika format laporan tidak dikenali.
+    """
+    if layout.start_date is None or layout.end_date is None:
+        raise ValueError("Periode tidak ditemukan dalam file.")
+    if not layout.col_day_mapping:
+        raise ValueError("Tidak dapat menemukan nomor hari (1-31) di baris yang diharapkan.")
+    dates = period_dates(layout.start_date, layout.end_date)
+
+    logs_per_day = {}
+    blocks = []
+    with stage(timings, 'ekstraksi', memory):
+        for block, logs_for_block in iter_eppos_employee_logs(indexed_rows, layout.col_day_mapping, dates):
+            blocks.append(block)
+            if block.name:
+                merge_block_logs(logs_per_day, block, logs_for_block)
+    if not blocks:
+        raise ValueError("Blok karyawan tidak ditemukan (tidak ada baris yang mengandung 'No :').")
+
+    warnings = _unnamed_block_warnings(blocks)
+    warnings.extend(
+        f"Kolom untuk hari {day_num} tidak ditemukan di baris nomor hari."
+        for day_num in sorted({d.day for d in dates if d.day not in layout.col_day_mapping})
+    )
+    with stage(timings, 'ekstraksi', memory):
+        attendance_store = store_from_daily_logs(logs_per_day, [block for block in blocks if block.name], dates)
+    if not store_has_punches(attendance_store):
+        raise ValueError("Tidak ada log absensi yang berhasil diekstrak dari file untuk karyawan manapun.")
+
+    rekap = build_eppos_rekap(attendance_store, shift_rules, timings, memory)
+    return rekap, layout.start_date, warnings
+
+
+def tomoro_stream_rekap(layout, indexed_rows, shift_rules=None, timings=None, memory=None):
+    """
+    Rekap satu bagian laporan Tomoro dari iterator baris, seperti absen.batch.tomoro_section_rekap
+    (PairingRules untuk shift malam, selain itu log pertama/terakhir per tanggal).
+    """
+    if layout.start_date is None or layout.end_date is None:
+        raise ValueError("Periode tidak ditemukan dalam file.")
+    dates = period_dates(layout.start_date, layout.end_date)
+    col_date_mapping = map_dates_to_columns(layout.day_columns, dates)
+    if not col_date_mapping or len(col_date_mapping) != len(dates):
+        raise ValueError(
+            f"Nomor hari di header tidak sepenuhnya cocok dengan periode. Diharapkan {len(dates)} hari, "
+            f"tetapi {len(col_date_mapping)} kolom hari yang cocok ditemukan."
+        )
+
+    raw_logs = []
+    blocks = []
+    with stage(timings, 'ekstraksi', memory):
+        for block, block_logs in iter_tomoro_employee_punches(indexed_rows, col_date_mapping):
+            blocks.append(block)
+            raw_logs.extend(block_logs)
+    if not blocks:
+        raise ValueError("Blok karyawan tidak ditemukan (tidak ada baris yang mengandung 'No :').")
+
+    warnings = _unnamed_block_warnings(blocks)
+    if not raw_logs:
+        warnings.append("Tidak ada log absensi yang berhasil diekstrak dari file.")
+    with stage(timings, 'rekap', memory):
+        if isinstance(shift_rules, PairingRules):
+            rekap = build_tomoro_rekap_overnight(raw_logs, blocks, dates, shift_rules)
+        else:
+            rekap = build_tomoro_rekap(raw_logs, blocks, dates)
+    return rekap, layout.start_date, warnings
+
+
+STREAM_PROCESSORS = {
+    'eppos': eppos_stream_rekap,
+    'tomoro': tomoro_stream_rekap,
+}
+
+
+def process_report_stream(kind, file_obj, shift_rules=None, timings=None, memory=None):
+    """
+    Mode streaming untuk file .xlsx: semua sheet dan semua periode dibaca baris demi baris dan diolah satu
+    bagian demi satu, dengan hasil yang sama seperti absen.batch.process_report_sections (satu bagian tanpa
+    kolom 'Bagian'; beberapa bagian digabung, bagian yang formatnya tidak dikenali menjadi peringatan).
+    Jika memory (dict) diberikan, puncak memori per tahap dicatat (terbesar dari semua bagian).
+
+    Returns:
+        tuple: (DataFrame rekap, bulan, tahun, list peringatan).
+        Melempar ValueError jika tidak ada bagian yang berhasil diolah.
+    """
+    processor = STREAM_PROCESSORS[kind]
+    if kind == 'eppos' and shift_rules is None:
+        shift_rules = load_shift_rules(DEFAULT_RULES_PATH)
+
+    # Label ' - periode N' baru diketahui setelah seluruh sheet terbaca, jadi bagian diberi label di akhir
+    positions, outcomes = [], []
+    for sheet_name, rows in iter_workbook_sheets(file_obj):
+        for period_index, (layout, indexed_rows) in enumerate(iter_report_streams(rows)):
+            section_timings = {}
+            try:
+                result = processor(layout, indexed_rows, shift_rules, section_timings, memory)
+                outcomes.append((result, None, section_timings))
+            except ValueError as e:
+                outcomes.append((None, e, section_timings))
+            positions.append((sheet_name, period_index))
+    if not outcomes:
+        raise ValueError("Periode tidak ditemukan dalam file.")
+
+    if len(outcomes) == 1:
+        result, error, section_timings = outcomes[0]
+        if timings is not None:
+            for name, seconds in section_timings.items():
+                timings[name] = timings.get(name, 0.0) + seconds
+        if error is not None:
+            raise error
+        rekap, start_date, warnings = result
+        return rekap, start_date.month, start_date.year, warnings
+
+    period_counts = {}
+    for sheet_name, _ in positions:
+        period_counts[sheet_name] = period_counts.get(sheet_name, 0) + 1
+    sections = [
+        ReportSection(section_label(sheet_name, period_index, period_counts[sheet_name]), sheet_name, None)
+        for sheet_name, period_index in positions
+    ]
+    return _merge_section_outcomes(sections, outcomes, timings)
@@ -0,0 +1,97 @@
+import io
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+from openpyxl import Workbook
+
+# Laporan sidik jari sintetis dengan format blok yang sama seperti ekspor mesin asli
+# (baris 'Periode :', baris nomor hari, lalu per karyawan baris 'No :' / 'Nama :' diikuti baris log),
+# untuk benchmark dan uji beban tanpa memakai data karyawan sungguhan.
+
+# Jam mulai shift (pagi, siang, sore, malam); shift malam menghasilkan log setelah tengah malam
+SHIFT_START_HOURS = (7, 10.5, 14, 22)
+
+# Isi sel rusak yang pernah muncul di ekspor: teks bukan jam, jam di luar rentang, pemisah titik,
+# label, menit satu digit, dan angka pecahan hari (sel jam yang diformat ulang di Excel)
+MALFORMED_TOKENS = ('xx:yy', '25:00', '8.30', 'Masuk', '7:5')
+MALFORMED_NUMBERS = (0.375, 0.75)
+
+
+def _punch_tokens(rnd, punches_per_day, malformed_rate):
+    seconds = round(rnd.choice(SHIFT_START_HOURS) * 3600) + rnd.randint(-1800, 1800)
+    tokens = []
+    for _ in range(rnd.randint(*punches_per_day)):
+        s = seconds % 86400
+        if rnd.random() < malformed_rate:
+            tokens.append(rnd.choice(MALFORMED_TOKENS))
+        elif rnd.random() < 0.5:
+            tokens.append(f"{s // 3600:02d}:{s % 3600 // 60:02d}")
+        else:
+            tokens.append(f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}")
+        seconds += rnd.randint(2 * 3600, 5 * 3600)
+    return tokens
+
+
+def synthetic_report_rows(n_employees, n_days=31, start=date(2024, 5, 1), punches_per_day=(1, 4), absent_rate=0.1,
+                          malformed_rate=0.0, rows_per_block=2, full_end_date=False, seed=0):
+    """
+    Baris-baris (list nilai sel, sel kosong None) laporan sidik jari sintetis.
+
+    Args:
+        n_employees (int): Jumlah blok karyawan.
+        n_days (int): Panjang periode; periode yang melewati akhir bulan/tahun didukung.
+        start (date): Tanggal awal periode.
+        punches_per_day (tuple): (min, maks) jumlah log per hari kerja.
+        absent_rate (float): Peluang satu hari tanpa log sama sekali.
+        malformed_rate (float): Peluang satu log/sel rusak (lihat MALFORMED_TOKENS), blok tanpa nama
+            dan baris kosong di antara blok.
+        rows_per_block (int): Jumlah baris log per karyawan; log satu hari dibagi ke baris-baris ini.
+        full_end_date (bool): Tulis 'Periode :YYYY/MM/DD ~ YYYY/MM/DD' alih-alih '~ MM/DD'.
+        seed (int): Seed acak, hasil sama untuk argumen yang sama.
+    """
+    rnd = random.Random(seed)
+    end = start + timedelta(days=n_days - 1)
+    end_text = f"{end:%Y/%m/%d}" if full_end_date else f"{end:%m/%d}"
+    rows = [
+        ["Laporan Sidik Jari"],
+        [f"Periode :{start:%Y/%m/%d} ~ {end_text}"],
+        [(start + timedelta(days=i)).day for i in range(n_days)],
+    ]
+    for e in range(n_employees):
+        name = None if rnd.random() < malformed_rate / 10 else f"Karyawan {e:05d}"
+        rows.append(["No :", e + 1, "Nama :", None, name, "Dept :", "Toko"])
+        block = [[None] * n_days for _ in range(rows_per_block)]
+        for day in range(n_days):
+            if rnd.random() < absent_rate:
+                continue
+            for k, token in enumerate(_punch_tokens(rnd, punches_per_day, malformed_rate)):
+                row = block[k % rows_per_block]
+                row[day] = token if row[day] is None else f"{row[day]}\n{token}"
+            if rnd.random() < malformed_rate:
+                block[0][day] = rnd.choice(MALFORMED_NUMBERS)
+        rows.extend(block)
+        if rnd.random() < malformed_rate:
+            rows.append([None] * n_days)
+    return rows
+
+
+def synthetic_report_sheet(n_employees, **kwargs):
+    """Laporan sintetis sebagai DataFrame mentah, sama seperti hasil pd.read_excel(header=None)."""
+    rows = synthetic_report_rows(n_employees, **kwargs)
+    width = max(len(row) for row in rows)
+    return pd.DataFrame(
+        [[float('nan') if v is None else v for v in row] + [float('nan')] * (width - len(row)) for row in rows],
+        dtype=object,
+    )
+
+
+def synthetic_report_bytes(n_employees, **kwargs):
+    """Laporan sintetis sebagai isi file .xlsx (bisa langsung diunggah ke halaman atau ke process_*_report)."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for row in synthetic_report_rows(n_employees, **kwargs):
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,142 @@
+import re
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+
+# HH:MM atau HH:MM:SS, 1-2 digit per bagian (sama seperti strptime '%H:%M:%S' / '%H:%M')
+TIME_TOKEN_RE = re.compile(r'^(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?$')
+
+US_PER_SECOND = 1_000_000
+
+# Memo token -> datetime.time (atau None); nilai jam unik maksimal 86.400 ditambah token aneh
+_TOKEN_MEMO = {}
+_LEGACY_MEMO = {}
+_MEMO_MAX_ENTRIES = 200_000
+
+
+def _remember(memo, key, value):
+    if len(memo) >= _MEMO_MAX_ENTRIES:
+        memo.clear()
+    memo[key] = value
+    return value
+
+
+def parse_hms(token):
+    """
+    Mengubah token 'HH:MM' atau 'HH:MM:SS' menjadi datetime.time, None jika tidak valid.
+    Hasilnya sama dengan strptime('%H:%M:%S') lalu strptime('%H:%M'), tetapi memakai
+    regex + aritmetika dan memo per token.
+    """
+    try:
+        return _TOKEN_MEMO[token]
+    except KeyError:
+        pass
+
+    parsed = None
+    match = TIME_TOKEN_RE.match(token)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2))
+        second = int(match.group(3)) if match.group(3) is not None else 0
+        if hour < 24 and minute < 60 and second < 60:
+            parsed = time(hour, minute, second)
+    return _remember(_TOKEN_MEMO, token, parsed)
+
+
+def _parse_legacy_fallback(token, cell_value):
+    """
+    Rantai lama untuk token yang bukan HH:MM[:SS]: pecahan hari Excel (jika sel berupa angka)
+    lalu pd.to_datetime. Hanya dipakai oleh format Eppos.
+    """
+    if isinstance(cell_value, (float, int)) and 0 <= cell_value < 1:
+        # Waktu Excel berupa pecahan hari (0.5 = 12:00:00)
+        total_seconds = round(float(cell_value) * 24 * 60 * 60)
+        hours, remainder = divmod(total_seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        if 0 <= hours <= 23:
+            return time(hours, minutes, seconds)
+        return None
+
+    try:
+        dt_obj = pd.to_datetime(token, errors='coerce')
+        if pd.notna(dt_obj):
+            return dt_obj.time()
+    except Exception:
+        pass
+    return None
+
+
+def parse_time_token(token, cell_value=None):
+    """
+    Rantai parsing Eppos untuk satu token: HH:MM[:SS], lalu pecahan hari Excel
+    (jika cell_value berupa angka), lalu pd.to_datetime. Hasil dimemo per token.
+    """
+    parsed = parse_hms(token)
+    if parsed is not None:
+        return parsed
+
+    # Hasil jalur Excel bergantung pada tipe sel, bukan hanya teksnya
+    memo_key = (token, isinstance(cell_value, (float, int)))
+    try:
+        return _LEGACY_MEMO[memo_key]
+    except KeyError:
+        return _remember(_LEGACY_MEMO, memo_key, _parse_legacy_fallback(token, cell_value))
+
+
+def time_to_key(parsed_time):
+    """datetime.time -> mikrodetik sejak tengah malam."""
+    return (
+        (parsed_time.hour * 3600 + parsed_time.minute * 60 + parsed_time.second) * US_PER_SECOND
+        + parsed_time.microsecond
+    )
+
+
+def key_to_time(key):
+    """Mikrodetik sejak tengah malam -> datetime.time."""
+    seconds, microsecond = divmod(int(key), US_PER_SECOND)
+    return time(seconds // 3600, seconds % 3600 // 60, seconds % 60, microsecond)
+
+
+def parse_time_column(tokens, cell_values=None):
+    """
+    Parsing vektor untuk satu kolom token jam.
+
+    Token difaktorkan dulu sehingga setiap teks unik hanya diparse sekali: token HH:MM[:SS]
+    lewat regex vektor, sisanya lewat parse_time_token (dengan nilai sel asli jika ada).
+
+    Args:
+        tokens (Series): Token teks (sudah di-strip, tanpa string kosong).
+        cell_values (sequence): Nilai sel asli per token, untuk jalur pecahan hari Excel.
+
+    Returns:
+        ndarray: float64 mikrodetik sejak tengah malam, NaN untuk token yang tidak valid.
+    """
+    codes, uniques = pd.factorize(pd.Series(tokens, dtype=object), use_na_sentinel=True)
+    uniques = pd.Series(uniques, dtype=object)
+
+    parts = uniques.str.extract(TIME_TOKEN_RE.pattern).astype('float64')
+    hours, minutes, seconds = parts[0].to_numpy(), parts[1].to_numpy(), parts[2].fillna(0).to_numpy()
+    valid = (hours < 24) & (minutes < 60) & (seconds < 60)
+    unique_keys = np.where(valid, (hours * 3600 + minutes * 60 + seconds) * US_PER_SECOND, np.nan)
+
+    token_keys = np.full(len(codes), np.nan)
+    has_code = codes >= 0
+    token_keys[has_code] = unique_keys[codes[has_code]]
+
+    # Token lain (jarang): per token dengan rantai lama, tetap dimemo
+    for token_idx in np.flatnonzero(np.isnan(token_keys) & has_code):
+        cell_value = cell_values[token_idx] if cell_values is not None else None
+        parsed_time = parse_time_token(uniques.iat[codes[token_idx]], cell_value)
+        if parsed_time is not None:
+            token_keys[token_idx] = time_to_key(parsed_time)
+    return token_keys
+
+
+def parse_time_token_strptime(token, cell_value=None):
+    """Rantai parsing lama tanpa memo (strptime per token), disimpan untuk pembanding benchmark."""
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            return datetime.strptime(token, fmt).time()
+        except ValueError:
+            pass
+    return _parse_legacy_fallback(token, cell_value)
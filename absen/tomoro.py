@@ -0,0 +1,199 @@
+import re
+from datetime import time
+
+import numpy as np
+import pandas as pd
+
+from absen.pairing import SECONDS_PER_DAY, pair_punches
+from absen.timeparse import parse_hms
+
+# Kolom hasil rekap Tomoro
+TOMORO_REKAP_COLUMNS = ['Nama', 'Tanggal', 'Data Log Mentah', 'Jam Datang', 'Jam Pulang', 'Durasi Jam Kerja']
+
+
+def extract_block_punches(rows, block_first_row, block, col_date_mapping):
+    """
+    Mengambil semua jam absen satu blok karyawan (format Tomoro).
+
+    Args:
+        rows (sequence): Baris-baris sheet (tuple/array nilai sel) yang memuat blok ini.
+        block_first_row (int): Indeks baris sheet untuk rows[0].
+        block (EmployeeBlock): Blok karyawan (indeks baris absolut).
+        col_date_mapping (dict): Tanggal -> indeks kolom.
+
+    Returns:
+        list: Dict {'Nama', 'Tanggal', 'Jam'} berurutan per tanggal, baris, lalu token.
+    """
+    raw_logs = []
+    for current_date in sorted(col_date_mapping.keys()):
+        col_idx = col_date_mapping[current_date]
+
+        for r_idx_log in range(block.start_row + 1, block.end_row):
+            row = rows[r_idx_log - block_first_row]
+            # Ensure we don't go out of bounds for columns
+            if col_idx >= len(row):
+                continue
+
+            log_cell_value = str(row[col_idx]).strip()
+
+            # Skip empty or NaN cells
+            if log_cell_value == '' or log_cell_value == 'nan':
+                continue
+
+            # Split cell content by spaces or newlines to find multiple times
+            for time_str in re.split(r'\s+|\n', log_cell_value):
+                time_str = time_str.strip()
+                if not time_str:
+                    continue
+
+                # HH:MM:SS or HH:MM via the memoized fast path; anything else is skipped
+                parsed_time = parse_hms(time_str)
+                if parsed_time is None:
+                    continue
+
+                raw_logs.append({
+                    'Nama': block.name,
+                    'Tanggal': current_date,
+                    'Jam': parsed_time
+                })
+    return raw_logs
+
+
+def _rekap_employee_names(raw_logs, all_blocks):
+    if raw_logs:
+        employee_names = {log['Nama'] for log in raw_logs}
+    else:
+        employee_names = {block.name for block in all_blocks}
+    employee_names = sorted(name for name in employee_names if name)
+    if not employee_names:
+        raise ValueError("Tidak ada nama karyawan yang ditemukan dalam file.")
+    return employee_names
+
+
+def build_tomoro_rekap(raw_logs, all_blocks, dates):
+    """
+    Menyusun tabel rekap Tomoro (satu baris per karyawan per tanggal).
+
+    Jam Datang adalah log pertama dan Jam Pulang log terakhir di tanggal tersebut.
+    Jika ada log, hanya karyawan yang memiliki log yang ditampilkan; jika tidak ada
+    log sama sekali, semua blok bernama ditampilkan dengan tanggal kosong.
+    Durasi Jam Kerja berupa detik (Int64, <NA> tanpa log); lihat absen.durations.
+    Melempar ValueError jika tidak ada nama karyawan sama sekali.
+    """
+    employee_names = _rekap_employee_names(raw_logs, all_blocks)
+
+    times_per_day = {(name, single_date): [] for name in employee_names for single_date in dates}
+    for log in raw_logs:
+        key = (log['Nama'], log['Tanggal'])
+        if key in times_per_day:
+            times_per_day[key].append(log['Jam'])
+
+    df_hasil_list = []
+    for (name, single_date), times in sorted(times_per_day.items()):
+        row_data = {
+            'Nama': name,
+            'Tanggal': single_date,
+            'Data Log Mentah': '',
+            'Jam Datang': '',
+            'Jam Pulang': '',
+            'Durasi Jam Kerja': None,
+        }
+        if times:
+            all_times = sorted(times)
+            row_data['Jam Datang'] = all_times[0]
+            row_data['Jam Pulang'] = all_times[-1]
+            row_data['Data Log Mentah'] = '\n'.join(t.strftime('%H:%M') for t in all_times)
+
+            row_data['Durasi Jam Kerja'] = _day_seconds(all_times[-1]) - _day_seconds(all_times[0])
+        df_hasil_list.append(row_data)
+
+    df_hasil = pd.DataFrame(df_hasil_list, columns=TOMORO_REKAP_COLUMNS)
+    df_hasil['Durasi Jam Kerja'] = df_hasil['Durasi Jam Kerja'].astype('Int64')
+    df_hasil.sort_values(by=['Nama', 'Tanggal'], inplace=True)
+    return df_hasil
+
+
+def _day_seconds(t):
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def _format_hhmm(total_seconds):
+    return f"{total_seconds // 3600:02}:{total_seconds % 3600 // 60:02}"
+
+
+def _clock(period_seconds):
+    """Detik sejak awal periode -> datetime.time (jam di hari tersebut)."""
+    day_seconds = period_seconds % SECONDS_PER_DAY
+    return time(day_seconds // 3600, day_seconds % 3600 // 60, day_seconds % 60)
+
+
+def build_tomoro_rekap_overnight(raw_logs, all_blocks, dates, pairing_rules):
+    """
+    Seperti build_tomoro_rekap, tetapi log setiap karyawan dipasangkan sebagai satu stream
+    sepanjang periode (pair_punches), sehingga shift malam (mis. 22:00 ~ 06:00) menjadi satu
+    baris di tanggal log masuk, bukan dua hari yang terpotong.
+
+    Log milik hari berikutnya ditandai '(+1)' di Data Log Mentah. Shift tanpa log pulang
+    (hanya satu log atau tap ganda) memiliki Jam Pulang dan durasi kosong. Jika satu tanggal
+    memiliki beberapa shift, Jam Datang dari shift pertama, Jam Pulang dari shift terakhir,
+    dan durasinya dijumlahkan.
+    """
+    employee_names = _rekap_employee_names(raw_logs, all_blocks)
+    name_codes = {name: code for code, name in enumerate(employee_names)}
+    date_index = {single_date: i for i, single_date in enumerate(dates)}
+
+    logs = [log for log in raw_logs if log['Nama'] in name_codes and log['Tanggal'] in date_index]
+    codes = np.fromiter((name_codes[log['Nama']] for log in logs), dtype=np.int64, count=len(logs))
+    seconds = np.fromiter(
+        (date_index[log['Tanggal']] * SECONDS_PER_DAY + log['Jam'].hour * 3600 + log['Jam'].minute * 60 + log['Jam'].second
+         for log in logs),
+        dtype=np.int64,
+        count=len(logs),
+    )
+    order = np.lexsort((seconds, codes))
+    codes, seconds = codes[order], seconds[order]
+    pairs = pair_punches(codes, seconds, pairing_rules)
+
+    # (kode, indeks tanggal) -> [jam datang, jam pulang, detik kerja, ada log pulang, label log]
+    shifts_per_day = {}
+    seconds_list = seconds.tolist()
+    for code, start, end, out_idx in zip(
+        pairs.employee_codes.tolist(), pairs.start.tolist(), pairs.end.tolist(), pairs.out_idx.tolist()
+    ):
+        in_seconds = seconds_list[start]
+        day_idx = in_seconds // SECONDS_PER_DAY
+        labels = []
+        for t in seconds_list[start:end]:
+            label = _format_hhmm(t % SECONDS_PER_DAY)
+            days_later = t // SECONDS_PER_DAY - day_idx
+            labels.append(f"{label} (+{days_later})" if days_later else label)
+
+        entry = shifts_per_day.setdefault((code, day_idx), [_clock(in_seconds), '', 0, False, []])
+        if out_idx >= 0:
+            entry[1] = _clock(seconds_list[out_idx])
+            entry[2] += seconds_list[out_idx] - in_seconds
+            entry[3] = True
+        entry[4].extend(labels)
+
+    df_hasil_list = []
+    for code, name in enumerate(employee_names):
+        for day_idx, single_date in enumerate(dates):
+            entry = shifts_per_day.get((code, day_idx))
+            if entry is None:
+                jam_datang, jam_pulang, durasi, data_log = '', '', None, ''
+            else:
+                jam_datang, jam_pulang = entry[0], entry[1]
+                durasi = entry[2] if entry[3] else None
+                data_log = '\n'.join(entry[4])
+            df_hasil_list.append({
+                'Nama': name,
+                'Tanggal': single_date,
+                'Data Log Mentah': data_log,
+                'Jam Datang': jam_datang,
+                'Jam Pulang': jam_pulang,
+                'Durasi Jam Kerja': durasi,
+            })
+    df_hasil = pd.DataFrame(df_hasil_list, columns=TOMORO_REKAP_COLUMNS)
+    df_hasil['Durasi Jam Kerja'] = df_hasil['Durasi Jam Kerja'].astype('Int64')
+    return df_hasil
+
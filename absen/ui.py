@@ -0,0 +1,239 @@
+"""
+Komponen Streamlit bersama untuk halaman Convert Log Absensi Mesin Eppos dan Proses Absen Tomoro.
+
+Setiap fungsi menerima kind ('eppos' atau 'tomoro') dan, bila perlu, aturan dari pemilih aturan halaman
+(ShiftRules untuk Eppos, PairingRules atau None untuk Tomoro). Modul ini tidak diimpor oleh absen/__init__.py
+agar CLI dan benchmark tetap bisa berjalan tanpa Streamlit.
+"""
+
+import json
+import math
+from datetime import time
+from time import perf_counter
+
+import pandas as pd
+import streamlit as st
+
+from absen.batch import (
+    branch_name_from_file,
+    process_report_sections,
+    process_reports_parallel,
+    write_consolidated_workbook,
+)
+from absen.dataset import DATASET_FORMATS, dataset_zip_bytes
+from absen.durations import (
+    SUMMARY_DURATION_COLUMNS,
+    employee_duration_summary,
+    format_duration_columns,
+    format_hhmm,
+    format_rekap_durations,
+)
+from absen.incremental import INCREMENTAL_PROCESSORS
+from absen.profiling import compare_traces, load_trace, trace_frame
+from absen.streaming import process_report_stream
+
+# Jumlah baris tabel hasil per halaman tampilan
+RESULT_PAGE_SIZE = 500
+
+# Nama file workbook gabungan mode batch per jenis laporan
+BATCH_WORKBOOK_NAMES = {
+    'eppos': 'Rekap_Absensi_Semua_Cabang.xlsx',
+    'tomoro': 'Rekap_Absensi_Tomoro_Semua_Cabang.xlsx',
+}
+
+
+def _show_warnings(warnings):
+    for warning_text in warnings:
+        st.warning(warning_text)
+
+
+def process_sections(kind, sections, rules=None, timings=None, memory=None):
+    """
+    Workbook berisi beberapa sheet departemen dan/atau periode bertumpuk: setiap bagian diolah
+    (paralel) lalu rekapnya digabung dengan kolom 'Bagian' berisi nama sheet/periode.
+
+    timings/memory (dict, opsional) diisi lama dan puncak memori per tahap; memory dicatat hanya selama
+    memory_tracing aktif (lihat absen/profiling.py). Berlaku juga untuk process_streaming dan process_incremental.
+
+    Returns:
+        tuple: (DataFrame rekap, bulan, tahun), atau (None, None, None) jika gagal (error sudah ditampilkan).
+    """
+    st.info(f"Ditemukan {len(sections)} bagian laporan: {', '.join(section.label for section in sections)}")
+    try:
+        df_hasil, bulan_laporan, tahun_laporan, warnings = process_report_sections(
+            kind, sections, rules, timings, memory=memory
+        )
+    except ValueError as ve:
+        st.error(f"Error: {ve}")
+        return None, None, None
+    _show_warnings(warnings)
+    st.success("Pengolahan data selesai.")
+    return df_hasil, bulan_laporan, tahun_laporan
+
+
+def process_streaming(kind, uploaded_file, rules=None, timings=None, memory=None):
+    """
+    Mode streaming: file .xlsx dibaca baris demi baris (openpyxl read_only) per blok karyawan tanpa memuat
+    seluruh sheet ke DataFrame. Semua sheet dan periode bertumpuk diolah, sama seperti mode biasa.
+    """
+    try:
+        uploaded_file.seek(0)
+        df_hasil, bulan_laporan, tahun_laporan, warnings = process_report_stream(
+            kind, uploaded_file, rules, timings, memory
+        )
+    except ValueError as ve:
+        st.error(f"Error: {ve}")
+        return None, None, None
+    except Exception as e:
+        st.error(f"Gagal membaca file Excel: {e}")
+        st.warning("Mode streaming hanya mendukung file .xlsx yang valid.")
+        return None, None, None
+    _show_warnings(warnings)
+    st.success(f"File '{uploaded_file.name}' diolah dalam mode streaming (hemat memori).")
+    return df_hasil, bulan_laporan, tahun_laporan
+
+
+def process_incremental(kind, uploaded_file, rules=None, timings=None, memory=None):
+    """
+    Mode inkremental: hasil per karyawan per tanggal disimpan di SQLite lokal, sehingga ekspor ulang
+    laporan yang sama (mis. pertengahan bulan lalu akhir bulan) hanya mengolah sel yang berubah.
+    """
+    try:
+        df_hasil, bulan_laporan, tahun_laporan, warnings, stats = INCREMENTAL_PROCESSORS[kind](
+            uploaded_file.getvalue(), branch_name_from_file(uploaded_file.name), shift_rules=rules,
+            timings=timings, memory=memory
+        )
+    except ValueError as ve:
+        st.error(f"Error: {ve}")
+        return None, None, None
+    _show_warnings(warnings)
+    st.success(
+        f"Mode inkremental: {stats.recomputed} dari {stats.cells} data karyawan per tanggal diolah ulang, "
+        f"sisanya diambil dari hasil sebelumnya."
+    )
+    return df_hasil, bulan_laporan, tahun_laporan
+
+
+def show_result_table(kind, df_hasil):
+    """
+    Tabel hasil ditampilkan per halaman: hanya baris halaman yang dipilih yang dikirim ke browser,
+    bukan seluruh rekap (bisa ratusan ribu baris untuk laporan multi-cabang).
+    """
+    st.subheader("Data Hasil Akhir")
+    total_rows = len(df_hasil)
+    n_pages = max(1, math.ceil(total_rows / RESULT_PAGE_SIZE))
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(f"Halaman (1-{n_pages}, {RESULT_PAGE_SIZE} baris per halaman)",
+                               min_value=1, max_value=n_pages, value=1, step=1)
+    first_row = (page - 1) * RESULT_PAGE_SIZE
+    st.dataframe(format_rekap_durations(df_hasil.iloc[first_row:first_row + RESULT_PAGE_SIZE], kind))
+    st.info(f"Total baris: {total_rows} (ditampilkan baris {min(first_row + 1, total_rows)}-"
+            f"{min(first_row + RESULT_PAGE_SIZE, total_rows)})")
+
+
+def show_duration_summary(df_hasil):
+    """
+    Ringkasan per karyawan (hari hadir, total jam kerja, lembur, terlambat) langsung dari kolom durasi
+    detik rekap, tanpa mengurai ulang teks durasi.
+    """
+    with st.expander("Ringkasan per Karyawan (total jam kerja, lembur, terlambat)"):
+        standard_hours = st.number_input("Jam kerja standar per hari", min_value=1.0, max_value=24.0,
+                                         value=8.0, step=0.5)
+        shift_start = st.time_input("Jam masuk (untuk menghitung terlambat)", value=time(8, 0))
+        summary = employee_duration_summary(df_hasil, standard_hours, shift_start)
+        st.dataframe(format_duration_columns(summary, dict.fromkeys(SUMMARY_DURATION_COLUMNS, format_hhmm)))
+
+
+def offer_dataset_download(kind, df_rekap, file_name):
+    """
+    Ekspor tambahan untuk payroll: rekap dan log jam per punch sebagai dataset Parquet/Arrow bertipe,
+    dipartisi per cabang dan bulan, dibungkus satu file zip.
+    """
+    with st.expander("Ekspor data untuk payroll (Parquet / Arrow)"):
+        dataset_format = st.radio("Format", list(DATASET_FORMATS), horizontal=True)
+        branch = branch_name_from_file(file_name)
+        st.download_button(
+            label=f"Unduh Dataset {dataset_format.capitalize()}",
+            data=dataset_zip_bytes(kind, df_rekap, branch, dataset_format),
+            file_name=f"{branch}_dataset_{dataset_format}.zip",
+            mime="application/zip"
+        )
+        st.caption(
+            "Isi zip: rekap/ dan log/ dengan folder cabang=.../bulan=YYYY-MM/. Bisa dibaca dengan "
+            "pyarrow.dataset atau pandas.read_parquet."
+        )
+
+
+def show_profile_panel(trace):
+    """
+    Rincian lama dan puncak memori per tahap pengolahan terakhir, bisa diunduh sebagai trace JSON
+    dan dibandingkan dengan trace versi sebelumnya.
+    """
+    with st.expander("Profil waktu & memori per tahap", expanded=True):
+        st.dataframe(trace_frame(trace))
+        st.caption(f"Total {trace['total_detik']:.3f} detik, versi kode {trace['versi_kode'] or '-'}.")
+        st.download_button(
+            label="Unduh Trace JSON",
+            data=json.dumps(trace, indent=2, ensure_ascii=False),
+            file_name=f"trace_{trace['label']}_{trace['dibuat'].replace(':', '')}.json",
+            mime="application/json"
+        )
+        old_trace_file = st.file_uploader("Bandingkan dengan trace sebelumnya (.json)", type=["json"])
+        if old_trace_file is not None:
+            try:
+                st.dataframe(compare_traces(load_trace(old_trace_file), trace))
+            except ValueError as ve:
+                st.error(f"Error: {ve}")
+
+
+def run_batch_mode(kind, select_rules):
+    """
+    Mode batch: banyak file cabang diolah paralel (satu laporan per proses)
+    dan digabung menjadi satu workbook dengan satu sheet per cabang.
+    select_rules() menampilkan pemilih aturan halaman dan mengembalikan aturannya.
+    """
+    uploaded_files = st.file_uploader(
+        "Pilih file Excel semua cabang (.xlsx atau .xls)", type=["xlsx", "xls"], accept_multiple_files=True
+    )
+    if not uploaded_files:
+        return
+
+    rules = select_rules()
+    if not st.button(f"Proses {len(uploaded_files)} file"):
+        return
+
+    files = [(f.name, f.getvalue()) for f in uploaded_files]
+    progress_bar = st.progress(0.0, text=f"0/{len(files)} file selesai")
+    status_table = st.empty()
+    status_rows = []
+    results = []
+    started = perf_counter()
+
+    for result in process_reports_parallel(files, kind, rules):
+        results.append(result)
+        status_rows.append({
+            'File': result.file_name,
+            'Cabang': result.branch,
+            'Status': 'OK' if result.error is None else f"Gagal: {result.error}",
+            'Jumlah Baris': 0 if result.rekap is None else len(result.rekap),
+            'Waktu Proses (detik)': round(result.seconds, 2),
+        })
+        progress_bar.progress(len(results) / len(files), text=f"{len(results)}/{len(files)} file selesai")
+        status_table.dataframe(pd.DataFrame(status_rows))
+
+    st.success(f"{len(files)} file selesai diolah dalam {perf_counter() - started:.1f} detik.")
+    for result in sorted(results, key=lambda r: r.index):
+        for warning_text in result.warnings:
+            st.warning(f"{result.file_name}: {warning_text}")
+
+    if all(result.rekap is None for result in results):
+        st.error("Tidak ada file yang berhasil diolah.")
+        return
+
+    st.download_button(
+        label="Unduh File Excel Gabungan",
+        data=write_consolidated_workbook(results),
+        file_name=BATCH_WORKBOOK_NAMES[kind],
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
@@ -0,0 +1,88 @@
+"""
+Benchmark memori penyimpanan log harian Eppos (tracemalloc).
+
+Membandingkan struktur lama (dict (nama, tanggal) -> list datetime.time, lalu satu dict 13 kunci
+per karyawan per tanggal) dengan AttendanceStore (detik int32 + offset CSR + kode karyawan).
+
+    python benchmarks/bench_eppos_store.py [--employees 1000] [--days 31]
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from absen.eppos import build_eppos_rekap, extract_attendance_store, extract_daily_logs  # noqa: E402
+from absen.layout import index_report_layout, period_dates  # noqa: E402
+from absen.shift_rules import DEFAULT_RULES_PATH, load_shift_rules  # noqa: E402
+from absen.synthetic import synthetic_report_sheet  # noqa: E402
+
+
+def legacy_daily_entries(logs_per_day, employee_blocks, dates):
+    """Struktur lama build_eppos_rekap: satu dict 13 kunci per (karyawan, tanggal)."""
+    log_karyawan_harian = {}
+    for block in employee_blocks:
+        for current_date in dates:
+            log_karyawan_harian[(block.name, current_date)] = {
+                'No': 0, 'Nama': block.name, 'Tanggal': current_date, 'Log Jam Mentah': '',
+                'Jam Datang': None, 'Jam Pulang': None, 'Jam Istirahat Mulai': None, 'Jam Istirahat Selesai': None,
+                'Durasi Jam Kerja': None, 'Durasi Istirahat': None,
+                'Keterangan Tambahan 1': '', 'Keterangan Tambahan 2': '', 'log_all_times': [],
+            }
+    for key, (times, raw_log_str) in logs_per_day.items():
+        log_karyawan_harian[key]['log_all_times'].extend(times)
+        log_karyawan_harian[key]['Log Jam Mentah'] = raw_log_str
+    return log_karyawan_harian
+
+
+def _traced(func, *args):
+    """(hasil, memori yang masih dipakai hasil, puncak memori selama func) dalam byte."""
+    tracemalloc.start()
+    started = perf_counter()
+    result = func(*args)
+    elapsed = perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=31)
+    args = parser.parse_args(argv)
+
+    df_raw = synthetic_report_sheet(args.employees, n_days=args.days)
+    layout = index_report_layout(df_raw)
+    dates = period_dates(layout.start_date, layout.end_date)
+    blocks = [block for block in layout.blocks if block.name]
+    shift_rules = load_shift_rules(DEFAULT_RULES_PATH)
+
+    def legacy():
+        logs_per_day = extract_daily_logs(df_raw, layout.col_day_mapping, blocks, dates)
+        return legacy_daily_entries(logs_per_day, blocks, dates)
+
+    def columnar():
+        return extract_attendance_store(df_raw, layout.col_day_mapping, blocks, dates)
+
+    entries, legacy_current, legacy_peak, legacy_seconds = _traced(legacy)
+    n_punches = sum(len(entry['log_all_times']) for entry in entries.values())
+    del entries
+    store, store_current, store_peak, store_seconds = _traced(columnar)
+    _, rekap_current, rekap_peak, rekap_seconds = _traced(build_eppos_rekap, store, shift_rules)
+
+    mb = 1024 * 1024
+    print(f"{args.employees} karyawan x {len(dates)} hari, {n_punches} log jam")
+    print(f"{'struktur':<28} {'dipakai (MB)':>13} {'puncak (MB)':>12} {'waktu (dtk)':>12}")
+    print(f"{'dict per karyawan/tanggal':<28} {legacy_current / mb:>13.1f} {legacy_peak / mb:>12.1f} {legacy_seconds:>12.2f}")
+    print(f"{'AttendanceStore':<28} {store_current / mb:>13.1f} {store_peak / mb:>12.1f} {store_seconds:>12.2f}")
+    print(f"{'  build_eppos_rekap(store)':<28} {rekap_current / mb:>13.1f} {rekap_peak / mb:>12.1f} {rekap_seconds:>12.2f}")
+    print(f"memori struktur harian turun {legacy_current / max(store_current, 1):.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Benchmark decode penuh vs jejer.loader.load_reduced untuk foto yang diperkecil ke slot grid A4.
+
+Setiap foto dibuka lalu diperkecil ke slot halaman Jejer Image to A4 (780 x 1387, diputar jika landscape)
+dengan LANCZOS, sekali dari decode penuh dan sekali dari load_reduced (JPEG draft / Image.reduce).
+Dilaporkan lama decode+resize, ukuran buffer piksel hasil decode (memori puncak per gambar) dan selisih
+rata-rata piksel hasil akhir kedua cara (0-255). Tanpa --folder dipakai foto JPEG sintetis 24 MP.
+
+    python benchmarks/bench_image_loader.py [--folder DIR_FOTO] [--images 8] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import sys
+from time import perf_counter
+
+from PIL import Image, ImageChops, ImageStat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jejer.loader import load_reduced  # noqa: E402
+from jejer.synthetic import synthetic_photos  # noqa: E402
+
+SLOT_SIZE = (780, 1387)
+PHOTO_24MP = (6000, 4000)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.jfif', '.png')
+
+
+def _slot_size(size):
+    rotate = size[0] > size[1]
+    width, height = (size[1], size[0]) if rotate else size
+    scale = min(SLOT_SIZE[0] / width, SLOT_SIZE[1] / height)
+    new_size = (int(width * scale), int(height * scale))
+    return rotate, new_size, (new_size[1], new_size[0]) if rotate else new_size
+
+
+def fit_to_slot(photo_bytes, reduced):
+    """(gambar di slot, jumlah byte buffer piksel hasil decode)."""
+    img = Image.open(io.BytesIO(photo_bytes))
+    rotate, new_size, file_size = _slot_size(img.size)
+    if reduced:
+        img = load_reduced(img, file_size)
+    else:
+        img.load()
+    decoded_bytes = img.width * img.height * len(img.getbands())
+    if rotate:
+        img = img.rotate(90, expand=True)
+    return img.resize(new_size, Image.Resampling.LANCZOS), decoded_bytes
+
+
+def load_folder(folder, limit):
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS))[:limit]
+    photos = []
+    for name in names:
+        with open(os.path.join(folder, name), 'rb') as f:
+            photos.append(f.read())
+    return photos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--folder', help="Folder berisi foto asli (.jpg/.png); default foto sintetis 24 MP.")
+    parser.add_argument('--images', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.folder:
+        photos = load_folder(args.folder, args.images)
+    else:
+        photos = synthetic_photos(args.images, sizes=(PHOTO_24MP, PHOTO_24MP[::-1]), png_every=0)
+    if not photos:
+        print("Tidak ada foto.")
+        return 1
+    print(f"{len(photos)} foto, {sum(map(len, photos)) / 1e6:.1f} MB")
+
+    results = {}
+    for reduced in (False, True):
+        best, peak_bytes, outputs = float('inf'), 0, []
+        for _ in range(args.repeat):
+            started = perf_counter()
+            outputs = []
+            for photo in photos:
+                img, decoded_bytes = fit_to_slot(photo, reduced)
+                peak_bytes = max(peak_bytes, decoded_bytes)
+                outputs.append(img)
+            best = min(best, perf_counter() - started)
+        results[reduced] = (best, peak_bytes, outputs)
+        label = 'load_reduced' if reduced else 'decode penuh'
+        print(f"{label:<13} {best / len(photos) * 1000:7.1f} ms/foto  buffer decode maks {peak_bytes / 1e6:6.1f} MB")
+
+    (full_time, full_bytes, full_out), (fast_time, fast_bytes, fast_out) = results[False], results[True]
+    diff = max(sum(ImageStat.Stat(ImageChops.difference(a, b)).mean) / len(a.getbands())
+               for a, b in zip(full_out, fast_out))
+    print(f"lebih cepat x{full_time / fast_time:.1f}, memori decode x{full_bytes / fast_bytes:.1f} lebih kecil, "
+          f"selisih piksel rata-rata maks {diff:.2f}/255")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
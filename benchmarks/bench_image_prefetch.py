@@ -0,0 +1,62 @@
+"""
+Benchmark decode + resize gambar untuk halaman jejer A4, serial vs jejer.prefetch.prefetch_map.
+
+Foto sintetis (JPEG/PNG, ukuran kamera ponsel) dibuka, diputar jika landscape, lalu diperkecil
+ke ukuran slot halaman Jejer Image to A4 (jejer.loader.load_reduced lalu LANCZOS), seperti
+create_a4_grid_pdf. Keuntungan thread hanya terlihat di mesin dengan lebih dari satu CPU.
+
+    python benchmarks/bench_image_prefetch.py [--images 60] [--workers 1 2 4]
+"""
+
+import argparse
+import io
+import os
+import sys
+from time import perf_counter
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jejer.loader import load_reduced  # noqa: E402
+from jejer.prefetch import prefetch_map  # noqa: E402
+from jejer.synthetic import synthetic_photos  # noqa: E402
+
+# Ukuran gambar di slot 3 kolom x 2 baris halaman 02 (A4 300 DPI)
+SLOT_SIZE = (780, 1387)
+
+
+def prepare_image(photo_bytes):
+    img = Image.open(io.BytesIO(photo_bytes))
+    rotate = img.width > img.height
+    width, height = (img.height, img.width) if rotate else img.size
+    scale = min(SLOT_SIZE[0] / width, SLOT_SIZE[1] / height)
+    new_size = (int(width * scale), int(height * scale))
+    img = load_reduced(img, (new_size[1], new_size[0]) if rotate else new_size)
+    if rotate:
+        img = img.rotate(90, expand=True)
+    return img.resize(new_size, Image.Resampling.LANCZOS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--images', type=int, default=60)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args(argv)
+
+    photos = synthetic_photos(args.images)
+    print(f"{args.images} gambar, {sum(map(len, photos)) / 1e6:.1f} MB, CPU: {os.cpu_count()}")
+    baseline = None
+    for workers in args.workers:
+        started = perf_counter()
+        for _ in prefetch_map(prepare_image, photos, workers):
+            pass
+        elapsed = perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3} {elapsed:6.2f} dtk  {args.images / elapsed:6.1f} gambar/dtk  "
+              f"x{baseline / elapsed:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
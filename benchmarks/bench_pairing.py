@@ -0,0 +1,68 @@
+"""
+Benchmark pemasangan log lintas tengah malam (pair_punches) untuk periode panjang.
+
+Memastikan waktu tumbuh linear terhadap jumlah log: periode satu kuartal (92 hari)
+tidak boleh lebih dari MAX_SCALING_RATIO kali waktu per log periode satu bulan.
+
+    python benchmarks/bench_pairing.py [--employees 1000]
+"""
+
+import argparse
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from absen.pairing import SECONDS_PER_DAY, make_pairing_rules, pair_punches  # noqa: E402
+
+MAX_SCALING_RATIO = 1.5
+
+
+def synthetic_punch_stream(n_employees, n_days, seed=0):
+    """Stream (kode karyawan, detik sejak awal periode) terurut; campuran shift pagi, siang, dan malam."""
+    rng = np.random.default_rng(seed)
+    n_shifts = n_employees * n_days
+    codes = np.repeat(np.arange(n_employees), n_days)
+    day = np.tile(np.arange(n_days), n_employees)
+    start = day * SECONDS_PER_DAY + rng.choice([7, 14, 22], n_shifts) * 3600 + rng.integers(-1800, 1800, n_shifts)
+    length = rng.integers(7 * 3600, 10 * 3600, n_shifts)
+    present = rng.random(n_shifts) > 0.1
+    codes = np.concatenate([codes[present], codes[present]])
+    seconds = np.concatenate([start[present], start[present] + length[present]])
+    order = np.lexsort((seconds, codes))
+    return codes[order], seconds[order]
+
+
+def _best_of(n_employees, n_days, rules, repeat=3):
+    codes, seconds = synthetic_punch_stream(n_employees, n_days)
+    best = float('inf')
+    for _ in range(repeat):
+        started = perf_counter()
+        pairs = pair_punches(codes, seconds, rules)
+        best = min(best, perf_counter() - started)
+    return codes.size, pairs.start.size, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=1000)
+    args = parser.parse_args(argv)
+    rules = make_pairing_rules()
+
+    print(f"{'hari':>5} {'log':>9} {'shift':>8} {'waktu (dtk)':>12} {'us/log':>8}")
+    per_punch = {}
+    for n_days in (31, 92):
+        n_punches, n_shifts, seconds = _best_of(args.employees, n_days, rules)
+        per_punch[n_days] = seconds / n_punches * 1e6
+        print(f"{n_days:>5} {n_punches:>9} {n_shifts:>8} {seconds:>12.3f} {per_punch[n_days]:>8.3f}")
+
+    ratio = per_punch[92] / per_punch[31]
+    print(f"rasio waktu per log 92/31 hari: {ratio:.2f} (batas {MAX_SCALING_RATIO})")
+    return 0 if ratio <= MAX_SCALING_RATIO else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
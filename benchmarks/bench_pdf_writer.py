@@ -0,0 +1,85 @@
+"""
+Benchmark PDF grid A4: kanvas raster per halaman (Pillow) vs PDF vektor (jejer.pdf, pikepdf).
+
+Foto sintetis disusun 3 kolom x 2 baris per halaman seperti Jejer Image to A4 (slot 780 x 1387, nama file
+di bawah gambar, bingkai), lalu ditulis dengan jejer.drawing.raster_pdf_bytes dan jejer.pdf.vector_pdf_bytes.
+Dilaporkan lama penyusunan + penulisan PDF dan ukuran file, untuk screenshot bukti transfer sintetis
+(1080 x 2400, disematkan apa adanya di PDF vektor) dan untuk foto sintetis penuh noise (12 MP diperkecil dan
+di-encode ulang, screenshot 1080 x 2400 disematkan apa adanya; kasus terburuk ukuran file PDF vektor).
+
+    python benchmarks/bench_pdf_writer.py [--images 60] [--repeat 2]
+"""
+
+import argparse
+import io
+import os
+import sys
+from time import perf_counter
+
+from PIL import Image, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jejer.drawing import PasteImage, Rectangle, TextLine, raster_pdf_bytes, slot_image  # noqa: E402
+from jejer.pdf import vector_pdf_bytes  # noqa: E402
+from jejer.synthetic import synthetic_photos, synthetic_screenshot_bytes  # noqa: E402
+
+SLOT_SIZE = (780, 1387)
+PHOTO_SIZES = ((1080, 2400), (1080, 2400), (4000, 3000), (3000, 4000))
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Poppins-Bold.ttf')
+
+
+def grid_pages(photos, font, vector):
+    """Operasi gambar per halaman (3 x 2 slot), seperti create_a4_grid_pdf halaman 02."""
+    pages = []
+    for start in range(0, len(photos), 6):
+        operations = []
+        for i, photo in enumerate(photos[start:start + 6]):
+            img = Image.open(io.BytesIO(photo))
+            rotate = img.width > img.height
+            width, height = (img.height, img.width) if rotate else img.size
+            scale = min(SLOT_SIZE[0] / width, SLOT_SIZE[1] / height)
+            size = (int(width * scale), int(height * scale))
+            slot = slot_image(img, size, rotate, photo if vector else None)
+            x, y = 50 + (i % 3) * 806, 50 + (i // 3) * 1714
+            operations += [
+                PasteImage(slot, (x + 3 + (SLOT_SIZE[0] - size[0]) // 2, y + 3)),
+                TextLine((x + 120, y + size[1] + 8), f"bukti transfer {start + i}", (0, 0, 0)),
+                Rectangle((x, y, x + SLOT_SIZE[0] + 6, y + size[1] + 70), (0, 0, 0), 3),
+            ]
+        pages.append(operations)
+    return pages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--images', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    font = ImageFont.truetype(FONT_PATH, 50) if os.path.exists(FONT_PATH) else ImageFont.load_default()
+    inputs = {
+        'screenshot': [synthetic_screenshot_bytes(seed=i) for i in range(args.images)],
+        'foto': synthetic_photos(args.images, sizes=PHOTO_SIZES),
+    }
+    for label, photos in inputs.items():
+        print(f"{label}: {args.images} gambar, {sum(map(len, photos)) / 1e6:.1f} MB, "
+              f"{(args.images + 5) // 6} halaman")
+        results = {}
+        for vector in (False, True):
+            best, pdf = float('inf'), b''
+            for _ in range(args.repeat):
+                started = perf_counter()
+                pages = grid_pages(photos, font, vector)
+                pdf = vector_pdf_bytes(pages, font) if vector else raster_pdf_bytes(pages, font)
+                best = min(best, perf_counter() - started)
+            results[vector] = (best, len(pdf))
+            print(f"  {'vektor' if vector else 'raster':<7} {best:6.2f} dtk  {len(pdf) / 1e6:7.2f} MB")
+
+        (raster_time, raster_size), (vector_time, vector_size) = results[False], results[True]
+        print(f"  vektor x{raster_time / vector_time:.1f} lebih cepat, ukuran file x{vector_size / raster_size:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
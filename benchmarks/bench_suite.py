@@ -0,0 +1,91 @@
+"""
+Benchmark regresi parsing, aturan shift/rekap dan ekspor Excel pada laporan sintetis (absen/synthetic.py).
+
+Setiap ukuran (jumlah karyawan x 31 hari) diolah dengan process_eppos_report / process_tomoro_report lalu
+diekspor ke workbook. Throughput dihitung dalam karyawan-hari per detik; skrip keluar dengan kode 1 jika
+salah satu grup tahap di bawah MIN_THROUGHPUT (ukuran < MIN_CHECKED_EMPLOYEES tidak dicek karena
+didominasi biaya tetap).
+
+    python benchmarks/bench_suite.py [--employees 10 100 1000 5000] [--format eppos tomoro] [--trace-dir DIR]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from absen.batch import REPORT_PROCESSORS  # noqa: E402
+from absen.export import write_eppos_rekap_workbook, write_tomoro_rekap_workbook  # noqa: E402
+from absen.profiling import build_trace, save_trace, stage  # noqa: E402
+from absen.synthetic import synthetic_report_bytes  # noqa: E402
+
+N_DAYS = 31
+MALFORMED_RATE = 0.01
+MIN_CHECKED_EMPLOYEES = 100
+
+EXPORTERS = {
+    'eppos': write_eppos_rekap_workbook,
+    'tomoro': write_tomoro_rekap_workbook,
+}
+
+# Grup tahap yang dilaporkan -> tahap absen.profiling di dalamnya
+STAGE_GROUPS = {
+    'parsing': ('baca_excel', 'tata_letak', 'ekstraksi'),
+    'shift_rekap': ('aturan_shift', 'rekap'),
+    'ekspor': ('ekspor',),
+}
+
+# Batas bawah throughput (karyawan-hari per detik), sekitar sepertiga hasil pada mesin 1 CPU
+MIN_THROUGHPUT = {
+    'eppos': {'parsing': 4_000, 'shift_rekap': 50_000, 'ekspor': 700},
+    'tomoro': {'parsing': 4_000, 'shift_rekap': 18_000, 'ekspor': 1_500},
+}
+
+
+def run_size(kind, n_employees, seed=0):
+    """Timings satu laporan sintetis: dict tahap -> detik, termasuk 'ekspor'."""
+    file_bytes = synthetic_report_bytes(n_employees, n_days=N_DAYS, malformed_rate=MALFORMED_RATE, seed=seed)
+    timings = {}
+    rekap = REPORT_PROCESSORS[kind](file_bytes, timings=timings)[0]
+    with stage(timings, 'ekspor'):
+        EXPORTERS[kind](rekap)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--format', nargs='+', choices=sorted(REPORT_PROCESSORS), default=sorted(REPORT_PROCESSORS))
+    parser.add_argument('--trace-dir', help="Simpan trace JSON per format/ukuran (bisa dibandingkan dengan "
+                                            "benchmarks/compare_traces.py).")
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'format':<7} {'karyawan':>9} " + ' '.join(f"{group + ' (k/dtk)':>18}" for group in STAGE_GROUPS))
+    for kind in args.format:
+        for n_employees in args.employees:
+            timings = run_size(kind, n_employees)
+            employee_days = n_employees * N_DAYS
+            cells = []
+            for group, stages in STAGE_GROUPS.items():
+                seconds = sum(timings.get(name, 0.0) for name in stages)
+                throughput = employee_days / seconds if seconds else float('inf')
+                limit = MIN_THROUGHPUT[kind][group]
+                failed = n_employees >= MIN_CHECKED_EMPLOYEES and throughput < limit
+                if failed:
+                    failures.append(f"{kind} {n_employees} karyawan, {group}: {throughput:,.0f} < {limit:,} karyawan-hari/dtk")
+                cells.append(f"{throughput / 1000:>16.1f}{' !' if failed else '  '}")
+            print(f"{kind:<7} {n_employees:>9} " + ' '.join(cells))
+            if args.trace_dir:
+                os.makedirs(args.trace_dir, exist_ok=True)
+                trace = build_trace(f"bench {kind}", timings, info={'karyawan': n_employees, 'hari': N_DAYS})
+                save_trace(trace, os.path.join(args.trace_dir, f"{kind}_{n_employees}.json"))
+
+    for failure in failures:
+        print(f"REGRESI: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
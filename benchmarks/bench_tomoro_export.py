@@ -0,0 +1,103 @@
+"""
+Benchmark regresi penyusunan workbook Tomoro untuk banyak karyawan.
+
+Membandingkan cara lama (filter DataFrame per karyawan + time_to_minutes per teks) dengan
+build_tomoro_tables (satu kali groupby, durasi sebagai menit int), lalu memastikan waktu
+build_tomoro_tables tumbuh linear terhadap jumlah karyawan.
+
+    python benchmarks/bench_tomoro_export.py [--employees 500] [--export]
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import date, time, timedelta
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from absen.durations import format_rekap_durations  # noqa: E402
+from absen.export import build_tomoro_tables, write_tomoro_rekap_workbook  # noqa: E402
+from absen.layout import EmployeeBlock  # noqa: E402
+from absen.tomoro import build_tomoro_rekap  # noqa: E402
+
+# Waktu untuk 2x karyawan boleh paling banyak sekian kali waktu untuk 1x karyawan
+MAX_SCALING_RATIO = 3.0
+
+
+def synthetic_tomoro_rekap(n_employees, n_days=31, seed=0):
+    """DataFrame rekap Tomoro acak: 1-4 log per hari, sekitar 10% hari tanpa log."""
+    rnd = random.Random(seed)
+    dates = [date(2024, 5, 1) + timedelta(days=i) for i in range(n_days)]
+    raw_logs = []
+    blocks = []
+    for e in range(n_employees):
+        name = f"Karyawan {e:05d}"
+        blocks.append(EmployeeBlock(e, e + 1, name))
+        for single_date in dates:
+            if rnd.random() < 0.1:
+                continue
+            start = rnd.randint(6 * 3600, 14 * 3600)
+            for k in range(rnd.randint(1, 4)):
+                seconds = min(start + k * rnd.randint(1800, 4 * 3600), 23 * 3600 + 59 * 60)
+                raw_logs.append({'Nama': name, 'Tanggal': single_date, 'Jam': time(seconds // 3600, seconds % 3600 // 60)})
+    return build_tomoro_rekap(raw_logs, blocks, dates)
+
+
+def _time_to_minutes(time_str):
+    if not isinstance(time_str, str) or ':' not in time_str:
+        return 0
+    hours, minutes = map(int, time_str.split(':'))
+    return hours * 60 + minutes
+
+
+def legacy_tomoro_tables(df_rekap):
+    """Cara lama halaman Tomoro: satu filter DataFrame penuh per karyawan (O(n^2))."""
+    tables = []
+    for employee in df_rekap['Nama'].unique():
+        df_employee = df_rekap[df_rekap['Nama'] == employee]
+        total_minutes = df_employee['Durasi Jam Kerja'].apply(_time_to_minutes).sum()
+        tables.append((employee, df_employee.values.tolist(), total_minutes))
+    return tables
+
+
+def _best_of(func, arg, repeat=7):
+    best = float('inf')
+    for _ in range(repeat):
+        started = perf_counter()
+        func(arg)
+        best = min(best, perf_counter() - started)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=500)
+    parser.add_argument('--export', action='store_true', help="Ukur juga write_tomoro_rekap_workbook.")
+    args = parser.parse_args(argv)
+
+    half = synthetic_tomoro_rekap(args.employees // 2)
+    full = synthetic_tomoro_rekap(args.employees)
+    print(f"{'karyawan':>9} {'baris':>7} {'lama (dtk)':>11} {'groupby (dtk)':>14}")
+    timings = {}
+    for df_rekap in (half, full):
+        n = df_rekap['Nama'].nunique()
+        # Rekap lama menyimpan durasi sebagai teks 'HH:MM'
+        legacy = _best_of(legacy_tomoro_tables, format_rekap_durations(df_rekap, 'tomoro'))
+        timings[n] = _best_of(build_tomoro_tables, df_rekap)
+        print(f"{n:>9} {len(df_rekap):>7} {legacy:>11.3f} {timings[n]:>14.3f}")
+
+    if args.export:
+        started = perf_counter()
+        write_tomoro_rekap_workbook(full)
+        print(f"write_tomoro_rekap_workbook, {len(full)} baris: {perf_counter() - started:.2f} dtk")
+
+    n_half, n_full = sorted(timings)
+    ratio = timings[n_full] / timings[n_half]
+    print(f"rasio waktu {n_full}/{n_half} karyawan: {ratio:.2f} (batas {MAX_SCALING_RATIO})")
+    return 0 if ratio <= MAX_SCALING_RATIO else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
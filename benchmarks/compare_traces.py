@@ -0,0 +1,34 @@
+"""
+Membandingkan dua trace profil (JSON dari --trace CLI atau panel profil halaman Streamlit) per tahap.
+
+    python benchmarks/compare_traces.py trace_lama.json trace_baru.json
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from absen.profiling import compare_traces, load_trace  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('lama')
+    parser.add_argument('baru')
+    args = parser.parse_args(argv)
+    try:
+        old, new = load_trace(args.lama), load_trace(args.baru)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    for trace, path in ((old, args.lama), (new, args.baru)):
+        print(f"{path}: {trace.get('label')} versi {trace.get('versi_kode') or '-'} ({trace.get('dibuat')})")
+    print()
+    print(compare_traces(old, new).to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Modul bersama untuk halaman-halaman jejer gambar ke kertas A4.
+"""
+
+from jejer.drawing import (
+    A4_SIZE_PX,
+    PasteImage,
+    Rectangle,
+    SlotImage,
+    TextLine,
+    multiline_text_lines,
+    passthrough_slot,
+    raster_pdf_bytes,
+    render_raster_page,
+    slot_image,
+    slot_pixels,
+    write_raster_pdf,
+)
+from jejer.loader import load_reduced, reduce_factor
+from jejer.pdf import vector_pdf_bytes, write_vector_pdf
+from jejer.prefetch import DEFAULT_IMAGE_WORKERS, prefetch_map
+from jejer.synthetic import synthetic_photo, synthetic_photo_bytes, synthetic_photos, synthetic_screenshot_bytes
+
+__all__ = [
+    "A4_SIZE_PX",
+    "DEFAULT_IMAGE_WORKERS",
+    "PasteImage",
+    "Rectangle",
+    "SlotImage",
+    "TextLine",
+    "load_reduced",
+    "multiline_text_lines",
+    "passthrough_slot",
+    "prefetch_map",
+    "raster_pdf_bytes",
+    "reduce_factor",
+    "render_raster_page",
+    "slot_image",
+    "slot_pixels",
+    "synthetic_photo",
+    "synthetic_photo_bytes",
+    "synthetic_photos",
+    "synthetic_screenshot_bytes",
+    "vector_pdf_bytes",
+    "write_raster_pdf",
+    "write_vector_pdf",
+]
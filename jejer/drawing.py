@@ -0,0 +1,129 @@
+import io
+from collections import namedtuple
+
+from PIL import Image, ImageDraw
+
+from jejer.loader import load_reduced
+
+# Halaman grid disusun sebagai daftar operasi gambar (bukan langsung di kanvas Pillow), sehingga tata
+# letak yang sama bisa dirender ke kanvas raster (cara lama) atau ditulis sebagai PDF vektor (jejer.pdf).
+# Semua koordinat dalam piksel A4 300 DPI, dengan (0, 0) di kiri atas seperti Pillow.
+
+A4_SIZE_PX = (2480, 3508)
+PAGE_DPI = 300
+
+# JPEG asli disematkan apa adanya jika resolusinya paling banyak 2x ukuran slot (per sisi) dan filenya tidak
+# lebih dari ~0.3 byte per piksel slot (kira-kira ukuran JPEG kualitas 75 seukuran slot). Foto yang lebih
+# besar diperkecil dan di-encode ulang agar PDF tidak membawa foto 24 MP untuk kotak selebar 6 cm;
+# screenshot bukti transfer biasanya jauh di bawah batas ini
+PASSTHROUGH_MAX_SCALE = 2.0
+PASSTHROUGH_MAX_BYTES_PER_PIXEL = 0.3
+PASSTHROUGH_MODES = ('RGB', 'L')
+
+SlotImage = namedtuple('SlotImage', [
+    'size',    # (lebar, tinggi) gambar di halaman, piksel 300 DPI
+    'image',   # PIL.Image yang sudah diputar dan diskalakan ke size, None jika memakai jpeg
+    'jpeg',    # isi file JPEG asli untuk disematkan tanpa encode ulang, atau None
+    'rotate',  # True jika jpeg diputar 90 derajat berlawanan jarum jam (seperti Image.rotate(90))
+])
+
+# Operasi gambar satu halaman, dijalankan berurutan (yang belakangan menimpa yang lebih dulu)
+PasteImage = namedtuple('PasteImage', ['slot_image', 'xy'])        # xy: pojok kiri atas
+Rectangle = namedtuple('Rectangle', ['box', 'outline', 'width'])   # box & width seperti ImageDraw.rectangle
+TextLine = namedtuple('TextLine', ['xy', 'text', 'fill'])          # xy seperti ImageDraw.text (anchor 'la')
+
+
+def passthrough_slot(img, size, rotate=False, jpeg_bytes=None):
+    """
+    SlotImage yang menyematkan jpeg_bytes (isi file img, hasil Image.open) apa adanya, atau None jika
+    jpeg_bytes tidak diberikan, img bukan JPEG RGB/abu-abu, resolusinya lebih dari PASSTHROUGH_MAX_SCALE x
+    size (ukuran di halaman setelah diputar), atau filenya lebih besar dari PASSTHROUGH_MAX_BYTES_PER_PIXEL.
+    """
+    file_size = (size[1], size[0]) if rotate else size
+    if (jpeg_bytes is not None and img.format == 'JPEG' and img.mode in PASSTHROUGH_MODES
+            and img.width <= PASSTHROUGH_MAX_SCALE * file_size[0]
+            and img.height <= PASSTHROUGH_MAX_SCALE * file_size[1]
+            and len(jpeg_bytes) <= PASSTHROUGH_MAX_BYTES_PER_PIXEL * size[0] * size[1]):
+        return SlotImage(size, None, jpeg_bytes, rotate)
+    return None
+
+
+def slot_image(img, size, rotate=False, jpeg_bytes=None):
+    """
+    SlotImage untuk img (hasil Image.open, belum di-load) yang akan ditempatkan berukuran size setelah
+    diputar (rotate). JPEG yang bisa disematkan apa adanya (passthrough_slot) tidak di-decode sama sekali;
+    selain itu gambar di-decode kecil (jejer.loader), diputar, lalu diskalakan dengan LANCZOS.
+    """
+    slot = passthrough_slot(img, size, rotate, jpeg_bytes)
+    if slot is not None:
+        return slot
+    img = load_reduced(img, (size[1], size[0]) if rotate else size)
+    if rotate:
+        img = img.rotate(90, expand=True)
+    return SlotImage(size, img.resize(size, Image.Resampling.LANCZOS), None, False)
+
+
+def slot_pixels(slot):
+    """Gambar PIL (ukuran slot.size) dari SlotImage, men-decode JPEG asli jika perlu."""
+    if slot.image is not None:
+        return slot.image
+    size = (slot.size[1], slot.size[0]) if slot.rotate else slot.size
+    img = load_reduced(Image.open(io.BytesIO(slot.jpeg)), size)
+    if slot.rotate:
+        img = img.rotate(90, expand=True)
+    return img.resize(slot.size, Image.Resampling.LANCZOS)
+
+
+def multiline_text_lines(font, xy, text, fill, spacing=4, align='left'):
+    """
+    TextLine per baris untuk teks multi-baris, dengan posisi yang sama seperti ImageDraw.multiline_text
+    (jarak baris = tinggi bbox 'A' + spacing, align 'left'/'center'/'right' terhadap baris terlebar).
+    """
+    lines = text.split('\n')
+    if len(lines) == 1:
+        return [TextLine(xy, text, fill)]
+    line_spacing = font.getbbox('A')[3] + spacing
+    widths = [font.getlength(line) for line in lines]
+    max_width = max(widths)
+    offsets = {'left': 0.0, 'center': 0.5, 'right': 1.0}[align]
+    return [
+        TextLine((xy[0] + (max_width - width) * offsets, xy[1] + i * line_spacing), line, fill)
+        for i, (line, width) in enumerate(zip(lines, widths))
+    ]
+
+
+def render_raster_page(operations, font=None, page_size=A4_SIZE_PX):
+    """Halaman sebagai kanvas RGB Pillow (cara lama), dari daftar operasi."""
+    canvas = Image.new('RGB', page_size, 'white')
+    draw = ImageDraw.Draw(canvas)
+    for op in operations:
+        if isinstance(op, PasteImage):
+            canvas.paste(slot_pixels(op.slot_image), op.xy)
+        elif isinstance(op, Rectangle):
+            draw.rectangle(op.box, outline=op.outline, width=op.width)
+        else:
+            draw.text(op.xy, op.text, fill=op.fill, font=font)
+    return canvas
+
+
+def write_raster_pdf(pages, output, font=None, page_size=A4_SIZE_PX, on_page=None):
+    """
+    Menulis PDF dari kanvas raster per halaman (cara lama) ke output, satu halaman demi satu: setiap halaman
+    dirender, ditambahkan ke PDF (Pillow save append=True, jadi output harus bisa dibaca dan di-seek, mis.
+    BytesIO), lalu kanvasnya dilepas. on_page(nomor_halaman) dipanggil setiap halaman selesai ditulis.
+    Mengembalikan jumlah halaman.
+    """
+    page_count = 0
+    for operations in pages:
+        render_raster_page(operations, font, page_size).save(output, format="PDF", append=page_count > 0)
+        page_count += 1
+        if on_page is not None:
+            on_page(page_count)
+    return page_count
+
+
+def raster_pdf_bytes(pages, font=None, page_size=A4_SIZE_PX, on_page=None):
+    """PDF raster (bytes) dari iterable halaman, seperti sebelum jejer.pdf ada; lihat write_raster_pdf."""
+    pdf_buffer = io.BytesIO()
+    write_raster_pdf(pages, pdf_buffer, font, page_size, on_page)
+    return pdf_buffer.getvalue()
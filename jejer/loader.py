@@ -0,0 +1,35 @@
+# Foto ponsel 12-48 MP hanya ditampilkan di slot selebar ~800 piksel, jadi tidak perlu di-decode penuh.
+# JPEG bisa di-decode langsung pada skala 1/2, 1/4 atau 1/8 oleh libjpeg (Image.draft); format lain
+# di-decode penuh lalu diperkecil dengan Image.reduce (rata-rata blok, jauh lebih murah dari LANCZOS
+# di ukuran penuh). Faktor pengecilan dipilih terbesar yang hasilnya masih paling sedikit ukuran target, sehingga
+# resize LANCZOS terakhir tetap mengecilkan (tidak memperbesar) gambar.
+
+DRAFT_FORMATS = ('JPEG', 'MPO')
+# Mode palet ('P', 'PA') dan 1-bit tidak bisa dirata-rata; gambar seperti itu dibiarkan ke resize pemanggil
+REDUCE_MODES = ('L', 'LA', 'RGB', 'RGBA', 'CMYK', 'YCbCr', 'I', 'F')
+MAX_REDUCE_FACTOR = 8
+
+
+def reduce_factor(size, min_size):
+    """Faktor pangkat dua terbesar (maks. MAX_REDUCE_FACTOR) agar size / faktor masih >= min_size."""
+    factor = 1
+    while (factor < MAX_REDUCE_FACTOR and size[0] // (factor * 2) >= min_size[0]
+           and size[1] // (factor * 2) >= min_size[1]):
+        factor *= 2
+    return factor
+
+
+def load_reduced(img, min_size):
+    """
+    Memuat img hasil Image.open pada skala 1/2^k terkecil yang ukurannya masih paling sedikit min_size
+    (lebar, tinggi) di orientasi file. Mengembalikan gambar yang sudah di-load; ukurannya bisa sedikit
+    berbeda dari size / 2^k karena pembulatan, jadi ukuran akhir tetap ditentukan resize pemanggil.
+    Gambar yang sudah di-load tidak bisa di-draft lagi dan hanya diperkecil dengan Image.reduce.
+    """
+    min_size = (max(1, min_size[0]), max(1, min_size[1]))
+    if img.format in DRAFT_FORMATS:
+        img.draft(None, min_size)
+    img.load()
+    factor = reduce_factor(img.size, min_size) if img.mode in REDUCE_MODES else 1
+    return img.reduce(factor) if factor > 1 else img
+
@@ -0,0 +1,253 @@
+import io
+import weakref
+import zlib
+from collections import namedtuple
+
+import pikepdf
+from PIL import Image, ImageColor, ImageFont
+from pikepdf import Name, Operator, String
+
+from jejer.drawing import A4_SIZE_PX, PAGE_DPI, PasteImage, Rectangle
+
+# PDF vektor dari operasi jejer.drawing: setiap gambar menjadi XObject (JPEG asli disalin apa adanya sebagai
+# DCTDecode), teks ditulis sebagai teks dengan font TrueType yang disematkan, dan bingkai sebagai garis.
+# Tidak ada kanvas A4 300 DPI yang dirender, jadi halaman kosong di sekitar gambar tidak ikut di-encode.
+#
+# Objek PDF ditulis langsung ke output begitu halamannya selesai (pikepdf/qpdf baru menulis seluruh dokumen
+# saat save), jadi halaman dan gambarnya bisa dilepas dari memori; tabel xref ditulis di akhir. pikepdf
+# dipakai untuk menyusun content stream (format angka & escape string).
+
+# Satuan halaman adalah piksel 300 DPI dengan sumbu y ke bawah, sama dengan kanvas Pillow
+PX_TO_PT = 72 / PAGE_DPI
+# Gambar yang bukan JPEG asli (sudah diperkecil, PNG, dll.) di-encode JPEG dengan kualitas yang sama
+# dengan halaman raster Pillow sebelumnya (kualitas bawaan 75)
+XOBJECT_JPEG_QUALITY = 75
+FALLBACK_FONT = 'Helvetica-Bold'
+
+# Kode WinAnsiEncoding yang dipakai teks (cp1252); karakter di luar itu diganti '?'
+_FIRST_CHAR, _LAST_CHAR = 32, 255
+
+# Nomor objek 1 dan 2 dipesan untuk Catalog dan Pages (ditulis terakhir, setelah semua halaman diketahui)
+_CATALOG, _PAGES = 1, 2
+
+_Ref = namedtuple('_Ref', ['number'])
+
+
+def _op(operator, *operands):
+    return pikepdf.ContentStreamInstruction(list(operands), Operator(operator))
+
+
+def _rgb(color):
+    if isinstance(color, str):
+        color = ImageColor.getrgb(color)
+    if isinstance(color, int):
+        color = (color, color, color)
+    return [round(c / 255, 4) for c in color[:3]]
+
+
+def _pdf_value(value):
+    """Serialisasi nilai Python ke sintaks PDF: str = nama (/...), bytes = string, dict = kamus, _Ref = referensi."""
+    if isinstance(value, _Ref):
+        return b'%d 0 R' % value.number
+    if isinstance(value, bool):
+        return b'true' if value else b'false'
+    if isinstance(value, int):
+        return b'%d' % value
+    if isinstance(value, float):
+        return (b'%.4f' % value).rstrip(b'0').rstrip(b'.') or b'0'
+    if isinstance(value, str):
+        return b'/' + value.encode('ascii')
+    if isinstance(value, bytes):
+        return b'(' + value.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+    if isinstance(value, (list, tuple)):
+        return b'[' + b' '.join(_pdf_value(item) for item in value) + b']'
+    return b'<<' + b''.join(b'/%s %s' % (key.encode('ascii'), _pdf_value(item)) for key, item in value.items()) + b'>>'
+
+
+def _font_bytes(font):
+    """Isi file TrueType dari font Pillow, atau None (font bitmap / tidak bisa dibaca)."""
+    path = getattr(font, 'path', None)
+    if isinstance(path, str):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    # ImageFont.load_default() memuat font bawaan Pillow dari BytesIO
+    if hasattr(path, 'getvalue'):
+        return path.getvalue()
+    return None
+
+
+def _write_font(write_object, font):
+    """Menulis font /F1 untuk teks: TrueType yang disematkan (WinAnsi), atau FALLBACK_FONT bawaan viewer."""
+    data = _font_bytes(font)
+    if data is None:
+        return write_object({'Type': 'Font', 'Subtype': 'Type1', 'BaseFont': FALLBACK_FONT,
+                             'Encoding': 'WinAnsiEncoding'})
+
+    # Ukuran 1000 = satuan glyph PDF (1/1000 em)
+    em_font = ImageFont.truetype(io.BytesIO(data), 1000)
+    widths = []
+    for code in range(_FIRST_CHAR, _LAST_CHAR + 1):
+        try:
+            widths.append(round(em_font.getlength(bytes([code]).decode('cp1252'))))
+        except UnicodeDecodeError:
+            widths.append(0)
+    ascent, descent = em_font.getmetrics()
+    cap_height = ascent - em_font.getbbox('H')[1]
+    family, style = em_font.getname()
+    base_font = ''.join(f"{family}-{style}".split())
+
+    font_file = write_object({'Filter': 'FlateDecode', 'Length1': len(data)}, zlib.compress(data))
+    descriptor = write_object({
+        'Type': 'FontDescriptor', 'FontName': base_font, 'Flags': 32,
+        'FontBBox': [0, -descent, max(widths), ascent], 'ItalicAngle': 0,
+        'Ascent': ascent, 'Descent': -descent, 'CapHeight': cap_height, 'StemV': 80,
+        'FontFile2': font_file,
+    })
+    return write_object({
+        'Type': 'Font', 'Subtype': 'TrueType', 'BaseFont': base_font,
+        'FirstChar': _FIRST_CHAR, 'LastChar': _LAST_CHAR, 'Widths': widths,
+        'Encoding': 'WinAnsiEncoding', 'FontDescriptor': descriptor,
+    })
+
+
+def _write_image(write_object, slot):
+    """Menulis XObject gambar untuk SlotImage: JPEG asli apa adanya, selain itu JPEG baru seukuran slot."""
+    if slot.jpeg is not None:
+        data = slot.jpeg
+        img = Image.open(io.BytesIO(data))
+    else:
+        img = slot.image
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=XOBJECT_JPEG_QUALITY)
+        data = buffer.getvalue()
+    return write_object({
+        'Type': 'XObject', 'Subtype': 'Image', 'Width': img.width, 'Height': img.height,
+        'ColorSpace': 'DeviceGray' if img.mode == 'L' else 'DeviceRGB',
+        'BitsPerComponent': 8, 'Filter': 'DCTDecode',
+    }, data)
+
+
+def _image_matrix(slot, xy):
+    """Matriks cm yang memetakan persegi satuan gambar ke kotak slot (y ke bawah), termasuk putaran."""
+    (x, y), (width, height) = xy, slot.size
+    if slot.rotate:
+        # Sama dengan Image.rotate(90, expand=True): berlawanan arah jarum jam
+        return [0, -height, -width, 0, x + width, y + height]
+    return [width, 0, 0, -height, x, y + height]
+
+
+def _encode_text(text):
+    return text.encode('cp1252', errors='replace')
+
+
+def write_vector_pdf(pages, output, font=None, page_size=A4_SIZE_PX, on_page=None):
+    """
+    Menulis PDF vektor ke output (file biner) dari iterable halaman (daftar operasi jejer.drawing), satu
+    halaman demi satu: halaman berikutnya baru diambil setelah halaman sebelumnya beserta gambarnya selesai
+    ditulis, jadi dengan generator halaman lama bisa langsung dilepas. Halaman berukuran page_size piksel
+    300 DPI (A4 = 595 x 842 pt); teks memakai font Pillow yang sama dengan tata letak (ukuran & metrik),
+    sehingga font hanya wajib jika ada TextLine. on_page(nomor_halaman) dipanggil setiap halaman selesai
+    ditulis. Gambar (PIL.Image atau isi JPEG yang sama) hanya disematkan sekali walaupun dipakai di beberapa
+    slot atau halaman. Mengembalikan jumlah halaman.
+    """
+    offsets = {}
+    position = 0
+
+    def write(data):
+        nonlocal position
+        output.write(data)
+        position += len(data)
+
+    def write_object(value, stream=None, number=None):
+        if number is None:
+            # Objek Catalog dan Pages baru ditulis di akhir, jadi nomor lain dimulai setelahnya
+            number = _PAGES + 1 + len(offsets)
+        offsets[number] = position
+        if stream is None:
+            write(b'%d 0 obj\n%s\nendobj\n' % (number, _pdf_value(value)))
+        else:
+            write(b'%d 0 obj\n%s\nstream\n' % (number, _pdf_value(dict(value, Length=len(stream)))))
+            write(stream)
+            write(b'\nendstream\nendobj\n')
+        return _Ref(number)
+
+    write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    font_ref = None
+    # Kunci: id gambar PIL atau isi JPEG di slot. PIL.Image dipegang lewat weakref agar gambar halaman lama
+    # tetap bisa dilepas tanpa id-nya tertukar dengan objek baru; isi JPEG kecil dan dipegang langsung.
+    xobjects = {}
+    page_refs = []
+    width_pt, height_pt = page_size[0] * PX_TO_PT, page_size[1] * PX_TO_PT
+
+    for operations in pages:
+        page_xobjects = {}
+        content = [_op('q'), _op('cm', PX_TO_PT, 0, 0, -PX_TO_PT, 0, height_pt)]
+        for op in operations:
+            if isinstance(op, PasteImage):
+                slot = op.slot_image
+                source = slot.image if slot.image is not None else slot.jpeg
+                cached = xobjects.get(id(source))
+                if cached is None or cached[0]() is not source:
+                    holder = weakref.ref(source) if slot.image is not None else (lambda source=source: source)
+                    cached = xobjects[id(source)] = (holder, _write_image(write_object, slot))
+                name = f'Im{cached[1].number}'
+                page_xobjects[name] = cached[1]
+                content += [
+                    _op('q'), _op('cm', *_image_matrix(slot, op.xy)), _op('Do', Name('/' + name)), _op('Q'),
+                ]
+            elif isinstance(op, Rectangle):
+                (x0, y0, x1, y1), line_width = op.box, op.width
+                # ImageDraw.rectangle mewarnai piksel x0..x1 termasuk ujungnya, bingkai selebar width ke dalam
+                content += [
+                    _op('RG', *_rgb(op.outline)), _op('w', line_width),
+                    _op('re', x0 + line_width / 2, y0 + line_width / 2, x1 + 1 - x0 - line_width,
+                        y1 + 1 - y0 - line_width),
+                    _op('S'),
+                ]
+            else:
+                if font_ref is None:
+                    font_ref = _write_font(write_object, font)
+                    # Font bitmap Pillow (tanpa FreeType) tidak punya getmetrics; bagian atas bbox 'A' cukup dekat
+                    ascent = font.getmetrics()[0] if hasattr(font, 'getmetrics') else font.getbbox('A')[3]
+                    font_size = getattr(font, 'size', 10)
+                x, y = op.xy
+                # Anchor 'la' Pillow: y adalah garis ascender, baseline ada ascent piksel di bawahnya
+                content += [
+                    _op('BT'), _op('Tf', Name.F1, font_size), _op('rg', *_rgb(op.fill)),
+                    _op('Tm', 1, 0, 0, -1, x, y + ascent), _op('Tj', String(_encode_text(op.text))), _op('ET'),
+                ]
+        content.append(_op('Q'))
+
+        resources = {}
+        if page_xobjects:
+            resources['XObject'] = page_xobjects
+        if font_ref is not None:
+            resources['Font'] = {'F1': font_ref}
+        contents = write_object({'Filter': 'FlateDecode'}, zlib.compress(pikepdf.unparse_content_stream(content)))
+        page_refs.append(write_object({
+            'Type': 'Page', 'Parent': _Ref(_PAGES), 'MediaBox': [0, 0, width_pt, height_pt],
+            'Resources': resources, 'Contents': contents,
+        }))
+        if on_page is not None:
+            on_page(len(page_refs))
+
+    write_object({'Type': 'Pages', 'Kids': page_refs, 'Count': len(page_refs)}, number=_PAGES)
+    write_object({'Type': 'Catalog', 'Pages': _Ref(_PAGES)}, number=_CATALOG)
+    xref_offset = position
+    size = max(offsets) + 1
+    write(b'xref\n0 %d\n0000000000 65535 f \n' % size)
+    write(b''.join(b'%010d 00000 n \n' % offsets[number] for number in range(1, size)))
+    write(b'trailer\n%s\nstartxref\n%d\n%%%%EOF\n' % (_pdf_value({'Size': size, 'Root': _Ref(_CATALOG)}), xref_offset))
+    return len(page_refs)
+
+
+def vector_pdf_bytes(pages, font=None, page_size=A4_SIZE_PX, on_page=None):
+    """PDF vektor (bytes) dari iterable halaman; lihat write_vector_pdf."""
+    pdf_buffer = io.BytesIO()
+    write_vector_pdf(pages, pdf_buffer, font, page_size, on_page)
+    return pdf_buffer.getvalue()
@@ -0,0 +1,44 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+# Decode dan resize Pillow melepas GIL, jadi gambar berikutnya bisa diolah di thread lain
+# selagi halaman sebelumnya masih disusun di thread Streamlit.
+DEFAULT_IMAGE_WORKERS = min(4, os.cpu_count() or 1)
+
+_END = object()
+
+
+def prefetch_map(func, items, max_workers=None, lookahead=None):
+    """
+    Seperti map(func, items), tetapi func dijalankan lebih dulu di thread pool.
+
+    Hasil di-yield sesuai urutan items (tata letak tetap deterministik). Paling banyak lookahead
+    (default 2 x max_workers) item dikerjakan di depan hasil yang sedang diambil, sehingga gambar
+    yang sudah di-decode di memori tetap sedikit. max_workers=None memakai DEFAULT_IMAGE_WORKERS;
+    max_workers=1 menjalankan func langsung di thread pemanggil. Exception dari func dilempar
+    ulang saat hasilnya diambil.
+    """
+    if max_workers is None:
+        max_workers = DEFAULT_IMAGE_WORKERS
+    max_workers = max(1, max_workers)
+    if max_workers == 1:
+        yield from map(func, items)
+        return
+
+    if lookahead is None:
+        lookahead = 2 * max_workers
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending = deque(executor.submit(func, item) for item in islice(items, lookahead))
+        while pending:
+            # Satu item baru masuk antrean setiap kali satu hasil diambil
+            item = next(items, _END)
+            if item is not _END:
+                pending.append(executor.submit(func, item))
+            yield pending.popleft().result()
+    finally:
+        # Konsumen berhenti di tengah jalan (mis. error): gambar yang belum mulai tidak perlu diolah
+        executor.shutdown(wait=True, cancel_futures=True)
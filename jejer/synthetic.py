@@ -0,0 +1,52 @@
+import io
+import random
+
+from PIL import Image, ImageDraw
+
+# Foto sintetis seukuran kamera ponsel untuk benchmark halaman jejer gambar, tanpa memakai
+# bukti transfer sungguhan. Noise dibuat di seperempat resolusi lalu diperbesar agar ukuran
+# file JPEG mendekati foto asli (bukan gradasi polos yang terkompresi sangat kecil).
+
+PHOTO_SIZES = ((4000, 3000), (3000, 4000), (1080, 2400), (2400, 1080))
+
+
+def synthetic_photo(width, height, seed=0):
+    """Gambar RGB sintetis (PIL.Image) berukuran width x height."""
+    noise = Image.effect_noise((max(1, width // 4), max(1, height // 4)), 40 + seed % 20).resize((width, height))
+    gradient = Image.linear_gradient('L').resize((width, height))
+    return Image.merge('RGB', (noise, gradient, noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+
+
+def synthetic_photo_bytes(width, height, image_format='JPEG', seed=0, quality=88):
+    """Isi file foto sintetis (bytes) dalam image_format ('JPEG' atau 'PNG')."""
+    buffer = io.BytesIO()
+    options = {'quality': quality} if image_format == 'JPEG' else {}
+    synthetic_photo(width, height, seed).save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def synthetic_screenshot_bytes(width=1080, height=2400, seed=0, quality=88):
+    """
+    Isi file JPEG sintetis mirip screenshot bukti transfer: latar polos, pita judul dan baris-baris
+    teks (kotak abu-abu), sehingga terkompresi seperti screenshot asli, bukan seperti foto.
+    """
+    rnd = random.Random(seed)
+    img = Image.new('RGB', (width, height), (245, 246, 248))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, width, height // 8), fill=(rnd.randrange(256), 90, 160))
+    y = height // 6
+    while y < height - 80:
+        draw.rectangle((60, y, 60 + rnd.randrange(width // 4, width - 120), y + 28), fill=(60, 60, 70))
+        y += rnd.choice((50, 60, 120))
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def synthetic_photos(n_images, sizes=PHOTO_SIZES, png_every=10, seed=0):
+    """n_images isi file foto dengan ukuran acak dari sizes; setiap gambar ke-png_every berupa PNG."""
+    rnd = random.Random(seed)
+    return [
+        synthetic_photo_bytes(*rnd.choice(sizes), 'PNG' if png_every and i % png_every == png_every - 1 else 'JPEG', seed=i)
+        for i in range(n_images)
+    ]
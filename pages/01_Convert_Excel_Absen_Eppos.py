@@ -1,12 +1,30 @@
-import pandas as pd
 import streamlit as st
-import io
-from datetime import datetime, time, date, timedelta
-import re
-import math
-from openpyxl import Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.styles import Protection, Alignment 
+
+from absen.cache import (
+    clear_result_cache,
+    get_cached_result,
+    result_cache_info,
+    result_cache_key,
+    store_cached_result,
+)
+from absen.eppos import build_eppos_rekap, extract_attendance_store
+from absen.export import write_eppos_rekap_workbook
+from absen.layout import file_content_hash, get_report_layout, period_dates
+from absen.profiling import build_trace, memory_tracing, stage
+from absen.sections import read_report_sections
+from absen.shift_rules import DEFAULT_RULES_PATH, list_rule_sets, load_shift_rules, shift_rules_fingerprint
+from absen.store import store_has_punches, store_punch_frame
+from absen.streaming import STREAMING_AUTO_THRESHOLD_BYTES
+from absen.ui import (
+    offer_dataset_download,
+    process_incremental,
+    process_sections,
+    process_streaming,
+    run_batch_mode,
+    show_duration_summary,
+    show_profile_panel,
+    show_result_table,
+)
 
 # --- Inisialisasi variabel di awal skrip untuk menghindari NameError ---
 df_processed = None
@@ -23,97 +41,70 @@ st.set_page_config(
 st.title("Convert Log Absensi Mesin Eppos")
 st.write("Unggah file Excel laporan sidik jari Kamu di sini untuk diproses.")
 
-def process_attendance_log(uploaded_file):
+def process_attendance_log(uploaded_file, shift_rules=None, timings=None, memory=None, diagnostics=False):
     """
     Fungsi utama untuk memproses file log absensi.
     Menerima file yang diunggah Streamlit.
+    shift_rules adalah aturan shift (ShiftRules); default memakai absen/rules/eppos_default.json.
+    timings/memory (dict, opsional) diisi lama dan puncak memori per tahap (lihat absen/profiling.py).
+    Pratinjau sheet mentah dan log yang diekstrak hanya dibuat jika diagnostics=True.
     """
+    if shift_rules is None:
+        shift_rules = load_shift_rules(DEFAULT_RULES_PATH)
+
     st.info("Memulai pengolahan data log karyawan dari laporan sidik jari...")
 
     try:
-        df_raw = pd.read_excel(io.BytesIO(uploaded_file.read()), header=None)
+        file_bytes = uploaded_file.getvalue()
+        with stage(timings, 'baca_excel', memory):
+            sections = read_report_sections(file_bytes)
         st.success(f"File '{uploaded_file.name}' berhasil dibaca secara mentah.")
     except Exception as e:
         st.error(f"Gagal membaca file Excel: {e}")
         st.warning("Pastikan file yang diunggah adalah file Excel (.xlsx atau .xls) yang valid.")
         return None, None, None
 
+    # Satu sheet per departemen dan/atau beberapa periode bertumpuk: setiap bagian diolah lalu digabung
+    if len(sections) > 1:
+        return process_sections('eppos', sections, shift_rules, timings, memory)
+    df_raw = sections[0].df_raw
+
     if df_raw.empty:
         st.warning("Sheet yang dibaca kosong atau tidak dapat dibaca. Tidak ada data untuk diolah.")
         return None, None, None
 
-    st.subheader("DEBUG INFO: 10 Baris Pertama dari Sheet Mentah")
-    st.dataframe(df_raw.head(10))
-    st.info(f"Ukuran DataFrame Mentah: Rows: {df_raw.shape[0]}, Columns: {df_raw.shape[1]}")
+    if diagnostics:
+        st.subheader("DEBUG INFO: 10 Baris Pertama dari Sheet Mentah")
+        st.dataframe(df_raw.head(10))
+        st.info(f"Ukuran DataFrame Mentah: Rows: {df_raw.shape[0]}, Columns: {df_raw.shape[1]}")
 
     st.info("Mengekstraksi data log dari format laporan...")
 
-    tahun_laporan = None
-    bulan_laporan = None
-    periode_row_index = -1
-    start_date_periode = None
-    end_date_periode = None
+    # Tata letak laporan (periode, nomor hari, blok karyawan) dibaca sekali per isi file
+    try:
+        with stage(timings, 'tata_letak', memory):
+            layout = get_report_layout(df_raw, file_content_hash(file_bytes))
+    except ValueError as ve:
+        st.error(f"Error parsing date from 'Periode' string: {ve}")
+        st.warning("Pastikan format tanggal di baris 'Periode' adalah YYYY/MM/DD ~ [YYYY/][MM]/DD.")
+        return None, None, None
 
-    for r_idx, row_series in df_raw.iterrows():
-        row_str = ' '.join(row_series.dropna().astype(str).tolist())
-        
-        # Regex updated to capture the year for the end date as well, if available.
-        # This makes the date parsing more robust for cross-year periods.
-        # It tries to match YYYY/MM/DD ~ YYYY/MM/DD first, then falls back to YYYY/MM/DD ~ MM/DD
-        match = re.search(r'Periode\s*:\s*(\d{4})/(\d{2})/(\d{2})\s*~\s*(?:(\d{4})/)?(\d{2})/(\d{2})', row_str)
-        if match:
-            start_year = int(match.group(1))
-            start_month = int(match.group(2))
-            start_day = int(match.group(3))
-            
-            end_year_str = match.group(4)
-            end_month = int(match.group(5))
-            end_day = int(match.group(6))
-
-            try:
-                start_date_periode = date(start_year, start_month, start_day)
-                
-                if end_year_str: # If end year is explicitly provided in the regex
-                    end_year = int(end_year_str)
-                else: # Infer end year if not explicitly provided (e.g., YYYY/MM/DD ~ MM/DD)
-                    if end_month < start_month:
-                        end_year = start_year + 1
-                    else:
-                        end_year = start_year
-                
-                end_date_periode = date(end_year, end_month, end_day)
-
-                # Set bulan_laporan and tahun_laporan to the start of the period for file naming consistency
-                bulan_laporan = start_month
-                tahun_laporan = start_year
-
-                st.info(f"Periode laporan teridentifikasi: {start_date_periode.strftime('%Y/%m/%d')} ~ {end_date_periode.strftime('%Y/%m/%d')} dari baris {r_idx + 1}")
-                periode_row_index = r_idx
-                break
-            except ValueError as ve:
-                st.error(f"Error parsing date from 'Periode' string: {ve}")
-                st.warning("Pastikan format tanggal di baris 'Periode' adalah YYYY/MM/DD ~ [YYYY/][MM]/DD.")
-                return None, None, None
+    start_date_periode = layout.start_date
+    end_date_periode = layout.end_date
 
     if start_date_periode is None or end_date_periode is None:
         st.error("Error: Informasi periode (tanggal mulai/akhir) tidak ditemukan atau tidak valid di file Excel.")
         st.warning("Pastikan ada baris yang mengandung 'Periode :YYYY/MM/DD ~ MM/DD' dengan format tanggal yang benar.")
         return None, None, None
 
-    days_row_idx_global = periode_row_index + 1
-    st.info(f"Baris nomor hari teridentifikasi di baris {days_row_idx_global + 1}")
-
-    col_day_mapping_global = {}
-    for c_idx in range(df_raw.shape[1]):
-        try:
-            cell_val_day = df_raw.iloc[days_row_idx_global, c_idx]
-            if pd.isna(cell_val_day):
-                continue
-            day_num = int(float(cell_val_day))
-            if 1 <= day_num <= 31:
-                col_day_mapping_global[day_num] = c_idx
-        except (ValueError, TypeError):
-            continue
+    # Set bulan_laporan and tahun_laporan to the start of the period for file naming consistency
+    bulan_laporan = start_date_periode.month
+    tahun_laporan = start_date_periode.year
+
+    st.info(f"Periode laporan teridentifikasi: {start_date_periode.strftime('%Y/%m/%d')} ~ {end_date_periode.strftime('%Y/%m/%d')} dari baris {layout.period_row + 1}")
+    st.info(f"Baris nomor hari teridentifikasi di baris {layout.day_row + 1}")
+
+    col_day_mapping_global = layout.col_day_mapping
 
     if not col_day_mapping_global:
         st.error("Tidak dapat menemukan nomor hari (1-31) di baris yang diharapkan.")
@@ -122,477 +113,179 @@ def process_attendance_log(uploaded_file):
 
     st.info(f"Ditemukan {len(col_day_mapping_global)} nomor hari.")
 
-    employee_blocks_indices = []
-    for r_idx in range(df_raw.shape[0]):
-        cell_val_col_0 = str(df_raw.iloc[r_idx, 0]).strip() if df_raw.shape[1] > 0 else ''
-        cell_val_col_1 = str(df_raw.iloc[r_idx, 1]).strip() if df_raw.shape[1] > 1 else ''
+    all_dates_in_period = period_dates(start_date_periode, end_date_periode)
 
-        if 'No :' in cell_val_col_0 or 'No :' in cell_val_col_1:
-            employee_blocks_indices.append(r_idx)
+    all_blocks = layout.blocks
 
-    if not employee_blocks_indices:
+    if not all_blocks:
         st.error("Tidak ada blok karyawan yang ditemukan (tidak ada baris yang mengandung 'No :').")
         st.warning("Pastikan format laporan sidik jari konsisten.")
         return None, None, None
 
-    st.info(f"Ditemukan {len(employee_blocks_indices)} blok karyawan.")
-
-    employee_names_and_indices = []
-    for i, start_row_idx in enumerate(employee_blocks_indices):
-        nama_karyawan = None
-        name_label_col_idx = -1
-        for col_idx in range(df_raw.shape[1]):
-            cell_val = str(df_raw.iloc[start_row_idx, col_idx]).strip()
-            if 'Nama :' in cell_val:
-                name_label_col_idx = col_idx
-                break
-        
-        if name_label_col_idx != -1:
-            for scan_col_idx in range(name_label_col_idx + 1, df_raw.shape[1]):
-                candidate_name = str(df_raw.iloc[start_row_idx, scan_col_idx]).strip()
-                if candidate_name and candidate_name != 'nan' and not candidate_name.startswith('Dept :'):
-                    nama_karyawan = candidate_name
-                    break
-        
-        if nama_karyawan is None or nama_karyawan == 'nan' or nama_karyawan == '':
-            st.warning(f"Peringatan: Nama karyawan tidak ditemukan atau kosong untuk blok dimulai dari baris {start_row_idx + 1}. Melewati blok ini.")
+    st.info(f"Ditemukan {len(all_blocks)} blok karyawan.")
+
+    employee_blocks = []
+    for block in all_blocks:
+        if not block.name:
+            st.warning(f"Peringatan: Nama karyawan tidak ditemukan atau kosong untuk blok dimulai dari baris {block.start_row + 1}. Melewati blok ini.")
             continue
-        employee_names_and_indices.append((nama_karyawan, start_row_idx))
-
-    all_dates_in_period = []
-    current_date_iter = start_date_periode
-    while current_date_iter <= end_date_periode:
-        all_dates_in_period.append(current_date_iter)
-        current_date_iter += timedelta(days=1)
-    
+        employee_blocks.append(block)
+
     st.info(f"Rentang tanggal yang akan diproses: {start_date_periode.strftime('%Y-%m-%d')} sampai {end_date_periode.strftime('%Y-%m-%d')}")
 
-    log_karyawan_harian = {}
-    for nama_karyawan, _ in employee_names_and_indices:
-        for current_date_in_period in all_dates_in_period:
-            key = (nama_karyawan, current_date_in_period)
-            log_karyawan_harian[key] = {
-                'No': 0, 
-                'Nama': nama_karyawan,
-                'Tanggal': current_date_in_period,
-                'Log Jam Mentah': '',
-                'Jam Datang': None,
-                'Jam Pulang': None,
-                'Jam Istirahat Mulai': None,
-                'Jam Istirahat Selesai': None,
-                'Durasi Jam Kerja': None,
-                'Durasi Istirahat': None,
-                'Keterangan Tambahan 1': '', 
-                'Keterangan Tambahan 2': '', 
-                'log_all_times': []
-            }
-
-    # Populate log_karyawan_harian by iterating through all_dates_in_period
-    for nama_karyawan, start_row_idx in employee_names_and_indices:
-        logs_start_row_for_this_block = start_row_idx + 1
-        
-        for current_date in all_dates_in_period: # Iterate through the correctly generated dates
-            day_num = current_date.day # Get the day from the actual date object
-            
-            if day_num not in col_day_mapping_global:
-                # This handles cases where a day in the period might not have a corresponding column in the raw data
-                st.warning(f"Peringatan: Kolom untuk hari {day_num} tidak ditemukan di baris nomor hari. Melewati hari ini untuk '{nama_karyawan}'.")
-                continue
-
-            col_idx = col_day_mapping_global[day_num]
-            
-            key = (nama_karyawan, current_date) # Use the correct current_date object
-            
-            raw_cell_times_strings = [] 
-            parsed_times_for_this_day = []
-
-            for r_idx_log in range(logs_start_row_for_this_block, df_raw.shape[0]):
-                if r_idx_log in employee_blocks_indices and r_idx_log != start_row_idx:
-                    break # Reached the next employee block
-                
-                if col_idx >= df_raw.shape[1]:
-                    continue
-
-                log_cell_value = df_raw.iloc[r_idx_log, col_idx] # Get the raw cell value first
-
-                # Heuristic to stop reading if three consecutive empty cells are found
-                # Moved this check here to apply before attempting to process the cell value
-                if pd.isna(log_cell_value) or str(log_cell_value).strip() == '' or str(log_cell_value).strip() == 'nan':
-                    if r_idx_log + 2 < df_raw.shape[0]:
-                        next_cell_val_1 = str(df_raw.iloc[r_idx_log + 1, col_idx]).strip() if col_idx < df_raw.shape[1] else ''
-                        next_cell_val_2 = str(df_raw.iloc[r_idx_log + 2, col_idx]).strip() if col_idx < df_raw.shape[1] else ''
-
-                        if (pd.isna(next_cell_val_1) or next_cell_val_1 == '' or next_cell_val_1 == 'nan') and \
-                           (pd.isna(next_cell_val_2) or next_cell_val_2 == '' or next_cell_val_2 == 'nan'):
-                            break 
-                    else:
-                        break # End of file or end of block
-                    
-                    continue # Continue to next row if current cell is empty but not enough consecutive empties to stop
-                
-                # Now convert to string for regex splitting
-                time_str_full_cell = str(log_cell_value).strip() 
-                potential_times_in_cell = re.split(r'\s+|\n', time_str_full_cell)
-
-                for time_str_raw in potential_times_in_cell:
-                    time_str = time_str_raw.strip()
-                    if not time_str:
-                        continue
-
-                    parsed_time = None
-                    try:
-                        # Attempt 1: HH:MM:SS
-                        parsed_time = datetime.strptime(time_str, '%H:%M:%S').time()
-                    except ValueError:
-                        try:
-                            # Attempt 2: HH:MM
-                            parsed_time = datetime.strptime(time_str, '%H:%M').time()
-                        except ValueError:
-                            # Attempt 3: Excel float time
-                            # Only try to parse as float if the raw cell value is a float/int
-                            # AND it's within a reasonable range for an Excel time (0 to <1)
-                            if isinstance(log_cell_value, (float, int)) and 0 <= log_cell_value < 1:
-                                excel_time_float = float(log_cell_value)
-                                total_seconds = excel_time_float * 24 * 60 * 60
-                                hours = int(total_seconds // 3600)
-                                remainder = total_seconds % 3600
-                                minutes = int(remainder // 60)
-                                seconds = round(remainder % 60)
-                                
-                                # Ensure hours are within 0-23 range before creating time object
-                                if 0 <= hours <= 23:
-                                    parsed_time = time(hours, minutes, seconds)
-                                else:
-                                    # This indicates it was a number but not a valid time float
-                                    st.warning(f"Peringatan: Nilai numerik '{log_cell_value}' di baris {r_idx_log + 1}, kolom {col_idx + 1} tidak dapat diinterpretasikan sebagai waktu yang valid (jam di luar 0-23).")
-
-                            else:
-                                # Attempt 4: Fallback to pandas to_datetime for other general formats
-                                try:
-                                    # pd.to_datetime is more flexible but can sometimes misinterpret numbers
-                                    dt_obj = pd.to_datetime(time_str, errors='coerce') # Use errors='coerce' to turn unparsable into NaT
-                                    if pd.notna(dt_obj):
-                                        parsed_time = dt_obj.time()
-                                except Exception:
-                                    pass # Could not parse this time string
-                    
-                    if parsed_time:
-                        parsed_times_for_this_day.append(parsed_time)
-                        raw_cell_times_strings.append(parsed_time.strftime('%H:%M:%S')) 
-
-            # Assign collected times to the correct log_karyawan_harian entry
-            if parsed_times_for_this_day:
-                log_karyawan_harian[key]['log_all_times'].extend(parsed_times_for_this_day)
-                # Sort the raw string times for consistent output
-                log_karyawan_harian[key]['Log Jam Mentah'] = '\n'.join(sorted(raw_cell_times_strings))
-            # If no times for this day, 'Log Jam Mentah' remains empty as initialized
-
-    if all(not data['log_all_times'] and not data['Log Jam Mentah'] for data in log_karyawan_harian.values()):
+    # Hari dalam periode yang tidak memiliki kolom di baris nomor hari dilewati
+    missing_days = sorted({d.day for d in all_dates_in_period if d.day not in col_day_mapping_global})
+    for day_num in missing_days:
+        st.warning(f"Peringatan: Kolom untuk hari {day_num} tidak ditemukan di baris nomor hari. Melewati hari ini untuk semua karyawan.")
+
+    # Log harian disimpan kolumnar (detik int32 + offset per karyawan/tanggal), bukan dict per hari
+    with stage(timings, 'ekstraksi', memory):
+        # Ekstraksi kolumnar: setiap blok karyawan dipotong sekali, semua token diparse sekaligus
+        attendance_store = extract_attendance_store(df_raw, col_day_mapping_global, employee_blocks, all_dates_in_period)
+
+    if not store_has_punches(attendance_store):
         st.warning("Tidak ada log absensi yang berhasil diekstrak dari file untuk karyawan manapun.")
         return None, None, None
 
     st.success(f"Berhasil mengekstrak log absensi mentah dan menginisialisasi semua tanggal.")
-    
-    sample_raw_logs_df = pd.DataFrame([
-        {'Nama': data['Nama'], 'Tanggal': data['Tanggal'], 'Jam': t} 
-        for key, data in log_karyawan_harian.items() 
-        if data['log_all_times']
-        for t in data['log_all_times']
-    ])
-    sample_raw_logs_df.sort_values(by=['Nama', 'Tanggal', 'Jam'], inplace=True)
-    st.subheader("DEBUG INFO: 5 Baris Pertama dari Log Mentah yang Diekstrak (untuk pemrosesan)")
-    st.dataframe(sample_raw_logs_df.head())
 
+    if diagnostics:
+        st.subheader("DEBUG INFO: 5 Baris Pertama dari Log Mentah yang Diekstrak (untuk pemrosesan)")
+        st.dataframe(store_punch_frame(attendance_store, limit=5))
 
     st.info("Mengolah log mentah ke format output yang diinginkan (dengan aturan shift)...")
 
-    kolom_final = ['No', 'Nama', 'Tanggal', 'Log Jam Mentah', 'Jam Datang', 'Jam Pulang', 
-                   'Jam Istirahat Mulai', 'Jam Istirahat Selesai', 
-                   'Durasi Jam Kerja', 'Durasi Istirahat',
-                   'Keterangan Tambahan 1', 'Keterangan Tambahan 2'] 
-    
-    # Process the aggregated daily logs
-    for key, data in log_karyawan_harian.items():
-        all_times = sorted(data['log_all_times'])
-
-        if not all_times:
-            continue
-
-        # --- Definisi Jendela Waktu Shift ---
-        # Untuk Jam Datang:
-        SHIFT_PAGI_DATANG_START = time(6, 0, 0)
-        SHIFT_PAGI_DATANG_END = time(9, 30, 0) 
-
-        SHIFT_SIANG_DATANG_START = time(13, 0, 0)
-        SHIFT_SIANG_DATANG_END = time(16, 0, 0)
-
-        SHIFT_MIDDLE_DATANG_START = time(10, 0, 0)
-        SHIFT_MIDDLE_DATANG_END = time(12, 30, 0)
-
-        # Untuk Jam Pulang:
-        SHIFT_PAGI_PULANG_START = time(15, 0, 0) 
-        SHIFT_PAGI_PULANG_END = time(19, 0, 0) 
-
-        SHIFT_MIDDLE_PULANG_START = time(18, 0, 0) 
-        SHIFT_MIDDLE_PULANG_END = time(21, 30, 0) 
-
-        SHIFT_SIANG_PULANG_START = time(20, 0, 0) 
-        SHIFT_SIANG_PULANG_END = time(23, 59, 59) 
-
-        # Jendela Waktu Istirahat
-        ISTIRAHAT_SIANG_START = time(10, 00, 0)
-        ISTIRAHAT_SIANG_END = time(14, 30, 0)
-
-        ISTIRAHAT_MALAM_START = time(16, 30, 0) 
-        ISTIRAHAT_MALAM_END = time(22, 0, 0)   
-
-        # --- Tentukan Jam Datang ---
-        data['Jam Datang'] = None
-        
-        # Prioritas untuk Jam Datang (Shift Pagi -> Shift Middle -> Shift Siang)
-        for t_log in all_times:
-            if SHIFT_PAGI_DATANG_START <= t_log <= SHIFT_PAGI_DATANG_END:
-                if data['Jam Datang'] is None or t_log < data['Jam Datang']:
-                    data['Jam Datang'] = t_log
-                break 
-
-        if data['Jam Datang'] is None: 
-            for t_log in all_times:
-                if SHIFT_MIDDLE_DATANG_START <= t_log <= SHIFT_MIDDLE_DATANG_END:
-                    if data['Jam Datang'] is None or t_log < data['Jam Datang']:
-                        data['Jam Datang'] = t_log
-                    break 
-
-        if data['Jam Datang'] is None: 
-            for t_log in all_times:
-                if SHIFT_SIANG_DATANG_START <= t_log <= SHIFT_SIANG_DATANG_END:
-                    if data['Jam Datang'] is None or t_log < data['Jam Datang']:
-                        data['Jam Datang'] = t_log
-                    break 
-        
-        # Fallback: jika tidak ada yang cocok di jendela shift, ambil log pertama keseluruhan
-        if data['Jam Datang'] is None and all_times:
-            data['Jam Datang'] = all_times[0]
-
-
-        # --- Tentukan Jam Pulang ---
-        data['Jam Pulang'] = None
-        
-        # Iterasi terbalik untuk mencari log terakhir (pulang)
-        # Prioritas untuk Jam Pulang: Shift Siang -> Shift Middle -> Shift Pagi
-        found_pulang_time = None
-
-        # 1. Coba cari di jendela SHIFT_SIANG_PULANG (prioritas tertinggi)
-        for t_log in reversed(all_times):
-            if SHIFT_SIANG_PULANG_START <= t_log <= SHIFT_SIANG_PULANG_END:
-                found_pulang_time = t_log
-                break 
-
-        # 2. Jika belum ditemukan, coba di jendela SHIFT_MIDDLE_PULANG
-        if found_pulang_time is None:
-            for t_log in reversed(all_times):
-                if SHIFT_MIDDLE_PULANG_START <= t_log <= SHIFT_MIDDLE_PULANG_END:
-                    found_pulang_time = t_log
-                    break 
-
-        # 3. Jika belum ditemukan, coba di jendela SHIFT_PAGI_PULANG
-        if found_pulang_time is None:
-            for t_log in reversed(all_times):
-                if SHIFT_PAGI_PULANG_START <= t_log <= SHIFT_PAGI_PULANG_END:
-                    found_pulang_time = t_log
-                    break 
-
-        data['Jam Pulang'] = found_pulang_time 
-
-        # --- Tentukan Jam Istirahat ---
-        data['Jam Istirahat Mulai'] = None
-        data['Jam Istirahat Selesai'] = None
-        
-        potential_break_times_filtered = [] 
-
-        # Determine the effective end of the working day for internal logs to filter logs for break
-        effective_end_of_day_for_internal_logs = None
-        if data['Jam Pulang']:
-            effective_end_of_day_for_internal_logs = data['Jam Pulang']
-        elif all_times: # If no explicit Jam Pulang, use the very last log as the 'end' for filtering internal logs
-            effective_end_of_day_for_internal_logs = all_times[-1]
-
-        if data['Jam Datang'] and effective_end_of_day_for_internal_logs:
-            dt_datang_for_comparison = datetime.combine(data['Tanggal'], data['Jam Datang'])
-            dt_effective_end_for_comparison = datetime.combine(data['Tanggal'], effective_end_of_day_for_internal_logs)
-            
-            # Handle overnight shifts for comparison
-            if dt_effective_end_for_comparison < dt_datang_for_comparison:
-                dt_effective_end_for_comparison += timedelta(days=1)
-
-            for t_log in all_times:
-                dt_log_for_comparison = datetime.combine(data['Tanggal'], t_log)
-                
-                # Adjust for potential overnight logs (e.g., if a log for the next day appears before 5 AM)
-                if t_log < time(5,0,0) and dt_log_for_comparison < dt_datang_for_comparison: 
-                     dt_log_for_comparison += timedelta(days=1)
-                
-                # Only consider logs that are *strictly* after Jam Datang and up to effective_end_of_day
-                if dt_datang_for_comparison < dt_log_for_comparison <= dt_effective_end_for_comparison:
-                    if (ISTIRAHAT_SIANG_START <= t_log <= ISTIRAHAT_SIANG_END) or \
-                       (ISTIRAHAT_MALAM_START <= t_log <= ISTIRAHAT_MALAM_END):
-                        potential_break_times_filtered.append(t_log)
-        
-        sorted_potential_break_times = sorted(potential_break_times_filtered)
-
-        if len(sorted_potential_break_times) >= 1: 
-            data['Jam Istirahat Mulai'] = sorted_potential_break_times[0]
-
-            # Logic for Jam Istirahat Selesai:
-            if len(sorted_potential_break_times) == 1:
-                data['Jam Istirahat Selesai'] = sorted_potential_break_times[0]
-            else:
-                last_break_time_candidate = sorted_potential_break_times[-1]
-                second_last_break_time_candidate = sorted_potential_break_times[-2] 
-
-                # Define a threshold for "significant difference" for break continuation
-                # If the gap between break logs is > 1 hour, maybe the later one is not part of the same break.
-                MAX_CONTINUOUS_BREAK_GAP_MINUTES = 60 
-
-                if (data['Jam Pulang'] and last_break_time_candidate == data['Jam Pulang']):
-                    # Check if Jam Pulang is also a break time, and if it's far from the previous break log
-                    td_gap = datetime.combine(date.min, last_break_time_candidate) - datetime.combine(date.min, second_last_break_time_candidate)
-                    if td_gap.total_seconds() / 60 > MAX_CONTINUOUS_BREAK_GAP_MINUTES:
-                        # If Jam Pulang is very far from the previous break log, pick the previous one.
-                        data['Jam Istirahat Selesai'] = second_last_break_time_candidate
-                    else:
-                        # If Jam Pulang is close to the previous break log, it's likely the break end.
-                        data['Jam Istirahat Selesai'] = last_break_time_candidate
-                else:
-                    # If Jam Pulang is not the last break candidate, or there's only one break log,
-                    # or the gap is not significant, just use the last break time candidate.
-                    data['Jam Istirahat Selesai'] = last_break_time_candidate
-
-        # --- Hitung Durasi Jam Kerja ---
-        if data['Jam Datang'] and data['Jam Pulang']:
-            dt_datang = datetime.combine(data['Tanggal'], data['Jam Datang'])
-            dt_pulang = datetime.combine(data['Tanggal'], data['Jam Pulang'])
-            
-            # Handle overnight shifts: if pulang time is earlier than datang, assume it's next day
-            if dt_pulang < dt_datang:
-                dt_pulang += timedelta(days=1)
-
-            durasi_kerja_td = dt_pulang - dt_datang
-            
-            total_seconds = durasi_kerja_td.total_seconds()
-            hours = int(total_seconds // 3600)
-            minutes = int((total_seconds % 3600) // 60)
-            
-            durasi_str = []
-            if hours > 0:
-                durasi_str.append(f"{hours} jam")
-            if minutes > 0:
-                durasi_str.append(f"{minutes} menit")
-            
-            data['Durasi Jam Kerja'] = ' '.join(durasi_str) if durasi_str else '0 menit'
-
-        else:
-            data['Durasi Jam Kerja'] = ''
-
-        # --- Hitung Durasi Istirahat ---
-        if data['Jam Istirahat Mulai'] and data['Jam Istirahat Selesai']:
-            dt_istirahat_mulai = datetime.combine(data['Tanggal'], data['Jam Istirahat Mulai'])
-            dt_istirahat_selesai = datetime.combine(data['Tanggal'], data['Jam Istirahat Selesai'])
-            
-            # Handle cases where break might span past midnight (unlikely for a typical break, but good for robustness)
-            if dt_istirahat_selesai < dt_istirahat_mulai:
-                dt_istirahat_selesai += timedelta(days=1)
-
-            durasi_istirahat_td = dt_istirahat_selesai - dt_istirahat_mulai
-            total_minutes_istirahat = durasi_istirahat_td.total_seconds() / 60
-            data['Durasi Istirahat'] = f"{int(total_minutes_istirahat)} menit"
-        else:
-            data['Durasi Istirahat'] = ''
-
-    # Convert dictionary to list of dictionaries for DataFrame creation
-    df_hasil_list = []
-    # Sort keys to ensure consistent order (by employee name, then date)
-    sorted_keys = sorted(log_karyawan_harian.keys())
-    for key in sorted_keys:
-        data = log_karyawan_harian[key]
-        row_data = {col: data.get(col) for col in kolom_final}
-        df_hasil_list.append(row_data)
-
-    df_hasil = pd.DataFrame(df_hasil_list)
-
-    df_hasil['No'] = range(1, len(df_hasil) + 1)
+    df_hasil = build_eppos_rekap(attendance_store, shift_rules, timings, memory)
 
     st.success("Pengolahan data selesai.")
-    st.subheader("Data Hasil Akhir")
-    st.dataframe(df_hasil)
-    st.info(f"Total baris: {len(df_hasil)}")
-    
     return df_hasil, bulan_laporan, tahun_laporan
 
+
+def select_shift_rules():
+    """
+    Aturan shift per cabang: pilih aturan bawaan di absen/rules atau unggah file JSON sendiri.
+    Menghentikan halaman jika file aturan tidak valid.
+    """
+    rule_sets = list_rule_sets()
+    selected_rule_set = st.selectbox("Aturan shift", list(rule_sets.keys()))
+    uploaded_rules = st.file_uploader("Atau unggah aturan shift cabang (.json)", type=["json"])
+    try:
+        return load_shift_rules(uploaded_rules if uploaded_rules is not None else rule_sets[selected_rule_set])
+    except ValueError as ve:
+        st.error(f"Aturan shift tidak valid: {ve}")
+        st.stop()
+
+
+# Cache hasil olahan bersama untuk semua rerun halaman ini
+with st.sidebar:
+    if st.button("Bersihkan cache hasil"):
+        clear_result_cache()
+    jumlah_cache, ukuran_cache = result_cache_info()
+    st.caption(f"Cache hasil: {jumlah_cache} file ({ukuran_cache / (1024 * 1024):.1f} MB)")
+    # Profil per tahap; tracemalloc memperlambat pengolahan jadi hanya dinyalakan bila diminta
+    show_profile = st.checkbox("Tampilkan profil waktu & memori")
+    trace_memory = st.checkbox("Ukur memori (tracemalloc, lebih lambat)", disabled=not show_profile)
+    # Pratinjau sheet mentah dan log yang diekstrak hanya dibuat saat mencari masalah format file
+    diagnostics_mode = st.checkbox("Mode diagnostik (pratinjau data mentah)")
+
+# Mode batch untuk tutup bulan: semua file cabang sekaligus
+if st.checkbox("Mode batch (banyak file cabang sekaligus)"):
+    run_batch_mode('eppos', select_shift_rules)
+    st.stop()
+
 uploaded_file = st.file_uploader("Pilih file Excel (.xlsx atau .xls)", type=["xlsx", "xls"])
 
 if uploaded_file is not None:
     st.subheader("File yang Diunggah:")
     st.write(uploaded_file.name)
 
-    df_processed, bulan_laporan_val, tahun_laporan_val = process_attendance_log(uploaded_file)
+    # File .xlsx besar otomatis memakai mode streaming agar server tidak kehabisan memori
+    is_xlsx = uploaded_file.name.lower().endswith('.xlsx')
+    streaming_mode = st.checkbox(
+        "Mode hemat memori (streaming, khusus .xlsx)",
+        value=is_xlsx and uploaded_file.size > STREAMING_AUTO_THRESHOLD_BYTES,
+        disabled=not is_xlsx,
+        help="Membaca file baris demi baris per blok karyawan. Disarankan untuk file ekspor multi-cabang yang besar."
+    )
+
+    incremental_mode = st.checkbox(
+        "Mode inkremental (olah ulang hanya tanggal yang berubah)",
+        disabled=streaming_mode,
+        help="Hasil per karyawan per tanggal disimpan di komputer server. Cocok untuk laporan yang "
+             "diekspor ulang di tengah dan akhir bulan. Tidak bisa digabung dengan mode streaming."
+    )
+
+    shift_rules = select_shift_rules()
+
+    # Hasil olahan dicache per isi file + aturan shift + mode baca, jadi rerun (mis. klik tombol download)
+    # hanya membuat ulang file Excel tanpa membaca dan mengolah ulang log. Mode ikut di kunci agar
+    # berganti mode tidak memakai hasil mode lain (dan mode inkremental tetap mengisi SQLite)
+    incremental_mode = incremental_mode and not streaming_mode
+    cache_key = result_cache_key(
+        'eppos', file_content_hash(uploaded_file.getvalue()), shift_rules_fingerprint(shift_rules),
+        streaming_mode, incremental_mode
+    )
+    cached_result = get_cached_result(cache_key)
+    timings = {} if show_profile else None
+    memory = {} if show_profile and trace_memory else None
+    if cached_result is not None:
+        df_processed, bulan_laporan_val, tahun_laporan_val = cached_result
+        st.success("Hasil diambil dari cache (file dan aturan shift sama), tidak diolah ulang.")
+    else:
+        with memory_tracing(memory is not None):
+            if incremental_mode:
+                df_processed, bulan_laporan_val, tahun_laporan_val = process_incremental(
+                    'eppos', uploaded_file, shift_rules, timings, memory
+                )
+            elif streaming_mode:
+                df_processed, bulan_laporan_val, tahun_laporan_val = process_streaming(
+                    'eppos', uploaded_file, shift_rules, timings, memory
+                )
+            else:
+                df_processed, bulan_laporan_val, tahun_laporan_val = process_attendance_log(
+                    uploaded_file, shift_rules=shift_rules, timings=timings, memory=memory,
+                    diagnostics=diagnostics_mode
+                )
+        if df_processed is not None:
+            store_cached_result(cache_key, (df_processed, bulan_laporan_val, tahun_laporan_val))
 
     if df_processed is not None:
-        st.subheader("Download Hasil Pengolahan")
-        
-        df_processed_for_excel = df_processed.copy()
-        
-        required_cols = ['Keterangan Tambahan 1', 'Keterangan Tambahan 2']
-        for col in required_cols:
-            if col not in df_processed_for_excel.columns:
-                df_processed_for_excel[col] = ''
+        show_result_table('eppos', df_processed)
+        show_duration_summary(df_processed)
 
-        # Format time columns for Excel output
-        for col in ['Jam Datang', 'Jam Pulang', 'Jam Istirahat Mulai', 'Jam Istirahat Selesai']:
-            df_processed_for_excel[col] = df_processed_for_excel[col].apply(lambda x: x.strftime('%H:%M:%S') if isinstance(x, time) else '')
-
-        output_buffer = io.BytesIO()
+        st.subheader("Download Hasil Pengolahan")
         
         if bulan_laporan_val is not None and tahun_laporan_val is not None:
             output_file_name = f'Rekap_Absensi_Periode_{bulan_laporan_val:02d}_{tahun_laporan_val}.xlsx'
         else:
             output_file_name = 'Rekap_Absensi_Tanpa_Periode.xlsx'
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Rekap Absensi'
-
-        header_names = list(df_processed_for_excel.columns)
-        
-        for r_idx, row_data in enumerate(dataframe_to_rows(df_processed_for_excel, index=False, header=True)): 
-            row_num_excel = r_idx + 1 
-            for c_idx, cell_value in enumerate(row_data):
-                cell = ws.cell(row=row_num_excel, column=c_idx + 1)
-                cell.value = cell_value
-                
-                if header_names[c_idx] == 'Log Jam Mentah':
-                    cell.alignment = Alignment(wrapText=True) 
-                
-                cell.protection = Protection(locked=False) 
-
-        DEFAULT_COLUMN_WIDTH = 25
-        for i, col_name in enumerate(header_names):
-            column_letter = chr(ord('A') + i)
-            ws.column_dimensions[column_letter].width = DEFAULT_COLUMN_WIDTH
-
-        ws.protection.sheet = False 
-
-        wb.save(output_buffer)
-        output_buffer.seek(0)
+        # Workbook write_only dengan NamedStyle bersama (lihat absen/export.py)
+        with memory_tracing(memory is not None), stage(timings, 'ekspor', memory):
+            output_bytes = write_eppos_rekap_workbook(df_processed)
 
         st.download_button(
             label="Unduh File Excel Hasil",
-            data=output_buffer.getvalue(),
+            data=output_bytes,
             file_name=output_file_name,
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
         st.success(f"File '{output_file_name}' siap diunduh. Semua kolom bisa diedit dan lebar kolom diatur.")
 
+        offer_dataset_download('eppos', df_processed, uploaded_file.name)
+
+    # Trace disimpan di session_state agar tetap tampil (dan bisa dibandingkan) saat rerun dari cache
+    if timings and cached_result is None:
+        st.session_state['trace_eppos'] = build_trace('eppos', timings, memory, info={
+            'file': uploaded_file.name,
+            'ukuran_byte': uploaded_file.size,
+            'jumlah_baris': 0 if df_processed is None else len(df_processed),
+            'streaming': streaming_mode,
+            'inkremental': incremental_mode,
+        })
+    if show_profile and 'trace_eppos' in st.session_state:
+        show_profile_panel(st.session_state['trace_eppos'])
+
 else:
     col_main, col_info = st.columns([3, 1])
 
@@ -1,7 +1,11 @@
 import streamlit as st
 from PIL import Image, ImageDraw, ImageFont
-import io
 import os
+from itertools import islice
+
+from jejer.drawing import PasteImage, Rectangle, TextLine, raster_pdf_bytes, slot_image
+from jejer.pdf import vector_pdf_bytes
+from jejer.prefetch import DEFAULT_IMAGE_WORKERS, prefetch_map
 
 # Function to wrap text
 def wrap_text(text, font, max_width):
@@ -41,7 +45,7 @@ def wrap_text(text, font, max_width):
     return lines
 
 
-def create_a4_grid_pdf(uploaded_files_data):
+def create_a4_grid_pdf(uploaded_files_data, max_workers=None, vector=True):
     if not uploaded_files_data:
         st.error("Mohon unggah gambar.")
         return None
@@ -121,39 +125,45 @@ def create_a4_grid_pdf(uploaded_files_data):
     actual_drawn_slot_height_base = img_max_height + (2 * border_width) + estimated_total_text_height # this is a minimum height for the cell
 
 
-    all_pdf_pages = [] # List to store each generated A4 Image object
+    def prepare_image(uploaded_file_obj):
+        # Runs on the prefetch thread pool: decode, rotate and scale one upload to its slot size
+        # (for the vector PDF, a JPEG that is already close to slot size is embedded as-is)
+        img = Image.open(uploaded_file_obj)
+
+        # Extract filename without extension for display
+        base_filename = os.path.basename(uploaded_file_obj.name)
+        filename_without_ext = os.path.splitext(base_filename)[0]
+
+        # Landscape images are rotated to portrait to fit rectangular slots well;
+        # the slot size is computed from the header size in the final orientation
+        rotate = img.width > img.height
+        src_width, src_height = (img.height, img.width) if rotate else img.size
+
+        # Resize image to fit within the calculated img_max_width/height while maintaining aspect ratio
+        if src_width / src_height > img_max_width / img_max_height:
+            new_width = img_max_width
+            new_height = int(src_height * (img_max_width / src_width))
+        else:
+            new_height = img_max_height
+            new_width = int(src_width * (img_max_height / src_height))
+
+        # Decode straight at the smallest 1/2^k scale that still covers the slot (JPEG draft / reduce)
+        jpeg_bytes = uploaded_file_obj.getvalue() if vector else None
+        return slot_image(img, (new_width, new_height), rotate, jpeg_bytes), filename_without_ext
+
+    # Images are decoded and scaled ahead on a thread pool while earlier pages are composed;
+    # results come back in upload order, so the layout is the same as a serial run
+    prepared_images = prefetch_map(prepare_image, uploaded_files_data, max_workers)
+
+    all_pdf_pages = [] # List of draw operations for each A4 page
 
     # Process images in batches of 6 for each A4 page (3 columns x 2 rows = 6 images)
     for page_idx in range(0, len(uploaded_files_data), 6):
-        # Create a new blank A4 canvas for the current page (portrait)
-        a4_canvas = Image.new('RGB', (a4_width_px, a4_height_px), 'white')
-        draw = ImageDraw.Draw(a4_canvas)
+        # Draw operations of the current page (portrait), rendered to PDF at the end
+        page_ops = []
 
-        # Get the batch of up to 6 files for the current page
-        current_batch_files = uploaded_files_data[page_idx : page_idx + 6]
-        
-        processed_items_for_page = []
-        for uploaded_file_obj in current_batch_files:
-            img = Image.open(uploaded_file_obj)
-            
-            # Extract filename without extension for display
-            base_filename = os.path.basename(uploaded_file_obj.name)
-            filename_without_ext = os.path.splitext(base_filename)[0]
-
-            # Rotate landscape images to portrait to fit rectangular slots well
-            if img.width > img.height:
-                img = img.rotate(90, expand=True)
-
-            # Resize image to fit within the calculated img_max_width/height while maintaining aspect ratio
-            if img.width / img.height > img_max_width / img_max_height:
-                new_width = img_max_width
-                new_height = int(img.height * (img_max_width / img.width))
-            else:
-                new_height = img_max_height
-                new_width = int(img.width * (img_max_height / img.height))
-
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            processed_items_for_page.append((img, filename_without_ext))
+        # Take the next (up to) 6 prepared images for the current page
+        processed_items_for_page = list(islice(prepared_images, 6))
 
         # Place images and text on the current A4 canvas
         # Grid is 2 rows (i), 3 columns (j)
@@ -162,6 +172,7 @@ def create_a4_grid_pdf(uploaded_files_data):
                 img_index_in_batch = i * 3 + j # Correct index for 2 rows, 3 columns
                 if img_index_in_batch < len(processed_items_for_page):
                     current_img, filename = processed_items_for_page[img_index_in_batch]
+                    img_width, img_height = current_img.size
 
                     # Calculate top-left corner of the "grid cell"
                     # The spacing of cells is now based on the calculated actual_drawn_slot_width/height
@@ -180,26 +191,26 @@ def create_a4_grid_pdf(uploaded_files_data):
                     # The height of the box will depend on the wrapped text, so we'll draw it dynamically
                     
                     # Calculate image position (centered horizontally within its drawn slot)
-                    img_x = grid_cell_x_start + (actual_drawn_slot_width - current_img.width) // 2
+                    img_x = grid_cell_x_start + (actual_drawn_slot_width - img_width) // 2
                     img_y = grid_cell_y_start + border_width # Small offset from top border of drawn slot
 
-                    a4_canvas.paste(current_img, (img_x, img_y))
+                    page_ops.append(PasteImage(current_img, (img_x, img_y)))
                     
                     # --- Text Wrapping and Drawing ---
                     # max_text_width is the width available for the text inside the drawn slot
                     max_text_width = actual_drawn_slot_width - (2 * border_width) - 10 # 10px inner padding
                     wrapped_lines = wrap_text(filename, font, max_text_width)
                     
-                    current_text_y = img_y + current_img.height + 5 # Start below the image
+                    current_text_y = img_y + img_height + 5 # Start below the image
                     
                     for line in wrapped_lines:
-                        bbox = draw.textbbox((0,0), line, font=font)
+                        bbox = font.getbbox(line)
                         text_width = bbox[2] - bbox[0]
                         text_height_per_line = bbox[3] - bbox[1]
 
                         text_x = grid_cell_x_start + (actual_drawn_slot_width - text_width) // 2
                         
-                        draw.text((text_x, current_text_y), line, fill=text_color, font=font)
+                        page_ops.append(TextLine((text_x, current_text_y), line, text_color))
                         current_text_y += text_height_per_line + 5 # Move to next line for wrapped text
 
                     # Now, let's determine the actual height of the drawn box, considering the wrapped text
@@ -213,26 +224,25 @@ def create_a4_grid_pdf(uploaded_files_data):
                     # This means if text wraps a lot, the box will extend.
                     
                     # Draw border dynamically based on content height
-                    draw.rectangle(
+                    page_ops.append(Rectangle(
                         (grid_cell_x_start, grid_cell_y_start, 
                          grid_cell_x_start + actual_drawn_slot_width, 
                          current_text_y + border_width), # Use current_text_y for bottom of box
-                        outline=border_color, width=border_width
-                    )
+                        border_color, border_width
+                    ))
 
-        all_pdf_pages.append(a4_canvas) # Add the completed A4 page to the list
+        all_pdf_pages.append(page_ops) # Add the completed A4 page to the list
 
-    # Save all generated A4 pages as a single multi-page PDF
-    pdf_buffer = io.BytesIO()
-    if all_pdf_pages:
-        first_page = all_pdf_pages[0]
-        remaining_pages = all_pdf_pages[1:] if len(all_pdf_pages) > 1 else []
-        first_page.save(pdf_buffer, format="PDF", save_all=True, append_images=remaining_pages)
-        
-    pdf_bytes = pdf_buffer.getvalue()
-    return pdf_bytes
+    # Save all A4 pages as a single multi-page PDF: vector pages with the images embedded once,
+    # or (old way) one rendered 300 DPI canvas per page
+    if vector:
+        return vector_pdf_bytes(all_pdf_pages, font, (a4_width_px, a4_height_px))
+    return raster_pdf_bytes(all_pdf_pages, font, (a4_width_px, a4_height_px))
 
 # --- Streamlit UI ---
+PDF_FORMAT_VECTOR = "Vektor (gambar asli + teks)"
+PDF_FORMAT_RASTER = "Gambar halaman penuh (cara lama)"
+
 st.set_page_config(layout="centered", page_title="Jejer Bukti Transfer ke A4")
 
 st.title("Jejer Gambar ke Lembar A4 (Portrait, 3 Kolom x 2 Baris)")
@@ -258,10 +268,20 @@ if uploaded_files:
         with cols[idx % 3]: # Cycle through 3 columns
             st.image(file, caption=f"Gambar {idx+1}: {filename_without_ext_preview}", width=150)
 
+    max_workers = st.number_input(
+        "Jumlah thread pengolah gambar", min_value=1, max_value=16, value=DEFAULT_IMAGE_WORKERS,
+        help="Gambar dibuka dan diperkecil di beberapa thread sekaligus selagi halaman disusun.",
+    )
+
+    pdf_format = st.radio(
+        "Format PDF", [PDF_FORMAT_VECTOR, PDF_FORMAT_RASTER],
+        help="PDF vektor menyematkan gambar asli dan teks sungguhan (file lebih kecil, lebih cepat dibuat).",
+    )
+
     # Process and download button
     if st.button("Proses dan Buat PDF"):
         with st.spinner("Memproses gambar dan membuat PDF..."):
-            pdf_data = create_a4_grid_pdf(uploaded_files)
+            pdf_data = create_a4_grid_pdf(uploaded_files, max_workers, vector=pdf_format == PDF_FORMAT_VECTOR)
             if pdf_data:
                 st.success("PDF berhasil dibuat!")
                 st.download_button(
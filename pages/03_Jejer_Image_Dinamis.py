@@ -3,6 +3,13 @@ from PIL import Image, ImageDraw, ImageFont
 import io
 import os
 
+from jejer.drawing import (
+    PasteImage, Rectangle, SlotImage, multiline_text_lines, passthrough_slot, write_raster_pdf,
+)
+from jejer.loader import load_reduced
+from jejer.pdf import write_vector_pdf
+from jejer.prefetch import DEFAULT_IMAGE_WORKERS, prefetch_map
+
 # Fungsi pembantu untuk memecah teks menjadi beberapa baris agar muat dalam lebar tertentu
 def wrap_text(text, font, max_width_px):
     """
@@ -50,12 +57,16 @@ def wrap_text(text, font, max_width_px):
     return "\n".join(lines)
 
 
-def create_a4_grid_pdf(uploaded_files_data):
+def create_a4_grid_pdf(uploaded_files_data, max_workers=None, vector=True, progress=None):
     """
     Memproses daftar file gambar, menatanya secara dinamis ke halaman A4,
     dan mengembalikan PDF multi-halaman dalam bentuk byte.
     Gambar landscape akan diputar, gambar akan diskalakan agar muat,
     dan nama file akan ditampilkan di atas setiap gambar dengan wrap text.
+    Gambar dibuka dan diskalakan lebih dulu di max_workers thread (lihat jejer.prefetch).
+    vector=True menulis PDF vektor (jejer.pdf), False merender setiap halaman sebagai gambar (cara lama).
+    Setiap halaman ditulis ke PDF begitu selesai disusun lalu dilepas dari memori; jika diberikan,
+    progress(halaman_selesai, gambar_selesai, total_gambar) dipanggil setelah setiap halaman ditulis.
     """
     if not uploaded_files_data:
         st.error("Mohon unggah gambar.")
@@ -83,14 +94,8 @@ def create_a4_grid_pdf(uploaded_files_data):
         font = ImageFont.load_default()
         TEXT_COLOR = (100, 100, 100) # Menggunakan warna abu-abu untuk font default
 
-    all_pdf_pages = [] # List untuk menyimpan setiap objek gambar A4 yang dihasilkan
-    current_page = None # Objek gambar untuk halaman A4 saat ini
-    draw = None         # Objek ImageDraw untuk menggambar di halaman saat ini
-
-    # Posisi awal untuk menempatkan item di halaman saat ini
-    current_x = MARGIN
-    current_y = MARGIN
-    current_row_max_height = 0 # Menyimpan tinggi maksimum item di baris saat ini
+    draw = ImageDraw.Draw(Image.new('RGB', (1, 1))) # Hanya untuk mengukur teks
+    gambar_selesai = 0 # Jumlah file yang sudah ditempatkan (atau dilewati) di halaman yang sudah disusun
 
     # Hitung area konten yang tersedia di dalam margin halaman
     page_content_width = A4_WIDTH_PX - (2 * MARGIN)
@@ -102,107 +107,152 @@ def create_a4_grid_pdf(uploaded_files_data):
     # Ini menentukan seberapa besar gambar bisa diskalakan agar muat 3 per baris
     MAX_ITEM_WIDTH_PER_COL = (page_content_width - (TARGET_COLS_PER_ROW - 1) * ITEM_SPACING) // TARGET_COLS_PER_ROW
 
-    # Loop melalui setiap file gambar yang diunggah
-    for uploaded_file_obj in uploaded_files_data:
+    def siapkan_gambar(uploaded_file_obj):
+        """Dijalankan di thread pool: buka, putar, dan skalakan satu gambar. Returns (SlotImage, nama, error)."""
         try:
             img_original = Image.open(uploaded_file_obj)
         except Exception as e:
-            st.warning(f"Tidak dapat membuka file {uploaded_file_obj.name}. Melompati. Error: {e}")
-            continue
-        
+            return None, None, e
+
         # Ekstrak nama file tanpa ekstensi untuk ditampilkan
         base_filename = os.path.basename(uploaded_file_obj.name)
         filename_without_ext = os.path.splitext(base_filename)[0]
 
-        # Putar gambar landscape ke potret (jika lebar > tinggi)
-        if img_original.width > img_original.height:
+        # Gambar landscape akan diputar ke potret (jika lebar > tinggi); ukuran target dihitung
+        # dari ukuran di header pada orientasi akhir
+        rotate = img_original.width > img_original.height
+        src_width, src_height = (img_original.height, img_original.width) if rotate else img_original.size
+        target_width, target_height = src_width, src_height
+        if src_width > MAX_ITEM_WIDTH_PER_COL:
+            scale = min(MAX_ITEM_WIDTH_PER_COL / src_width, A4_HEIGHT_PX / src_height)
+            target_width, target_height = int(src_width * scale), int(src_height * scale)
+
+        # Untuk PDF vektor, JPEG yang sudah seukuran thumbnail disematkan apa adanya tanpa di-decode
+        if vector:
+            slot = passthrough_slot(
+                img_original, (target_width, target_height), rotate, uploaded_file_obj.getvalue()
+            )
+            if slot is not None:
+                return slot, filename_without_ext, None
+
+        if src_width > MAX_ITEM_WIDTH_PER_COL:
+            # Decode langsung pada skala 1/2^k terkecil yang masih menutupi ukuran thumbnail (jejer.loader)
+            img_original = load_reduced(
+                img_original, (target_height, target_width) if rotate else (target_width, target_height)
+            )
+        if rotate:
             img_original = img_original.rotate(90, expand=True)
 
-        scaled_img = img_original.copy()
+        scaled_img = img_original
         # Skalakan gambar agar lebar maksimumnya sesuai dengan MAX_ITEM_WIDTH_PER_COL
         # Tinggi akan disesuaikan secara proporsional.
         # Jika gambar sudah lebih kecil, biarkan saja kecuali terlalu besar
         if scaled_img.width > MAX_ITEM_WIDTH_PER_COL:
             scaled_img.thumbnail((MAX_ITEM_WIDTH_PER_COL, A4_HEIGHT_PX), Image.Resampling.LANCZOS)
+        return SlotImage(scaled_img.size, scaled_img, None, False), filename_without_ext, None
+
+    def susun_halaman():
+        """Generator daftar operasi gambar (jejer.drawing) per halaman A4, di-yield begitu halamannya penuh."""
+        nonlocal gambar_selesai
+        current_page = None # Daftar operasi gambar untuk halaman A4 saat ini
+
+        # Posisi awal untuk menempatkan item di halaman saat ini
+        current_x = MARGIN
+        current_y = MARGIN
+        current_row_max_height = 0 # Menyimpan tinggi maksimum item di baris saat ini
+
+        # Loop melalui setiap file gambar yang diunggah; gambar berikutnya sudah diolah di thread lain
+        # selagi gambar ini ditempatkan, dan hasilnya tetap datang sesuai urutan unggahan
+        prepared_images = prefetch_map(siapkan_gambar, uploaded_files_data, max_workers)
+        for uploaded_file_obj, (slot, filename_without_ext, error) in zip(uploaded_files_data, prepared_images):
+            if error is not None:
+                st.warning(f"Tidak dapat membuka file {uploaded_file_obj.name}. Melompati. Error: {error}")
+                gambar_selesai += 1
+                continue
+
+            # Wrap teks nama file
+            # Lebar maksimum untuk teks adalah lebar item dikurangi padding dan border
+            scaled_width, scaled_height = slot.size
+            wrapped_filename = wrap_text(filename_without_ext, font, scaled_width - (2 * BORDER_WIDTH) + 10) # +10 untuk toleransi
+
+            # Hitung tinggi teks yang sebenarnya setelah di-wrap
+            # Gunakan multiline_textbbox untuk teks multi-baris
+            bbox_text = draw.multiline_textbbox((0,0), wrapped_filename, font=font) if current_page is not None else font.getbbox(wrapped_filename)
+            text_actual_height = bbox_text[3] - bbox_text[1] + 10 # Tambah sedikit padding
+
+            # Hitung total ruang yang akan ditempati oleh item ini (gambar + teks + bingkai)
+            item_total_width = scaled_width + (2 * BORDER_WIDTH) 
+            item_total_height = scaled_height + text_actual_height + (2 * BORDER_WIDTH) 
+
+            # --- Logika Penempatan ---
+            # 1. Cek apakah item muat secara horizontal di baris saat ini
+            # current_x + lebar_item_ini + jarak_antar_item > batas_kanan_halaman
+            if current_x + item_total_width + ITEM_SPACING > A4_WIDTH_PX - MARGIN:
+                # Tidak cukup ruang di baris saat ini, pindah ke baris berikutnya
+                current_x = MARGIN # Kembali ke margin kiri
+                current_y += current_row_max_height + ITEM_SPACING # Turunkan Y sebesar tinggi maks baris sebelumnya + jarak
+                current_row_max_height = 0 # Reset tinggi maks untuk baris baru
+
+            # 2. Cek apakah item muat secara vertikal di halaman saat ini (setelah potensi pindah baris)
+            # current_y + tinggi_item_ini + jarak_antar_item > batas_bawah_halaman
+            if current_y + item_total_height + ITEM_SPACING > A4_HEIGHT_PX - MARGIN:
+                # Tidak cukup ruang di halaman saat ini, mulai halaman baru
+                if current_page is not None: # Hanya tulis halaman jika sudah ada konten di dalamnya
+                    yield current_page
+                # Inisialisasi halaman baru
+                current_page = None 
+                current_x = MARGIN
+                current_y = MARGIN
+                current_row_max_height = 0
         
-        # Wrap teks nama file
-        # Lebar maksimum untuk teks adalah lebar item dikurangi padding dan border
-        wrapped_filename = wrap_text(filename_without_ext, font, scaled_img.width - (2 * BORDER_WIDTH) + 10) # +10 untuk toleransi
-
-        # Hitung tinggi teks yang sebenarnya setelah di-wrap
-        # Gunakan multiline_textbbox untuk teks multi-baris
-        bbox_text = draw.multiline_textbbox((0,0), wrapped_filename, font=font) if current_page else font.getbbox(wrapped_filename)
-        text_actual_height = bbox_text[3] - bbox_text[1] + 10 # Tambah sedikit padding
-
-        # Hitung total ruang yang akan ditempati oleh item ini (gambar + teks + bingkai)
-        item_total_width = scaled_img.width + (2 * BORDER_WIDTH) 
-        item_total_height = scaled_img.height + text_actual_height + (2 * BORDER_WIDTH) 
-
-        # --- Logika Penempatan ---
-        # 1. Cek apakah item muat secara horizontal di baris saat ini
-        # current_x + lebar_item_ini + jarak_antar_item > batas_kanan_halaman
-        if current_x + item_total_width + ITEM_SPACING > A4_WIDTH_PX - MARGIN:
-            # Tidak cukup ruang di baris saat ini, pindah ke baris berikutnya
-            current_x = MARGIN # Kembali ke margin kiri
-            current_y += current_row_max_height + ITEM_SPACING # Turunkan Y sebesar tinggi maks baris sebelumnya + jarak
-            current_row_max_height = 0 # Reset tinggi maks untuk baris baru
-
-        # 2. Cek apakah item muat secara vertikal di halaman saat ini (setelah potensi pindah baris)
-        # current_y + tinggi_item_ini + jarak_antar_item > batas_bawah_halaman
-        if current_y + item_total_height + ITEM_SPACING > A4_HEIGHT_PX - MARGIN:
-            # Tidak cukup ruang di halaman saat ini, mulai halaman baru
-            if current_page: # Hanya tambahkan halaman jika sudah ada konten di dalamnya
-                all_pdf_pages.append(current_page)
-            # Inisialisasi halaman baru
-            current_page = None 
-            current_x = MARGIN
-            current_y = MARGIN
-            current_row_max_height = 0
-        
-        # Jika belum ada halaman atau sudah dipaksa untuk membuat halaman baru:
-        if current_page is None:
-            current_page = Image.new('RGB', (A4_WIDTH_PX, A4_HEIGHT_PX), 'white')
-            draw = ImageDraw.Draw(current_page)
-
-        # Gambar bingkai (slot) untuk item saat ini
-        # Koordinat bingkai mendefinisikan batas luar item, termasuk bingkai itu sendiri.
-        border_x0 = current_x
-        border_y0 = current_y
-        border_x1 = border_x0 + item_total_width
-        border_y1 = border_y0 + item_total_height
-        draw.rectangle((border_x0, border_y0, border_x1, border_y1), outline=BORDER_COLOR, width=BORDER_WIDTH)
-
-        # Tempatkan teks di dalam bingkai, di tengah horizontal di bagian atas
-        # Gunakan draw.multiline_text untuk teks multi-baris
-        text_x = border_x0 + BORDER_WIDTH + (item_total_width - (2 * BORDER_WIDTH) - (bbox_text[2] - bbox_text[0])) // 2
-        text_y = border_y0 + BORDER_WIDTH + 5 # Sedikit offset dari bingkai atas
-        draw.multiline_text((text_x, text_y), wrapped_filename, fill=TEXT_COLOR, font=font, align="center")
-
-        # Tempatkan gambar di dalam bingkai, di bawah teks, di tengah horizontal
-        img_x = border_x0 + BORDER_WIDTH + (item_total_width - (2 * BORDER_WIDTH) - scaled_img.width) // 2
-        img_y = border_y0 + BORDER_WIDTH + text_actual_height + 5 # Offset dari bingkai atas dan teks
-        current_page.paste(scaled_img, (img_x, img_y))
-
-        # Perbarui posisi X untuk item berikutnya di baris yang sama
-        current_x += item_total_width + ITEM_SPACING
-        # Perbarui tinggi maksimum untuk item di baris saat ini (penting untuk menghitung baris berikutnya)
-        current_row_max_height = max(current_row_max_height, item_total_height)
-    
-    # Setelah loop selesai, tambahkan halaman terakhir jika ada konten di dalamnya
-    if current_page:
-        all_pdf_pages.append(current_page)
+            # Jika belum ada halaman atau sudah dipaksa untuk membuat halaman baru:
+            if current_page is None:
+                current_page = []
+
+            # Gambar bingkai (slot) untuk item saat ini
+            # Koordinat bingkai mendefinisikan batas luar item, termasuk bingkai itu sendiri.
+            border_x0 = current_x
+            border_y0 = current_y
+            border_x1 = border_x0 + item_total_width
+            border_y1 = border_y0 + item_total_height
+            current_page.append(Rectangle((border_x0, border_y0, border_x1, border_y1), BORDER_COLOR, BORDER_WIDTH))
+
+            # Tempatkan teks di dalam bingkai, di tengah horizontal di bagian atas
+            # Teks multi-baris dipecah per baris dengan posisi yang sama seperti draw.multiline_text
+            text_x = border_x0 + BORDER_WIDTH + (item_total_width - (2 * BORDER_WIDTH) - (bbox_text[2] - bbox_text[0])) // 2
+            text_y = border_y0 + BORDER_WIDTH + 5 # Sedikit offset dari bingkai atas
+            current_page.extend(multiline_text_lines(font, (text_x, text_y), wrapped_filename, TEXT_COLOR, align="center"))
+
+            # Tempatkan gambar di dalam bingkai, di bawah teks, di tengah horizontal
+            img_x = border_x0 + BORDER_WIDTH + (item_total_width - (2 * BORDER_WIDTH) - scaled_width) // 2
+            img_y = border_y0 + BORDER_WIDTH + text_actual_height + 5 # Offset dari bingkai atas dan teks
+            current_page.append(PasteImage(slot, (img_x, img_y)))
+
+            # Perbarui posisi X untuk item berikutnya di baris yang sama
+            current_x += item_total_width + ITEM_SPACING
+            # Perbarui tinggi maksimum untuk item di baris saat ini (penting untuk menghitung baris berikutnya)
+            current_row_max_height = max(current_row_max_height, item_total_height)
+            gambar_selesai += 1
+
+        # Setelah loop selesai, tulis halaman terakhir jika ada konten di dalamnya
+        if current_page is not None:
+            yield current_page
+
+    def halaman_ditulis(halaman_selesai):
+        if progress is not None:
+            progress(halaman_selesai, gambar_selesai, len(uploaded_files_data))
 
-    # Simpan semua halaman A4 yang dihasilkan sebagai satu PDF multi-halaman
+    # Simpan halaman A4 sebagai satu PDF multi-halaman, halaman demi halaman: halaman vektor dengan
+    # gambar disematkan sekali, atau (cara lama) satu kanvas 300 DPI per halaman
     pdf_buffer = io.BytesIO()
-    if all_pdf_pages:
-        first_page = all_pdf_pages[0]
-        remaining_pages = all_pdf_pages[1:] if len(all_pdf_pages) > 1 else []
-        first_page.save(pdf_buffer, format="PDF", save_all=True, append_images=remaining_pages)
-    
-    pdf_bytes = pdf_buffer.getvalue()
-    return pdf_bytes
+    write_pdf = write_vector_pdf if vector else write_raster_pdf
+    jumlah_halaman = write_pdf(susun_halaman(), pdf_buffer, font, (A4_WIDTH_PX, A4_HEIGHT_PX), halaman_ditulis)
+    return pdf_buffer.getvalue() if jumlah_halaman else b''
 
 # --- Streamlit UI ---
+PDF_FORMAT_VECTOR = "Vektor (gambar asli + teks)"
+PDF_FORMAT_RASTER = "Gambar halaman penuh (cara lama)"
+
 st.set_page_config(layout="centered", page_title="Jejer Gambar ke A4 Multi-Page")
 
 st.title("Jejer Gambar ke Lembar A4 (Otomatis & Fleksibel)")
@@ -228,10 +278,31 @@ if uploaded_files:
         with cols[idx % 3]: # Berputar melalui 3 kolom
             st.image(file, caption=f"Gambar {idx+1}: {filename_without_ext_preview}", width=150)
 
+    max_workers = st.number_input(
+        "Jumlah thread pengolah gambar", min_value=1, max_value=16, value=DEFAULT_IMAGE_WORKERS,
+        help="Gambar dibuka dan diperkecil di beberapa thread sekaligus selagi halaman disusun.",
+    )
+
+    pdf_format = st.radio(
+        "Format PDF", [PDF_FORMAT_VECTOR, PDF_FORMAT_RASTER],
+        help="PDF vektor menyematkan gambar asli dan teks sungguhan (file lebih kecil, lebih cepat dibuat).",
+    )
+
     # Tombol proses dan unduh
     if st.button("Proses dan Buat PDF"):
         with st.spinner("Memproses gambar dan membuat PDF..."):
-            pdf_data = create_a4_grid_pdf(uploaded_files)
+            # Setiap halaman langsung ditulis ke PDF begitu penuh, jadi kemajuan dilaporkan per halaman
+            progress_bar = st.progress(0.0, text="Menyusun halaman 1...")
+
+            def tampilkan_kemajuan(halaman_selesai, gambar_selesai, total_gambar):
+                progress_bar.progress(
+                    gambar_selesai / total_gambar,
+                    text=f"Halaman {halaman_selesai} selesai ditulis ({gambar_selesai}/{total_gambar} gambar)",
+                )
+
+            pdf_data = create_a4_grid_pdf(
+                uploaded_files, max_workers, vector=pdf_format == PDF_FORMAT_VECTOR, progress=tampilkan_kemajuan
+            )
             if pdf_data:
                 st.success("PDF berhasil dibuat!")
                 st.download_button(
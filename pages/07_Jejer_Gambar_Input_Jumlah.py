@@ -2,18 +2,18 @@ import streamlit as st
 from PIL import Image
 import io
 
-def create_a4_canvas():
-    """Membuat kanvas A4 baru dengan ukuran potret (300 DPI)."""
-    # Ukuran A4 dalam piksel pada 300 DPI
-    a4_width, a4_height = 2480, 3508
-    return Image.new('RGB', (a4_width, a4_height), 'white')
+from jejer.drawing import PasteImage, render_raster_page, slot_image
+from jejer.pdf import vector_pdf_bytes
 
-def process_and_save_images(image_data):
+def layout_pages(image_data):
     """
-    Memproses dan menyimpan gambar ke dalam satu atau lebih lembar A4.
+    Menyusun gambar ke dalam satu atau lebih lembar A4.
     
     Args:
         image_data (list): Daftar tuple berisi (object_gambar, jumlah_cetak).
+
+    Returns:
+        list: Daftar operasi gambar (jejer.drawing) untuk setiap lembar A4, atau None jika tidak ada gambar.
     """
     all_images_to_print = []
     
@@ -32,22 +32,28 @@ def process_and_save_images(image_data):
     img_width = (a4_width - (cols + 1) * margin) // cols
     img_height = (a4_height - (rows + 1) * margin) // rows
     
-    # Cetak gambar ke lembar-lembar A4
-    page_number = 1
-    current_page = create_a4_canvas()
+    # Gambar hasil resize per (identitas gambar, ukuran slot): gambar yang dicetak berkali-kali cukup
+    # diskalakan sekali, dan di PDF vektor hanya disematkan sekali lalu dirujuk di setiap slot
+    resized_images = {}
+
+    # Susun gambar ke lembar-lembar A4
+    current_page = []
     img_on_page = 0
     
-    output_images = []
+    output_pages = []
 
     for img in all_images_to_print:
         if img_on_page >= 6:
-            output_images.append(current_page)
-            page_number += 1
-            current_page = create_a4_canvas()
+            output_pages.append(current_page)
+            current_page = []
             img_on_page = 0
 
-        # Ukuran ulang gambar dan tempelkan
-        resized_img = img.resize((img_width, img_height), Image.LANCZOS)
+        # Ukuran ulang gambar ke slot; foto besar di-decode langsung pada skala 1/2^k
+        # yang masih menutupi slot (jejer.loader), bukan di resolusi penuh
+        cache_key = (id(img), (img_width, img_height))
+        resized_img = resized_images.get(cache_key)
+        if resized_img is None:
+            resized_img = resized_images[cache_key] = slot_image(img, (img_width, img_height))
         
         row_idx = img_on_page // cols
         col_idx = img_on_page % cols
@@ -55,14 +61,14 @@ def process_and_save_images(image_data):
         x_pos = col_idx * (img_width + margin) + margin
         y_pos = row_idx * (img_height + margin) + margin
         
-        current_page.paste(resized_img, (x_pos, y_pos))
+        current_page.append(PasteImage(resized_img, (x_pos, y_pos)))
         img_on_page += 1
         
     # Simpan halaman terakhir
     if img_on_page > 0:
-        output_images.append(current_page)
+        output_pages.append(current_page)
     
-    return output_images
+    return output_pages
 
 st.set_page_config(layout="wide")
 st.title("🖨️ Jejer Gambar Otomatis ke Kertas A4")
@@ -81,11 +87,12 @@ if uploaded_files:
     st.subheader("Detail Cetak")
     for file in uploaded_files:
         try:
-            # Buka file yang diunggah sebagai objek gambar PIL
+            # Buka file yang diunggah sebagai objek gambar PIL (baru header-nya; piksel di-decode saat diproses)
             image = Image.open(file)
             col1, col2 = st.columns([1, 2])
             with col1:
-                st.image(image, caption=f"Gambar: {file.name}", use_column_width=True)
+                # Pratinjau dari file aslinya agar gambar PIL belum di-decode penuh di sini
+                st.image(file, caption=f"Gambar: {file.name}", use_column_width=True)
             with col2:
                 count = st.number_input(f"Berapa kali '{file.name}' akan dicetak?", min_value=1, value=1, key=file.name)
             image_data_input.append((image, count))
@@ -96,17 +103,30 @@ if uploaded_files:
     
     if st.button("Proses dan Cetak"):
         with st.spinner("Sedang memproses gambar..."):
-            result_pages = process_and_save_images(image_data_input)
+            page_layouts = layout_pages(image_data_input)
             
-            if result_pages:
+            if page_layouts:
                 st.subheader("Hasil Akhir")
-                for i, page in enumerate(result_pages):
+                # Semua halaman sebagai satu PDF vektor A4: setiap gambar disematkan sekali sebagai XObject
+                # dan dirujuk di setiap slot, tanpa kanvas 300 DPI per halaman
+                st.download_button(
+                    label="📥 Unduh Semua Halaman (PDF A4)",
+                    data=vector_pdf_bytes(page_layouts),
+                    file_name="jejer_gambar_a4.pdf",
+                    mime="application/pdf"
+                )
+                # Halaman dengan isi yang sama (mis. satu stiker dicetak puluhan kali) cukup dirender sekali
+                rendered_pages = {}
+                for i, page_layout in enumerate(page_layouts):
                     st.success(f"Halaman {i+1} berhasil dibuat!")
                     
                     # Konversi gambar ke byte untuk ditampilkan dan diunduh
-                    buf = io.BytesIO()
-                    page.save(buf, format="PNG")
-                    byte_im = buf.getvalue()
+                    page_key = tuple((id(op.slot_image), op.xy) for op in page_layout)
+                    byte_im = rendered_pages.get(page_key)
+                    if byte_im is None:
+                        buf = io.BytesIO()
+                        render_raster_page(page_layout).save(buf, format="PNG")
+                        byte_im = rendered_pages[page_key] = buf.getvalue()
                     
                     col1, col2 = st.columns([1, 1])
                     with col1: